@@ -1,8 +1,107 @@
 import os
+import tempfile
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
 
 SWAPI_BASE_URL = os.getenv("SWAPI_BASE_URL", "https://swapi.dev/api")
 HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "120"))
 
+# cache em memória: TTL por namespace (entidade / listagem / busca) e limites de tamanho
+CACHE_TTL_ENTITY_SECONDS = int(os.getenv("CACHE_TTL_ENTITY_SECONDS", str(CACHE_TTL_SECONDS)))
+CACHE_TTL_LIST_SECONDS = int(os.getenv("CACHE_TTL_LIST_SECONDS", str(CACHE_TTL_SECONDS)))
+CACHE_TTL_SEARCH_SECONDS = int(os.getenv("CACHE_TTL_SEARCH_SECONDS", str(CACHE_TTL_SECONDS)))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "30"))
+
+# dado velho: quanto tempo após expirar ainda pode ser servido (0 desliga),
+# e se deve ser devolvido imediatamente enquanto atualiza em background
+CACHE_MAX_STALE_SECONDS = float(os.getenv("CACHE_MAX_STALE_SECONDS", "3600"))
+CACHE_STALE_WHILE_REVALIDATE = _env_bool("CACHE_STALE_WHILE_REVALIDATE", "false")
+
+# backend do cache da SWAPI: "memory" (TTLCache do processo) ou "shared"
+# (SQLite em tmpfs compartilhado por todos os workers do host, ver shared_cache.py)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+CACHE_SHARED_PATH = os.getenv(
+    "CACHE_SHARED_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "swapi_cache.sqlite3"),
+)
+
+# pool de conexões do client HTTP compartilhado (um por processo)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", "false")  # requer o pacote `h2`
+
+# concorrência de chamadas à SWAPI: teto do limite adaptativo por host e limite por requisição (fan-out)
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "32"))
+FANOUT_MAX_CONCURRENCY = int(os.getenv("FANOUT_MAX_CONCURRENCY", "10"))
+
+# política das chamadas à SWAPI (app/services/upstream_policy.py); HTTP_TIMEOUT_SECONDS vira o prazo total
+UPSTREAM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_ATTEMPT_TIMEOUT_SECONDS", "4"))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+UPSTREAM_RETRY_BASE_SECONDS = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.1"))
+UPSTREAM_RETRY_MAX_SECONDS = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "1"))
+UPSTREAM_HEDGE_ENABLED = _env_bool("UPSTREAM_HEDGE_ENABLED", "true")
+UPSTREAM_HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", "95"))
+UPSTREAM_HEDGE_MIN_SAMPLES = int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20"))
+UPSTREAM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY_SECONDS", "0.05"))
+UPSTREAM_HEDGE_MAX_RATIO = float(os.getenv("UPSTREAM_HEDGE_MAX_RATIO", "0.1"))
+UPSTREAM_LIMIT_INITIAL = int(os.getenv("UPSTREAM_LIMIT_INITIAL", "16"))
+UPSTREAM_LIMIT_MIN = int(os.getenv("UPSTREAM_LIMIT_MIN", "2"))
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+UPSTREAM_BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "30"))
+
+# cache de respostas HTTP (bytes serializados + ETag); TTL acompanha o da SWAPI
+RESPONSE_CACHE_ENABLED = _env_bool("RESPONSE_CACHE_ENABLED", "true")
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(CACHE_TTL_LIST_SECONDS)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# segundo nível do cache da SWAPI em disco (SQLite): sobrevive a cold starts/restarts
+# DISK_CACHE_SEED_PATH: arquivo pronto empacotado na imagem, copiado para DISK_CACHE_PATH
+DISK_CACHE_ENABLED = _env_bool("DISK_CACHE_ENABLED", "false")
+DISK_CACHE_PATH = os.getenv("DISK_CACHE_PATH", "/tmp/swapi_cache.sqlite3")
+DISK_CACHE_TTL_SECONDS = float(os.getenv("DISK_CACHE_TTL_SECONDS", "86400"))
+DISK_CACHE_MAX_BYTES = int(os.getenv("DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DISK_CACHE_SEED_PATH = os.getenv("DISK_CACHE_SEED_PATH", "")
+
+# métricas em memória expostas em /metrics (formato Prometheus)
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", "true")
+
+# tempo por etapa do pipeline: header Server-Timing e log estruturado (JSON) por requisição
+SERVER_TIMING_ENABLED = _env_bool("SERVER_TIMING_ENABLED", "true")
+REQUEST_LOG_ENABLED = _env_bool("REQUEST_LOG_ENABLED", "true")
+
+# profiling opt-in (cProfile): amostra de requisições, grava só as lentas (>= PROFILE_SLOW_MS)
+# PROFILE_HEADER_ENABLED=true (só em dev) permite forçar com `X-Profile: 1`
+PROFILE_ENABLED = _env_bool("PROFILE_ENABLED", "false")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+PROFILE_HEADER_ENABLED = _env_bool("PROFILE_HEADER_ENABLED", "false")
+
+# serialização direta (orjson) sem revalidar cada linha pelo response_model
+FAST_RESPONSE_ENABLED = _env_bool("FAST_RESPONSE_ENABLED", "true")
+
 SUPPORTED_RESOURCES = {"people", "planets", "starships", "films"}
-MAX_INCLUDE_DEPTH = int(os.getenv("MAX_INCLUDE_DEPTH", "1"))  # evita explosão de requests
+SWAPI_PAGE_SIZE = 10  # tamanho fixo de página da SWAPI
+
+# espelho local (todas as páginas de cada recurso), atualizado em background
+MIRROR_ENABLED = _env_bool("MIRROR_ENABLED", "false")
+MIRROR_REFRESH_SECONDS = float(os.getenv("MIRROR_REFRESH_SECONDS", "3600"))
+# snapshot empacotado com o deploy: instâncias novas sobem com o espelho já carregado
+MIRROR_SNAPSHOT_PATH = os.getenv("MIRROR_SNAPSHOT_PATH", "")
+# `search=` respondido pelo índice local (search_index.py) sobre o espelho, carregado na
+# primeira busca se preciso; false = busca repassada à SWAPI quando não há espelho
+SEARCH_INDEX_ENABLED = _env_bool("SEARCH_INDEX_ENABLED", "true")
+# include aninhado (ex.: films.characters.homeworld): profundidade máxima do caminho
+# e orçamento de relações resolvidas por requisição (evita explosão de requests)
+MAX_INCLUDE_DEPTH = int(os.getenv("MAX_INCLUDE_DEPTH", "3"))
+MAX_INCLUDE_FETCHES = int(os.getenv("MAX_INCLUDE_FETCHES", "200"))
+
+# POST /v1/batch: máximo de sub-consultas por requisição e quantas rodam ao mesmo tempo
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "20"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "5"))
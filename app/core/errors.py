@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
@@ -6,9 +7,16 @@ class BadRequestError(Exception):
         self.message = message
 
 class UpstreamError(Exception):
-    def __init__(self, message: str, status_code: int = 502):
+    def __init__(self, message: str, status_code: int = 502, retryable: bool = False, upstream_status: Optional[int] = None):
         self.message = message
         self.status_code = status_code
+        self.retryable = retryable  # erro transitório: vale tentar de novo
+        self.upstream_status = upstream_status  # status HTTP que a SWAPI devolveu (None: nem respondeu)
+
+    @property
+    def host_failure(self) -> bool:
+        """Falha do host (5xx, 429, timeout, conexão); outros 4xx são problema da requisição."""
+        return self.retryable or self.upstream_status is None or self.upstream_status >= 500
 
 class NotFoundError(Exception):
     def __init__(self, message: str):
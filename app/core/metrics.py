@@ -0,0 +1,191 @@
+"""
+Métricas em memória, expostas em `/metrics` no formato texto do Prometheus.
+
+Implementação própria e enxuta (sem dependência externa): registrar uma
+amostra é um lookup de dict + soma (histogramas: + `bisect` nos buckets).
+O que já é contado em outro lugar (ex.: stats do `TTLCache`) não é duplicado:
+vira um coletor lido só na hora do scrape.
+
+Tudo roda no event loop (uma thread), então não há locks.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.config import METRICS_ENABLED
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # por série: [contagem em cada bucket (não cumulativa) + estouro, soma, total]
+        self.series: Dict[Labels, List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _num(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+# coletores: funções que devolvem linhas prontas no momento do scrape
+Collector = Callable[[], Iterable[str]]
+_metrics: List = []
+_collectors: List[Collector] = []
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    m = Counter(name, help, labelnames)
+    _metrics.append(m)
+    return m
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    m = Histogram(name, help, labelnames, buckets)
+    _metrics.append(m)
+    return m
+
+def register_collector(collector: Collector) -> None:
+    _collectors.append(collector)
+
+def gauge_lines(name: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]], kind: str = "gauge") -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_num(value)}")
+    return lines
+
+# caches (`TTLCache`) expostos pelo nome; os números vêm de `cache.stats()`
+_caches: Dict[str, object] = {}
+
+def register_cache(name: str, cache) -> None:
+    _caches[name] = cache
+
+def unregister_cache(name: str) -> None:
+    _caches.pop(name, None)
+
+def _cache_lines() -> Iterable[str]:
+    stats = {name: cache.stats() for name, cache in sorted(_caches.items())}
+    families = [
+        ("cache_hits_total", "hits", "counter", "Leituras encontradas no cache"),
+        ("cache_misses_total", "misses", "counter", "Leituras que não acharam valor válido"),
+        ("cache_evictions_total", "evictions", "counter", "Entradas removidas por limite (LRU)"),
+        ("cache_expirations_total", "expirations", "counter", "Entradas removidas por TTL"),
+        ("cache_entries", "entries", "gauge", "Entradas atualmente no cache"),
+        ("cache_bytes", "bytes", "gauge", "Tamanho estimado do cache em bytes"),
+    ]
+    for name, key, kind, help in families:
+        yield from gauge_lines(name, help, (({"cache": c}, s[key]) for c, s in stats.items()), kind)
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _metrics:
+        lines.extend(m.render())
+    lines.extend(_cache_lines())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    for m in _metrics:
+        if isinstance(m, Counter):
+            m.values.clear()
+        else:
+            m.series.clear()
+
+# métricas da aplicação (registradas uma vez, na importação)
+
+HTTP_REQUESTS = counter("http_requests_total", "Requisições HTTP atendidas", ("method", "handler", "status"))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "Latência das requisições HTTP", ("method", "handler"))
+UPSTREAM_REQUESTS = counter("swapi_upstream_requests_total", "Chamadas HTTP reais à SWAPI", ("resource", "status"))
+UPSTREAM_LATENCY = histogram("swapi_upstream_duration_seconds", "Latência das chamadas à SWAPI", ("resource",))
+GET_JSON_RESULTS = counter(
+    "swapi_get_json_total", "Resultados de get_json (hit, stale ou load)", ("resource", "result")
+)
+RELATIONS_PER_REQUEST = histogram(
+    "request_relation_fetches", "Relações únicas resolvidas por requisição", buckets=COUNT_BUCKETS
+)
+UPSTREAM_PER_REQUEST = histogram(
+    "request_upstream_fetches", "Chamadas à SWAPI por requisição", buckets=COUNT_BUCKETS
+)
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: latência e status por endpoint (nunca pelo path cru)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            handler = _handler_name(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], handler)
+            HTTP_REQUESTS.inc(scope["method"], handler, str(status))
+
+def _handler_name(scope) -> str:
+    # nome do endpoint (list_resource, film_characters...): estável e de baixa cardinalidade
+    route = scope.get("route")
+    return getattr(route, "name", None) or "unmatched"
+
+def observe_request(upstream_fetches: int, relations_fetched: Optional[int]) -> None:
+    if not METRICS_ENABLED:
+        return
+    UPSTREAM_PER_REQUEST.observe(upstream_fetches)
+    if relations_fetched is not None:
+        RELATIONS_PER_REQUEST.observe(relations_fetched)
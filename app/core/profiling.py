@@ -0,0 +1,101 @@
+"""
+Profiling opt-in das requisições (cProfile), para achar o hot path das lentas.
+
+- desligado por padrão (`PROFILE_ENABLED`); ligado, perfila uma amostra
+  (`PROFILE_SAMPLE_RATE`) e só grava quando a requisição passa de
+  `PROFILE_SLOW_MS`;
+- com `PROFILE_HEADER_ENABLED=true` (dev) o header `X-Profile: 1` força o
+  profiling daquela requisição, gravado independente do tempo;
+- o arquivo `.prof` vai para `PROFILE_DIR` (abrir com `python -m pstats` ou
+  snakeviz) e o topo por tempo acumulado sai no log.
+
+O cProfile mede a thread inteira: requisições concorrentes no mesmo event loop
+aparecem juntas no perfil. Por isso só um perfil roda por vez.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from typing import Optional
+from app.core.config import (
+    PROFILE_DIR,
+    PROFILE_ENABLED,
+    PROFILE_HEADER_ENABLED,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SLOW_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 15
+
+def _safe_name(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:80] or "root"
+
+class ProfilingMiddleware:
+    """Middleware ASGI puro; fica por dentro do cache de respostas (HITs não são perfilados)."""
+
+    def __init__(
+        self,
+        app,
+        enabled: bool = PROFILE_ENABLED,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        slow_ms: float = PROFILE_SLOW_MS,
+        directory: str = PROFILE_DIR,
+        header_enabled: bool = PROFILE_HEADER_ENABLED,
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.directory = directory
+        self.header_enabled = header_enabled
+        self._active = False
+
+    def _forced(self, scope) -> bool:
+        if not self.header_enabled:
+            return False
+        return any(k == b"x-profile" and v.strip() in (b"1", b"true") for k, v in scope.get("headers") or [])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        forced = self._forced(scope)
+        if not forced and not (self.enabled and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if forced or elapsed_ms >= self.slow_ms:
+                self._dump(profiler, scope, elapsed_ms)
+
+    def _dump(self, profiler: cProfile.Profile, scope, elapsed_ms: float) -> Optional[str]:
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{_safe_name(scope['path'])}-{int(elapsed_ms)}ms.prof"
+        path = os.path.join(self.directory, name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError:
+            logger.exception("Failed to write profile to %s", path)
+            path = None
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        logger.warning(
+            "Profiled %s %s (%.1f ms) -> %s\n%s", scope["method"], scope["path"], elapsed_ms, path, out.getvalue()
+        )
+        return path
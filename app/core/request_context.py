@@ -0,0 +1,143 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.core import metrics
+from app.core.config import REQUEST_LOG_ENABLED, SERVER_TIMING_ENABLED
+
+access_logger = logging.getLogger("app.access")
+
+@dataclass
+class RequestContext:
+    """Estado por requisição compartilhado entre as camadas (inclusive tasks filhas)."""
+    served_stale: bool = False
+    upstream_fetches: int = 0  # chamadas HTTP reais à SWAPI feitas por esta requisição
+    relations_fetched: Optional[int] = None  # URLs únicas de relações resolvidas (None = sem include)
+    # segundos gastos em cada etapa do pipeline (somados se a etapa roda mais de uma vez)
+    stages: Dict[str, float] = field(default_factory=dict)
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+def current() -> Optional[RequestContext]:
+    return _current.get()
+
+def mark_served_stale() -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.served_stale = True
+
+def record_upstream_fetch() -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.upstream_fetches += 1
+
+def record_relations(fetched: int) -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.relations_fetched = (ctx.relations_fetched or 0) + fetched
+
+def record_stage(name: str, seconds: float) -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.stages[name] = ctx.stages.get(name, 0.0) + seconds
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Cronometra um trecho como etapa `name` (sem contexto de requisição não faz nada)."""
+    ctx = _current.get()
+    if ctx is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ctx.stages[name] = ctx.stages.get(name, 0.0) + time.perf_counter() - start
+
+@contextmanager
+def scoped() -> Iterator[RequestContext]:
+    """
+    Contexto próprio para uma parte da requisição (ex.: cada sub-consulta de um
+    batch), com contadores separados; ao sair, tudo é somado ao contexto pai.
+    """
+    parent = _current.get()
+    ctx = RequestContext()
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.served_stale = parent.served_stale or ctx.served_stale
+            parent.upstream_fetches += ctx.upstream_fetches
+            if ctx.relations_fetched is not None:
+                parent.relations_fetched = (parent.relations_fetched or 0) + ctx.relations_fetched
+            for name, seconds in ctx.stages.items():
+                parent.stages[name] = parent.stages.get(name, 0.0) + seconds
+
+def upstream_fetches() -> int:
+    ctx = _current.get()
+    return ctx.upstream_fetches if ctx is not None else 0
+
+def server_timing(stages: Dict[str, float], total: float) -> bytes:
+    # etapas podem se sobrepor (ex.: `upstream` dentro de `enrich`); `total` é até os headers
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+def _log_request(scope, ctx: RequestContext, status: int, duration: float) -> None:
+    record = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "query": scope.get("query_string", b"").decode("latin-1"),
+        "status": status,
+        "duration_ms": round(duration * 1000, 2),
+        "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in ctx.stages.items()},
+        "upstream_fetches": ctx.upstream_fetches,
+        "relations_fetched": ctx.relations_fetched,
+        "served_stale": ctx.served_stale,
+    }
+    access_logger.info("%s", json.dumps(record, separators=(",", ":")))
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI puro: cria o contexto da requisição e anota a resposta
+    (`X-Served-Stale`, `Server-Timing` com o tempo de cada etapa) e registra
+    uma linha de log estruturada (JSON) por requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = RequestContext()
+        token = _current.set(ctx)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                if ctx.served_stale:
+                    headers.append((b"x-served-stale", b"true"))
+                if SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", server_timing(ctx.stages, time.perf_counter() - start)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            metrics.observe_request(ctx.upstream_fetches, ctx.relations_fetched)
+            if REQUEST_LOG_ENABLED:
+                _log_request(scope, ctx, status, time.perf_counter() - start)
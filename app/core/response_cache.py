@@ -0,0 +1,161 @@
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from app.core import metrics
+from app.core.config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+from app.services import mirror
+from app.services.cache import TTLCache
+
+Headers = List[Tuple[bytes, bytes]]
+
+# só as rotas de consulta (GET) entram no cache de resposta
+CACHEABLE_PREFIXES = ("/v1/resources/", "/v1/films/")
+NON_CACHEABLE_SUFFIXES = ("/export",)
+VARY = b"Accept, Accept-Encoding"
+# valores que o FastAPI/pydantic converte para False num parâmetro bool
+_FALSE_VALUES = {"0", "off", "f", "false", "n", "no"}
+
+_responses = TTLCache(
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+)
+
+metrics.register_cache("responses", _responses)
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "content_type", "stored_at", "route")
+
+    def __init__(self, body: bytes, etag: bytes, content_type: bytes, route=None):
+        self.body = body
+        self.etag = etag
+        self.content_type = content_type
+        self.stored_at = time.monotonic()
+        self.route = route  # rota que gerou a resposta (para as métricas dos HITs)
+
+def _cache_key(path: str, query_string: bytes) -> str:
+    # parâmetros normalizados (ordem não importa) + versão do espelho local
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{mirror.data_version()}|{path}?{urlencode(params)}"
+
+def _strong_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.sha256(body).hexdigest()[:32].encode() + b'"'
+
+def _etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(b",")]
+    return b"*" in candidates or etag in candidates
+
+def _cache_headers(etag: bytes, max_age: int) -> Headers:
+    return [
+        (b"etag", etag),
+        (b"cache-control", f"public, max-age={max(0, max_age)}".encode()),
+        (b"vary", VARY),
+    ]
+
+def clear() -> None:
+    _responses.clear()
+
+def stats() -> Dict[str, object]:
+    return _responses.stats()
+
+class ResponseCacheMiddleware:
+    """
+    Cache de respostas HTTP (bytes já serializados + ETag forte).
+
+    - chave: path + query normalizada (+ versão do espelho local);
+    - `If-None-Match` igual ao ETag -> 304 sem corpo;
+    - `Cache-Control: public, max-age=<TTL restante>` e `Vary`, para que o
+      API Gateway / CDN também possam absorver repetições.
+    """
+
+    def __init__(self, app, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS):
+        self.app = app
+        self.ttl = ttl_seconds
+
+    def _cacheable(self, scope) -> bool:
+        # só GET: as rotas não aceitam HEAD (405), e um HIT não pode mudar isso
+        if not RESPONSE_CACHE_ENABLED or scope["type"] != "http" or scope["method"] != "GET":
+            return False
+        path: str = scope["path"]
+        if not path.startswith(CACHEABLE_PREFIXES) or path.endswith(NON_CACHEABLE_SUFFIXES):
+            return False
+        # respostas de diagnóstico (`meta.plan`) não são compartilhadas: qualquer `debug`
+        # que o FastAPI não leia como falso (1, yes, on...) fica de fora
+        params = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        return all(value.strip().lower() in _FALSE_VALUES for name, value in params if name == "debug")
+
+    async def __call__(self, scope, receive, send):
+        if not self._cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope.get("headers") or [])
+        if_none_match = request_headers.get(b"if-none-match")
+        key = _cache_key(scope["path"], scope.get("query_string", b""))
+
+        cached: Optional[CachedResponse] = _responses.get(key)
+        if cached is not None:
+            if cached.route is not None:
+                scope["route"] = cached.route
+            max_age = int(self.ttl - (time.monotonic() - cached.stored_at))
+            await self._send_cached(send, cached, max_age, if_none_match)
+            return
+
+        start: Dict = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        headers: Headers = list(start.get("headers", []))
+        status = start.get("status", 500)
+        stale = any(k.lower() == b"x-served-stale" for k, _ in headers)
+
+        if status != 200 or stale:
+            # erros e dados velhos não são guardados nem anunciados como cacheáveis
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        content_type = next((v for k, v in headers if k.lower() == b"content-type"), b"application/json")
+        entry = CachedResponse(body, _strong_etag(body), content_type, scope.get("route"))
+        _responses.set(key, entry, size=len(body))
+
+        if _etag_matches(if_none_match, entry.etag):
+            await self._send_not_modified(send, entry, self.ttl)
+            return
+
+        headers = [h for h in headers if h[0].lower() not in (b"etag", b"cache-control", b"vary")]
+        headers += _cache_headers(entry.etag, self.ttl) + [(b"x-cache", b"MISS")]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_cached(self, send, cached: CachedResponse, max_age: int, if_none_match) -> None:
+        if _etag_matches(if_none_match, cached.etag):
+            await self._send_not_modified(send, cached, max_age)
+            return
+        headers = [
+            (b"content-type", cached.content_type),
+            (b"content-length", str(len(cached.body)).encode()),
+            (b"x-cache", b"HIT"),
+        ] + _cache_headers(cached.etag, max_age)
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": cached.body})
+
+    async def _send_not_modified(self, send, cached: CachedResponse, max_age: int) -> None:
+        await send({"type": "http.response.start", "status": 304, "headers": _cache_headers(cached.etag, max_age)})
+        await send({"type": "http.response.body", "body": b""})
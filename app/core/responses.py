@@ -0,0 +1,27 @@
+import orjson
+from typing import Any
+from fastapi.responses import Response
+from app.core.config import FAST_RESPONSE_ENABLED
+from app.core.request_context import stage
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def loads(raw: bytes) -> Any:
+    return orjson.loads(raw)
+
+class FastJSONResponse(Response):
+    """
+    Resposta JSON serializada direto com orjson, sem passar
+    pela validação/serialização do `response_model`. Usada para dados que já
+    saem prontos do pipeline (cache/espelho); o schema OpenAPI continua vindo
+    do `response_model` declarado na rota.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return dumps(content)
+
+def fast_path_enabled() -> bool:
+    return FAST_RESPONSE_ENABLED
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from werkzeug.wrappers import Request as WzRequest, Response as WzResponse
+
+class AsgiBridge:
+    """
+    Ponte ASGI -> Cloud Functions (werkzeug), sem passar por WSGI no meio.
+
+    - um event loop dedicado (thread própria) por processo: o client HTTP, o
+      espelho e os caches ficam vivos entre requisições;
+    - o lifespan do app roda uma vez em `start()` (snapshot do espelho, client
+      HTTP já com TLS pronto), ainda na carga da instância;
+    - cada requisição vira um scope ASGI direto do `Request` do werkzeug e a
+      resposta volta como `Response` pronto (sem `start_response`/iteradores).
+    """
+
+    def __init__(self, app, startup_timeout: float = 30):
+        self.app = app
+        self.startup_timeout = startup_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lifespan_done: Optional[asyncio.Event] = None
+        self._lifespan_task: Optional["asyncio.Task[None]"] = None
+        self._lock = threading.Lock()
+
+    # ciclo de vida
+
+    def start(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="asgi-bridge", daemon=True)
+            self._thread.start()
+            self._loop = loop
+        self.submit(self._startup()).result(self.startup_timeout)
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        self.submit(self._shutdown()).result(self.startup_timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def submit(self, coro) -> Future:
+        if self._loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _startup(self) -> None:
+        started: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._lifespan_done = asyncio.Event()
+        messages = [{"type": "lifespan.startup"}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await self._lifespan_done.wait()
+            return {"type": "lifespan.shutdown"}
+
+        async def send(message):
+            if message["type"].startswith("lifespan.startup") and not started.done():
+                started.set_result(message)
+
+        async def run():
+            try:
+                await self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+            finally:
+                if not started.done():
+                    started.set_result({"type": "lifespan.startup.failed"})
+
+        self._lifespan_task = asyncio.get_running_loop().create_task(run())
+        message = await started
+        if message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(f"ASGI lifespan startup failed: {message.get('message', '')}")
+
+    async def _shutdown(self) -> None:
+        if self._lifespan_done is not None:
+            self._lifespan_done.set()
+        if self._lifespan_task is not None:
+            await self._lifespan_task
+
+    # requisições
+
+    def handle(self, request: WzRequest) -> WzResponse:
+        status, headers, body = self.submit(self._call(self._scope(request), request.get_data())).result()
+        response = WzResponse(body, status=status)
+        response.headers.clear()
+        for name, value in headers:
+            response.headers.add(name.decode("latin-1"), value.decode("latin-1"))
+        return response
+
+    @staticmethod
+    def _scope(request: WzRequest) -> Dict[str, Any]:
+        environ = request.environ
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": environ.get("SERVER_PROTOCOL", "HTTP/1.1").partition("/")[2] or "1.1",
+            "method": request.method,
+            "scheme": request.scheme,
+            "path": request.path,
+            "raw_path": environ.get("RAW_URI", request.path).split("?", 1)[0].encode("latin-1"),
+            "query_string": request.query_string,
+            "root_path": "",
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in request.headers.items()],
+            "client": (request.remote_addr or "", 0),
+            "server": (environ.get("SERVER_NAME", ""), int(environ.get("SERVER_PORT") or 0)),
+        }
+
+    async def _call(self, scope: Dict[str, Any], body: bytes) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        finished = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # só "desconecta" depois que a resposta terminou (StreamingResponse escuta isso)
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finished.set()
+        return start.get("status", 500), list(start.get("headers", [])), b"".join(chunks)
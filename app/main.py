@@ -1,20 +1,78 @@
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routers.resources import router as resources_router
 from app.routers.relations import router as relations_router
+from app.routers.batch import router as batch_router
 from app.core.logging import setup_logging
-from app.core.errors import add_exception_handlers
+from app.core.errors import NotFoundError, add_exception_handlers
+from app.core.profiling import ProfilingMiddleware
+from app.core.request_context import RequestContextMiddleware
+from app.core import metrics, response_cache
+from app.core.config import METRICS_ENABLED, MIRROR_ENABLED, MIRROR_REFRESH_SECONDS, MIRROR_SNAPSHOT_PATH
+from app.services import disk_cache, mirror, search_index, swapi_client, upstream_policy
 
 setup_logging()
 
+logger = logging.getLogger(__name__)
+
+def _load_snapshot() -> bool:
+    if not MIRROR_SNAPSHOT_PATH:
+        return False
+    # import tardio: só quem usa snapshot paga por ele
+    from app.services.snapshot import load_snapshot
+    try:
+        return bool(load_snapshot(MIRROR_SNAPSHOT_PATH))
+    except Exception:
+        # sem snapshot a instância continua funcionando (SWAPI ao vivo)
+        logger.exception("Failed to load mirror snapshot from %s", MIRROR_SNAPSHOT_PATH)
+        return False
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # espelho pré-aquecido a partir do snapshot empacotado (sem chamar a SWAPI)
+    from_snapshot = _load_snapshot()
+    # um único client HTTP por processo (keep-alive / pool de conexões)
+    await swapi_client.open_client()
+    # espelho local da SWAPI, carregado e atualizado em background
+    refresher = None
+    if MIRROR_ENABLED:
+        delay = MIRROR_REFRESH_SECONDS if from_snapshot else 0
+        refresher = asyncio.create_task(mirror.run_refresher(initial_delay=delay))
+    try:
+        yield
+    finally:
+        if refresher is not None:
+            refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await refresher
+        await swapi_client.close_client()
+        # grava o que ainda está na fila do cache em disco
+        disk_cache.close_tier()
+
 app = FastAPI(
     title="StarWars API",
     version="1.0.0",
     description="API intermediária para consultas na SWAPI com filtros, ordenação e relações.",
+    lifespan=lifespan,
 )
 
+# Middlewares (o último adicionado é o mais externo: o cache de resposta
+# precisa enxergar os headers que o contexto da requisição acrescenta)
+# profiling (opt-in) por dentro de tudo: só o trabalho real da requisição
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(response_cache.ResponseCacheMiddleware)
+# métricas por fora de tudo: também medem os HITs do cache de respostas
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Routers
 app.include_router(resources_router, prefix="/v1")
 app.include_router(relations_router, prefix="/v1")
+app.include_router(batch_router, prefix="/v1")
 
 # Exception handlers
 add_exception_handlers(app)
@@ -31,3 +89,23 @@ def root():
 @app.get("/health", tags=["health"])
 def health():
     return {"status": "ok"}
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+def metrics_endpoint():
+    if not METRICS_ENABLED:
+        raise NotFoundError("Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/upstream", tags=["health"])
+def health_upstream():
+    return {
+        "pool": swapi_client.pool_stats(),
+        "singleflight": swapi_client.singleflight_stats(),
+        "cache": swapi_client.cache_stats(),
+        "stale": swapi_client.stale_stats(),
+        "policy": upstream_policy.stats(),
+        "disk": disk_cache.stats(),
+        "mirror": mirror.stats(),
+        "search": search_index.stats(),
+        "responses": response_cache.stats(),
+    }
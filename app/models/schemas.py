@@ -6,6 +6,10 @@ class Meta(BaseModel):
     order: Optional[str] = None
     filters_applied: Dict[str, Any] = Field(default_factory=dict)
     included: List[str] = Field(default_factory=list)
+    source: Optional[str] = None  # "mirror" (cópia local) ou "upstream" (SWAPI ao vivo)
+    stats: Dict[str, int] = Field(default_factory=dict)  # ex.: upstream_fetches, relations_unique
+    include_truncated: bool = False  # orçamento de relações esgotado: parte ficou como URL
+    plan: Optional[Dict[str, Any]] = None  # plano de execução (só com debug=true)
 
 class PaginatedResponse(BaseModel):
     resource: str
@@ -14,5 +18,31 @@ class PaginatedResponse(BaseModel):
     page_size: int
     next: Optional[str] = None
     previous: Optional[str] = None
+    next_cursor: Optional[str] = None  # paginação por chave (com page_size/cursor)
     results: List[Dict[str, Any]]
     meta: Meta = Field(default_factory=Meta)
+
+class AggregateResponse(BaseModel):
+    resource: str
+    group_by: List[str]
+    metrics: List[str]                        # ex.: ["count", "avg_height"]
+    count: int                                # linhas que passaram nos filtros
+    groups: List[Dict[str, Any]]              # {"key": {campo: valor}, "count": ..., "avg_height": ...}
+    version: int                              # versão do espelho usada no cálculo
+
+class BatchQuery(BaseModel):
+    id: Optional[str] = None  # devolvido no resultado (default: posição na lista)
+    path: str                 # ex.: "/v1/resources/people?sort=name&include=homeworld"
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+
+class BatchResult(BaseModel):
+    id: str
+    status: int
+    body: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchResult]
+    stats: Dict[str, int] = Field(default_factory=dict)
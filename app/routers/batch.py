@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from fastapi import APIRouter
+from app.core.config import BATCH_MAX_CONCURRENCY, BATCH_MAX_QUERIES, MAX_INCLUDE_FETCHES
+from app.core.errors import BadRequestError, NotFoundError, UpstreamError
+from app.core.request_context import scoped, upstream_fetches
+from app.core.responses import FastJSONResponse, fast_path_enabled
+from app.models.schemas import BatchRequest, BatchResponse
+from app.routers.relations import film_characters_body
+from app.routers.resources import check_resource, item_body, listing_body
+from app.services.filters import FILTER_SPECS_BY_PARAM
+from app.services.loader import RelationLoader
+from app.services.query import FilmCharactersQuery, ResourceQuery, parse_csv
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["batch"])
+
+# rotas que podem ser chamadas dentro de um batch
+_RESOURCE_LIST = re.compile(r"^/v1/resources/([A-Za-z]+)/?$")
+_RESOURCE_ITEM = re.compile(r"^/v1/resources/([A-Za-z]+)/(\d+)/?$")
+_FILM_CHARACTERS = re.compile(r"^/v1/films/(\d+)/characters/?$")
+
+def _int(params: Dict[str, str], name: str, default: Optional[int]) -> Optional[int]:
+    raw = params.get(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise BadRequestError(f"Invalid integer for {name}: {raw}")
+
+def _filters(params: Dict[str, str]) -> Dict[str, Any]:
+    # mesmos tipos do `filter_params` da rota GET (min/max como int), senão o cursor não bate
+    filters: Dict[str, Any] = {}
+    for name, spec in FILTER_SPECS_BY_PARAM.items():
+        if params.get(name, "") != "":
+            filters[name] = params[name] if spec.op == "eq" else _int(params, name, None)
+    return filters
+
+def _bool(params: Dict[str, str], name: str) -> bool:
+    return params.get(name, "").lower() in {"1", "true", "yes", "on"}
+
+async def _run_query(path: str, loader: RelationLoader) -> Dict[str, Any]:
+    """Executa uma sub-consulta com a mesma semântica da rota GET correspondente."""
+    parts = urlsplit(path)
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+    if m := _RESOURCE_LIST.match(parts.path):
+        query = ResourceQuery(
+            resource=check_resource(m.group(1)),
+            search=params.get("search") or None,
+            page=_int(params, "page", 1),
+            sort=params.get("sort") or None,
+            order=params.get("order", "asc"),
+            fields=parse_csv(params.get("fields")),
+            include=parse_csv(params.get("include")),
+            filters=_filters(params),
+            page_size=_int(params, "page_size", None),
+            cursor=params.get("cursor") or None,
+        )
+        link = lambda **extra: f"{parts.path}?{urlencode({**params, **extra})}"  # noqa: E731
+        return await listing_body(query, link, debug=_bool(params, "debug"), loader=loader)
+
+    if m := _RESOURCE_ITEM.match(parts.path):
+        resource = check_resource(m.group(1))
+        fields, include = parse_csv(params.get("fields")), parse_csv(params.get("include"))
+        return await item_body(resource, int(m.group(2)), fields, include, loader)
+
+    if m := _FILM_CHARACTERS.match(parts.path):
+        query = FilmCharactersQuery(
+            film_id=int(m.group(1)),
+            sort=params.get("sort", "name"),
+            order=params.get("order", "asc"),
+            fields=parse_csv(params.get("fields")),
+            page=_int(params, "page", 1),
+            page_size=_int(params, "page_size", 10),
+            cursor=params.get("cursor") or None,
+        )
+        return await film_characters_body(query, debug=_bool(params, "debug"), loader=loader)
+
+    raise NotFoundError(f"Unsupported batch path: {parts.path}")
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch(request: BatchRequest):
+    """
+    Várias consultas numa única requisição: rodam em paralelo (até
+    `BATCH_MAX_CONCURRENCY` por vez) e compartilham os resultados de relações,
+    então uma URL pedida por mais de uma sub-consulta é buscada uma vez só.
+    Cada sub-consulta tem o próprio orçamento de include (`MAX_INCLUDE_FETCHES`)
+    e as próprias estatísticas; os totais ficam em `stats`.
+    Erros são por sub-consulta e não derrubam o batch.
+    """
+    queries = request.queries
+    if not queries:
+        raise BadRequestError("queries must not be empty")
+    if len(queries) > BATCH_MAX_QUERIES:
+        raise BadRequestError(f"Too many queries: {len(queries)} (max {BATCH_MAX_QUERIES})")
+
+    shared = RelationLoader()
+    loaders = [RelationLoader(budget=MAX_INCLUDE_FETCHES, shared_with=shared) for _ in queries]
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run(position: int, path: str, query_id: Optional[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"id": query_id if query_id is not None else str(position)}
+        async with semaphore:
+            try:
+                with scoped():
+                    result.update(status=200, body=await _run_query(path, loaders[position]))
+            except BadRequestError as exc:
+                result.update(status=400, error=exc.message)
+            except NotFoundError as exc:
+                result.update(status=404, error=exc.message)
+            except UpstreamError as exc:
+                result.update(status=exc.status_code, error=exc.message)
+            except Exception:
+                logger.exception("Batch query failed: %s", path)
+                result.update(status=500, error="Internal error")
+        return result
+
+    results = await asyncio.gather(*(run(i, q.path, q.id) for i, q in enumerate(queries)))
+    body = {
+        "results": results,
+        "stats": {
+            "queries": len(queries),
+            "upstream_fetches": upstream_fetches(),
+            # cada URL é buscada por uma sub-consulta só: a soma dá o total do batch
+            **{key: sum(loader.stats()[key] for loader in loaders) for key in loaders[0].stats()},
+        },
+    }
+    if fast_path_enabled():
+        return FastJSONResponse(body)
+    return BatchResponse(**body)
@@ -1,11 +1,22 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 from fastapi import APIRouter
-from app.core.errors import BadRequestError
-from app.services.swapi_client import get_json
-from app.services.sorting import sort_items
+from app.core.responses import FastJSONResponse, fast_path_enabled
+from app.services.loader import RelationLoader
+from app.services.query import FilmCharactersQuery, parse_csv, plan_film_characters, run_film_characters
 
 router = APIRouter(tags=["relations"])
 
+async def film_characters_body(
+    query: FilmCharactersQuery,
+    debug: bool = False,
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    plan = plan_film_characters(query)
+    data = await run_film_characters(query, plan, loader)
+    if debug:
+        data["plan"] = plan.to_dict()
+    return data
+
 @router.get("/films/{film_id}/characters")
 async def film_characters(
     film_id: int,
@@ -14,35 +25,19 @@ async def film_characters(
     fields: Optional[str] = None,
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    debug: bool = False,
 ):
-    if page < 1:
-        raise BadRequestError("page must be >= 1")
-    if page_size < 1 or page_size > 100:
-        raise BadRequestError("page_size must be between 1 and 100")
-
-    film = await get_json(f"films/{film_id}/")
-
-    characters_urls: List[str] = film.get("characters", [])
-    characters: List[Dict[str, Any]] = []
-    for url in characters_urls:
-        characters.append(await get_json(url))
-
-    characters = sort_items(characters, sort=sort, order=order)
-
-    if fields:
-        wanted = [x.strip() for x in fields.split(",") if x.strip()]
-        characters = [{k: c.get(k) for k in wanted if k in c} for c in characters]
-
-    total = len(characters)
-    start = (page - 1) * page_size
-    end = start + page_size
-    paged = characters[start:end]
-
-    return {
-        "film_id": film_id,
-        "film_title": film.get("title"),
-        "count": total,
-        "page": page,
-        "page_size": len(paged),
-        "results": paged,
-    }
+    query = FilmCharactersQuery(
+        film_id=film_id,
+        sort=sort,
+        order=order,
+        fields=parse_csv(fields),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    )
+    data = await film_characters_body(query, debug)
+    if fast_path_enabled():
+        return FastJSONResponse(data)
+    return data
@@ -1,34 +1,34 @@
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Query
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from app.core.config import SUPPORTED_RESOURCES
 from app.core.errors import BadRequestError
-from app.models.schemas import PaginatedResponse, Meta
+from app.core.request_context import stage
+from app.core.responses import FastJSONResponse, dumps, fast_path_enabled
+from app.models.schemas import AggregateResponse, PaginatedResponse, Meta
+from app.services import aggregate, mirror
 from app.services.swapi_client import get_json
-from app.services.filters import apply_filters
-from app.services.sorting import sort_items
 from app.services.enrich import enrich_item
+from app.services.loader import RelationLoader
+from app.services.query import (
+    ResourceQuery,
+    export_pages,
+    parse_csv,
+    plan_resource_query,
+    pushdown_include,
+    run_resource_query,
+    select_fields,
+)
 
 router = APIRouter(tags=["resources"])
 
-def _parse_csv(value: Optional[str]) -> List[str]:
-    if not value:
-        return []
-    return [x.strip() for x in value.split(",") if x.strip()]
-
-def _select_fields(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
-    if not fields:
-        return item
-    return {k: item.get(k) for k in fields if k in item}
+def check_resource(resource: str) -> str:
+    resource = resource.lower()
+    if resource not in SUPPORTED_RESOURCES:
+        raise BadRequestError(f"Unsupported resource: {resource}. Use one of {sorted(SUPPORTED_RESOURCES)}")
+    return resource
 
-@router.get("/resources/{resource}", response_model=PaginatedResponse)
-async def list_resource(
-    resource: str,
-    search: Optional[str] = None,
-    page: int = 1,
-    sort: Optional[str] = None,
-    order: str = "asc",
-    fields: Optional[str] = None,
-    include: Optional[str] = None,
+def filter_params(
     # filtros genéricos (você pode expandir conforme o recurso)
     gender: Optional[str] = None,
     eye_color: Optional[str] = None,
@@ -40,18 +40,7 @@ async def list_resource(
     max_height: Optional[int] = None,
     min_population: Optional[int] = None,
     max_population: Optional[int] = None,
-):
-    resource = resource.lower()
-    if resource not in SUPPORTED_RESOURCES:
-        raise BadRequestError(f"Unsupported resource: {resource}. Use one of {sorted(SUPPORTED_RESOURCES)}")
-
-    params: Dict[str, Any] = {"page": page}
-    if search:
-        params["search"] = search
-
-    swapi_data = await get_json(f"{resource}/", params=params)
-
-    results: List[Dict[str, Any]] = swapi_data.get("results", [])
+) -> Dict[str, Any]:
     filters_dict = {
         "gender": gender,
         "eye_color": eye_color,
@@ -64,37 +53,149 @@ async def list_resource(
         "min_population": min_population,
         "max_population": max_population,
     }
+    return {k: v for k, v in filters_dict.items() if v is not None}
 
-    # filtros locais (porque SWAPI não suporta tudo)
-    filtered = apply_filters(results, {k: v for k, v in filters_dict.items() if v is not None})
+async def listing_body(
+    query: ResourceQuery,
+    link: Callable[..., str],
+    debug: bool = False,
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    """Corpo de `PaginatedResponse` (também usado pelas sub-consultas de `/batch`)."""
+    plan = plan_resource_query(query)
+    data = await run_resource_query(query, plan, link=link, loader=loader)
 
-    # ordenação local
-    sorted_items = sort_items(filtered, sort=sort, order=order)
+    stats = data.pop("stats")
+    meta = Meta(
+        sort=query.sort,
+        order=query.order,
+        filters_applied=query.filters,
+        included=query.include,
+        source=plan.source,
+        stats=stats,
+        include_truncated=bool(stats.get("include_truncated")),
+        plan=plan.to_dict() if debug else None,
+    )
+    return {**data, "meta": meta.model_dump()}
 
-    include_list = _parse_csv(include)
-    fields_list = _parse_csv(fields)
+async def item_body(
+    resource: str,
+    item_id: int,
+    fields: List[str],
+    include: List[str],
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    store = mirror.get_store(resource)
+    item = store.get(item_id) if store is not None else None
+    if item is None:
+        # fora do espelho (ex.: criado depois da última atualização): a SWAPI decide o 404
+        item = await get_json(f"{resource}/{item_id}/")
 
-    # enrich + field selection
-    final_results: List[Dict[str, Any]] = []
-    for item in sorted_items:
-        enriched = await enrich_item(item, include_list)
-        projected = _select_fields(enriched, fields_list) if fields_list else enriched
-        final_results.append(projected)
+    include, _ = pushdown_include(include, fields)
+    with stage("enrich"):
+        enriched = await enrich_item(item, include, loader)
+    return select_fields(enriched, fields)
 
-    meta = Meta(
+@router.get("/resources/{resource}", response_model=PaginatedResponse)
+async def list_resource(
+    request: Request,
+    resource: str,
+    search: Optional[str] = None,
+    page: int = 1,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    filters: Dict[str, Any] = Depends(filter_params),
+    debug: bool = False,
+):
+    resource = check_resource(resource)
+
+    query = ResourceQuery(
+        resource=resource,
+        search=search,
+        page=page,
         sort=sort,
         order=order,
-        filters_applied={k: v for k, v in filters_dict.items() if v is not None},
-        included=include_list,
+        fields=parse_csv(fields),
+        include=parse_csv(include),
+        filters=filters,
+        page_size=page_size,
+        cursor=cursor,
     )
+    body = await listing_body(query, link=lambda **params: str(request.url.include_query_params(**params)), debug=debug)
+
+    if fast_path_enabled():
+        # dados já confiáveis (SWAPI/cache): evita revalidar cada linha de `results`
+        return FastJSONResponse(body)
+    return PaginatedResponse(**body)
 
-    return PaginatedResponse(
+@router.get("/resources/{resource}/export", response_class=StreamingResponse)
+async def export_resource(
+    resource: str,
+    search: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    filters: Dict[str, Any] = Depends(filter_params),
+):
+    """Recurso inteiro em NDJSON (uma linha JSON por item), enviado em streaming."""
+    resource = check_resource(resource)
+    query = ResourceQuery(
         resource=resource,
-        count=swapi_data.get("count", len(final_results)),
-        page=page,
-        page_size=len(final_results),
-        next=swapi_data.get("next"),
-        previous=swapi_data.get("previous"),
-        results=final_results,
-        meta=meta,
+        search=search,
+        sort=sort,
+        order=order,
+        fields=parse_csv(fields),
+        include=parse_csv(include),
+        filters=filters,
     )
+    pages = export_pages(query)
+    # o primeiro bloco sai antes dos headers: erros (400/404/502) ainda viram status HTTP
+    first = await anext(pages, None)
+
+    async def ndjson():
+        if first is None:
+            return
+        yield b"".join(dumps(row) + b"\n" for row in first)
+        async for chunk in pages:
+            yield b"".join(dumps(row) + b"\n" for row in chunk)
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/resources/{resource}/aggregate", response_model=AggregateResponse)
+async def aggregate_resource(
+    resource: str,
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    search: Optional[str] = None,
+    filters: Dict[str, Any] = Depends(filter_params),
+):
+    """
+    Estatísticas sobre o recurso inteiro (cópia local), sem paginar pela SWAPI.
+    `metrics`: `count`, `sum|avg|min|max:campo` separados por vírgula (ex.: `count,avg:height`).
+    """
+    resource = check_resource(resource)
+    specs = aggregate.parse_metrics(metrics)
+    store = await mirror.ensure_loaded(resource)
+    with stage("aggregate"):
+        body = aggregate.aggregate(store, parse_csv(group_by), specs, filters, search)
+    if fast_path_enabled():
+        return FastJSONResponse(body)
+    return AggregateResponse(**body)
+
+@router.get("/resources/{resource}/{item_id:int}")
+async def get_resource_item(
+    resource: str,
+    item_id: int,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+):
+    resource = check_resource(resource)
+    body = await item_body(resource, item_id, parse_csv(fields), parse_csv(include))
+    if fast_path_enabled():
+        return FastJSONResponse(body)
+    return body
@@ -0,0 +1,128 @@
+"""
+Agregações (`/resources/{resource}/aggregate`) sobre a cópia local do recurso.
+
+- grupos: uma passada pelas linhas que passaram nos filtros, agrupando pela
+  tupla de valores (originais) dos campos de `group_by`: só existem os grupos
+  que têm linhas, qualquer que seja a cardinalidade dos campos;
+- métricas: colunas `array("d")` convertidas uma vez por versão do espelho;
+  linhas sem valor ("unknown") ficam de fora de sum/avg/min/max;
+- filtros e `search` reduzem o bitmap antes de agrupar;
+- o resultado fica memoizado pela versão do recurso: só é recalculado quando
+  os dados mudam (ou o TTL passa).
+"""
+from math import fsum
+from typing import Any, Dict, List, Optional, Tuple
+from app.core import metrics
+from app.core.config import CACHE_TTL_LIST_SECONDS
+from app.core.errors import BadRequestError
+from app.services import filter_engine, mirror, search_index
+from app.services.cache import TTLCache
+from app.services.query import parse_csv
+
+OPS = ("count", "sum", "avg", "min", "max")
+MAX_GROUP_BY = 3
+
+_results = TTLCache(ttl_seconds=CACHE_TTL_LIST_SECONDS, max_entries=256)
+metrics.register_cache("aggregates", _results)
+
+def parse_metrics(value: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """"count,avg:height,max:mass" -> [("count", None), ("avg", "height"), ("max", "mass")]"""
+    parsed: List[Tuple[str, Optional[str]]] = []
+    for spec in parse_csv(value) or ["count"]:
+        op, _, field = spec.partition(":")
+        op, field = op.strip().lower(), field.strip()
+        if op not in OPS:
+            raise BadRequestError(f"Invalid metric: {spec}. Use one of {list(OPS)} as op or op:field")
+        if op != "count" and not field:
+            raise BadRequestError(f"Metric {op} requires a field (e.g. {op}:height)")
+        parsed.append((op, field or None))
+    return list(dict.fromkeys(parsed))
+
+def metric_name(op: str, field: Optional[str]) -> str:
+    return f"{op}_{field}" if field else op
+
+def _check_fields(items: List[Dict[str, Any]], group_by: List[str], specs: List[Tuple[str, Optional[str]]]) -> None:
+    if len(group_by) > MAX_GROUP_BY:
+        raise BadRequestError(f"group_by accepts at most {MAX_GROUP_BY} fields")
+    known = set().union(*(item.keys() for item in items)) if items else set()
+    for field in group_by + [f for _, f in specs if f]:
+        if items and field not in known:
+            raise BadRequestError(f"Unknown field: {field}")
+    for field in group_by:
+        if any(isinstance(item.get(field), (list, dict)) for item in items):
+            raise BadRequestError(f"Cannot group by {field}: it is a list of relations")
+
+def _number(value: float) -> Any:
+    return int(value) if value.is_integer() else value
+
+def _group_order(key: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    # valores de tipos diferentes (ou None) não se comparam direto
+    return tuple((v is None, str(v).lower()) for v in key)
+
+def _compute(index: filter_engine.ColumnarIndex, rows: List[int], specs: List[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for op, field in specs:
+        name = metric_name(op, field)
+        if field is None:
+            out[name] = len(rows)
+            continue
+        column, _ = index.float_column(field)
+        values = [v for v in (column[r] for r in rows) if v == v]  # NaN = sem valor
+        if op == "count":
+            out[name] = len(values)
+        elif not values:
+            out[name] = None
+        elif op == "sum":
+            out[name] = _number(fsum(values))
+        elif op == "avg":
+            out[name] = round(fsum(values) / len(values), 4)
+        elif op == "min":
+            out[name] = _number(min(values))
+        else:
+            out[name] = _number(max(values))
+    return out
+
+def aggregate(
+    store: mirror.ResourceStore,
+    group_by: List[str],
+    specs: List[Tuple[str, Optional[str]]],
+    filters: Dict[str, Any],
+    search: Optional[str] = None,
+) -> Dict[str, Any]:
+    key = f"{store.resource}|{store.version}|{group_by}|{specs}|{sorted(filters.items())}|{search}"
+    cached = _results.get(key)
+    if cached is not None:
+        return cached
+
+    _check_fields(store.items, group_by, specs)
+    index = filter_engine.get_index(store)
+    mask = index.match_mask(filters)
+    if search_index.has_terms(search):
+        mask &= search_index.rows_mask(search_index.search_rows(store, search))
+
+    rows = filter_engine.rows_of(mask)
+    buckets: Dict[Tuple[Any, ...], List[int]] = {}
+    for row in rows:
+        item = store.items[row]
+        buckets.setdefault(tuple(item.get(field) for field in group_by), []).append(row)
+    if not group_by:
+        buckets = {(): rows}
+
+    groups = [
+        {"key": dict(zip(group_by, key)), **_compute(index, buckets[key], specs)}
+        for key in sorted(buckets, key=_group_order)
+    ]
+
+    result = {
+        "resource": store.resource,
+        "group_by": group_by,
+        "metrics": [metric_name(op, field) for op, field in specs],
+        "count": len(rows),
+        "groups": groups,
+        "version": store.version,
+    }
+    _results.set(key, result, size=256 * len(groups))
+    return result
+
+def clear() -> None:
+    _results.clear()
@@ -1,20 +1,179 @@
+import logging
 import time
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def estimate_size(value: Any) -> int:
+    """Estimativa barata (em bytes) do tamanho serializado de um valor JSON."""
+    if isinstance(value, dict):
+        return 2 + sum(estimate_size(k) + estimate_size(v) + 2 for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(estimate_size(v) + 1 for v in value)
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 8
+
+class _Entry:
+    __slots__ = ("expires_at", "value", "size")
+
+    def __init__(self, expires_at: float, value: Any, size: int):
+        self.expires_at = expires_at
+        self.value = value
+        self.size = size
 
 class TTLCache:
-    def __init__(self, ttl_seconds: int):
+    """
+    Cache em memória com TTL e despejo LRU.
+
+    - `max_entries` / `max_bytes` limitam o cache (0 ou None = sem limite);
+      ao estourar, as entradas menos usadas recentemente são removidas.
+    - `namespace_ttls` permite TTLs diferentes por tipo de chave
+      (ex.: entidades vs. páginas de listagem/busca).
+    - entradas expiradas são varridas periodicamente (a cada
+      `sweep_interval_seconds`, aproveitando as escritas), não só na leitura.
+    - com `max_stale_seconds`, entradas expiradas continuam guardadas por esse
+      tempo e podem ser lidas via `get_stale` (stale-while-revalidate /
+      servir dado velho quando a origem falha).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        namespace_ttls: Optional[Dict[str, int]] = None,
+        sweep_interval_seconds: float = 30,
+        max_stale_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.ttl = ttl_seconds
-        self._store: Dict[str, Tuple[float, Any]] = {}
+        self.max_entries = max_entries or 0
+        self.max_bytes = max_bytes or 0
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.sweep_interval = sweep_interval_seconds
+        self.max_stale = max_stale_seconds
+        self._clock = clock
+        self._store: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = clock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def ttl_for(self, namespace: Optional[str]) -> int:
+        if namespace is None:
+            return self.ttl
+        return self.namespace_ttls.get(namespace, self.ttl)
 
     def get(self, key: str) -> Optional[Any]:
-        item = self._store.get(key)
-        if not item:
+        entry = self._store.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        now = self._clock()
+        if now > entry.expires_at:
+            if now > entry.expires_at + self.max_stale:
+                self._remove(key)
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+        self._store.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry.value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Como `get`, mas sem contar hit/miss nem mexer na ordem LRU."""
+        entry = self._store.get(key)
+        if entry is None or self._clock() > entry.expires_at:
             return None
-        expires_at, value = item
-        if time.time() > expires_at:
-            self._store.pop(key, None)
+        return entry.value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Retorna o valor mesmo expirado, desde que dentro de `max_stale_seconds`."""
+        entry = self._store.get(key)
+        if entry is None or self._clock() > entry.expires_at + self.max_stale:
             return None
-        return value
+        return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        now = self._clock()
+        if ttl is None:
+            ttl = self.ttl_for(namespace)
+        if size is None:
+            size = estimate_size(value)
+
+        if key in self._store:
+            self._remove(key)
+        self._store[key] = _Entry(now + ttl, value, size)
+        self._bytes += size
+
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+        self._enforce_limits()
+
+    def delete(self, key: str) -> None:
+        if key in self._store:
+            self._remove(key)
+
+    def sweep(self) -> int:
+        """Remove todas as entradas expiradas (além da janela stale); retorna quantas saíram."""
+        now = self._clock()
+        self._last_sweep = now
+        expired = [k for k, e in self._store.items() if now > e.expires_at + self.max_stale]
+        for k in expired:
+            self._remove(k)
+        self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": (self._stats["hits"] / lookups) if lookups else 0.0,
+            "entries": len(self._store),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key)
+        self._bytes -= entry.size
+
+    def _enforce_limits(self) -> None:
+        while self._store and (
+            (self.max_entries and len(self._store) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._store))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+def create_cache(backend: str = "memory", shared_path: str = "", **kwargs: Any):
+    """
+    Cria o cache conforme o backend: "memory" (TTLCache, por processo) ou
+    "shared" (SharedCache, comum aos workers do host). Mesmos argumentos do TTLCache.
+    """
+    if backend == "shared":
+        from app.services.shared_cache import SharedCache  # import tardio: shared_cache importa este módulo
 
-    def set(self, key: str, value: Any) -> None:
-        self._store[key] = (time.time() + self.ttl, value)
+        return SharedCache(shared_path, **kwargs)
+    if backend != "memory":
+        logger.warning("Unknown cache backend %r, falling back to memory", backend)
+    return TTLCache(**kwargs)
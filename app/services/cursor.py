@@ -0,0 +1,48 @@
+"""
+Cursores opacos para paginação por chave (keyset).
+
+O cursor guarda a posição da última linha entregue (valores da ordenação +
+desempate), não um offset: a próxima página começa logo depois dela com uma
+busca binária na ordenação pronta, em vez de refazer e fatiar a lista toda.
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Dict
+from app.core.errors import BadRequestError
+
+def fingerprint(*parts: Any) -> str:
+    """Identifica a consulta (recurso, filtros, ordenação...) à qual o cursor pertence."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+def encode_cursor(fp: str, **payload: Any) -> str:
+    raw = json.dumps({"f": fp, **payload}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def decode_cursor(token: str, fp: str, position: str = "r", size: int = 0, sort_fields: int = 0) -> Dict[str, Any]:
+    """
+    Valida e abre o cursor. `position` é a chave da última linha entregue ("r" ou
+    "i"), que precisa estar em [0, size); `k` traz um valor por campo de ordenação.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except Exception:
+        raise BadRequestError("Invalid cursor")
+    if not isinstance(payload, dict):
+        raise BadRequestError("Invalid cursor")
+    if payload.get("f") != fp:
+        # cursor gerado para outra combinação de filtros/ordenação
+        raise BadRequestError("Cursor does not match this query")
+
+    pos, page, keys = payload.get(position), payload.get("n"), payload.get("k")
+    if not (_is_int(pos) and 0 <= pos < size) or not (_is_int(page) and page >= 1):
+        raise BadRequestError("Invalid cursor")
+    if not isinstance(keys, list) or len(keys) != sort_fields:
+        raise BadRequestError("Invalid cursor")
+    if any(k is not None and not isinstance(k, (str, int, float)) for k in keys):
+        raise BadRequestError("Invalid cursor")
+    return payload
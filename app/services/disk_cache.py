@@ -0,0 +1,304 @@
+"""
+Segundo nível do cache da SWAPI, em disco local (SQLite), para instâncias novas
+não começarem do zero (cold start do Cloud Functions, scale-out do Cloud Run).
+
+- leitura preguiçosa: só consulta o disco quando a memória não tem a chave
+  (lookup pela chave primária, dezenas de µs); o valor sobe para a memória;
+- escrita fora do caminho da requisição: `put` só enfileira; uma thread
+  serializa e grava em lotes (uma transação por lote). Fila cheia = descarta;
+- serialização compacta: orjson + zlib (nível 1) acima de `COMPRESS_MIN_BYTES`;
+- TTL e tamanho próprios (`DISK_CACHE_TTL_SECONDS`, `DISK_CACHE_MAX_BYTES`):
+  expirados e os mais antigos saem na manutenção feita pela thread de escrita.
+  O TTL do disco é só o teto de retenção: a leitura devolve a idade da entrada
+  e o `swapi_client` aplica o TTL do namespace (mais velha = stale);
+- `DISK_CACHE_SEED_PATH`: arquivo pronto empacotado na imagem; copiado para
+  `DISK_CACHE_PATH` (gravável, ex.: /tmp) na primeira abertura, com o relógio
+  das entradas reiniciado.
+
+Gerar o arquivo de seed (todas as páginas e entidades dos recursos):
+
+    python -m app.services.disk_cache data/swapi_cache.sqlite3 [resource ...]
+"""
+import asyncio
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core import metrics
+from app.core.config import (
+    DISK_CACHE_ENABLED,
+    DISK_CACHE_MAX_BYTES,
+    DISK_CACHE_PATH,
+    DISK_CACHE_SEED_PATH,
+    DISK_CACHE_TTL_SECONDS,
+    SUPPORTED_RESOURCES,
+)
+from app.core.responses import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = 512
+BATCH_SIZE = 256
+QUEUE_SIZE = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    codec INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+"""
+
+_RAW, _ZLIB = 0, 1
+
+def encode_value(value: Any) -> Tuple[int, bytes]:
+    """(codec, bytes): orjson, comprimido com zlib quando passa de `COMPRESS_MIN_BYTES`."""
+    raw = dumps(value)
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return _ZLIB, zlib.compress(raw, 1)
+    return _RAW, raw
+
+def decode_value(codec: int, body: bytes) -> Any:
+    raw = zlib.decompress(body) if codec == _ZLIB else body
+    return loads(raw)
+
+class DiskCache:
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = DISK_CACHE_TTL_SECONDS,
+        max_bytes: int = DISK_CACHE_MAX_BYTES,
+        seed_path: str = "",
+        clock=time.time,  # relógio de parede: o arquivo sobrevive ao processo
+    ):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._stats = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "writes": 0, "dropped": 0}
+        self._bytes = 0
+        self._entries = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        seeded = False
+        if seed_path and not os.path.exists(path) and os.path.exists(seed_path):
+            shutil.copyfile(seed_path, path)
+            seeded = True
+
+        # leitura no event loop (pode mudar de thread, ex.: ponte ASGI): uma conexão protegida por lock
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        self._reader.executescript(_SCHEMA)
+        if seeded:
+            # o seed foi gerado no build: o TTL conta a partir de agora
+            with self._reader:
+                self._reader.execute("UPDATE entries SET stored_at = ?", (self._clock(),))
+            logger.info("Disk cache seeded from %s", seed_path)
+        self._refresh_size(self._reader)
+
+        self._queue: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._write_loop, name="disk-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")  # leitores não esperam o escritor
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # leitura
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(valor, idade em segundos): quem lê decide se a idade serve para o namespace."""
+        with self._read_lock:
+            row = self._reader.execute("SELECT stored_at, codec, body FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        stored_at, codec, body = row
+        age = self._clock() - stored_at
+        if age >= self.ttl:
+            # a remoção fica para a manutenção (fora do caminho da requisição)
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return decode_value(codec, body), age
+
+    # escrita (thread própria)
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            self._queue.put_nowait((key, value))
+        except queue.Full:
+            self._stats["dropped"] += 1
+
+    def flush(self) -> None:
+        """Espera a fila esvaziar (testes, CLI e shutdown)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                batch: List[Tuple[str, Any]] = []
+                stop = item is None
+                if item is not None:
+                    batch.append(item)
+                while len(batch) < BATCH_SIZE and not stop:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                    else:
+                        batch.append(item)
+                try:
+                    if batch:
+                        self._write_batch(conn, batch)
+                except Exception:
+                    logger.exception("Failed to write %d entries to disk cache %s", len(batch), self.path)
+                finally:
+                    for _ in range(len(batch) + (1 if stop else 0)):
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, Any]]) -> None:
+        now = self._clock()
+        rows = []
+        for key, value in batch:
+            codec, body = encode_value(value)
+            rows.append((key, now, codec, len(body), body))
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO entries (key, stored_at, codec, size, body) VALUES (?, ?, ?, ?, ?)", rows)
+        self._stats["writes"] += len(rows)
+        self._maintain(conn)
+
+    def _maintain(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.execute("BEGIN")
+            expired = conn.execute("DELETE FROM entries WHERE stored_at <= ?", (self._clock() - self.ttl,)).rowcount
+            self._refresh_size(conn)
+            # acima do limite: remove as mais antigas até ficar em 90% dele
+            while self.max_bytes and self._bytes > self.max_bytes and self._entries:
+                over = self._bytes - int(self.max_bytes * 0.9)
+                victims = conn.execute(
+                    "SELECT key, size FROM entries ORDER BY stored_at LIMIT ?", (BATCH_SIZE,)
+                ).fetchall()
+                chosen, freed = [], 0
+                for key, size in victims:
+                    chosen.append((key,))
+                    freed += size
+                    if freed >= over:
+                        break
+                conn.executemany("DELETE FROM entries WHERE key = ?", chosen)
+                self._stats["evictions"] += len(chosen)
+                self._refresh_size(conn)
+        self._stats["expirations"] += expired
+
+    def _refresh_size(self, conn: sqlite3.Connection) -> None:
+        self._entries, self._bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": self._entries,
+            "bytes": self._bytes,
+            "queued": self._queue.qsize(),
+            "ttl_seconds": self.ttl,
+            "max_bytes": self.max_bytes,
+            "path": self.path,
+        }
+
+# instância do processo, aberta na primeira leitura (só com DISK_CACHE_ENABLED)
+_tier: Optional[DiskCache] = None
+_tier_lock = threading.Lock()
+_tier_opened = False
+
+def get_tier() -> Optional[DiskCache]:
+    global _tier, _tier_opened
+    if _tier_opened or not DISK_CACHE_ENABLED:
+        return _tier
+    with _tier_lock:
+        if not _tier_opened:
+            try:
+                set_tier(DiskCache(DISK_CACHE_PATH, seed_path=DISK_CACHE_SEED_PATH))
+            except (OSError, sqlite3.Error):
+                # sem disco gravável o serviço segue só com a memória
+                logger.exception("Failed to open disk cache at %s", DISK_CACHE_PATH)
+                _tier_opened = True
+    return _tier
+
+def set_tier(tier: Optional[DiskCache]) -> None:
+    global _tier, _tier_opened
+    _tier, _tier_opened = tier, True
+    if tier is not None:
+        metrics.register_cache("disk", tier)
+
+def close_tier() -> None:
+    global _tier, _tier_opened
+    if _tier is not None:
+        _tier.close()
+        metrics.unregister_cache("disk")
+    _tier, _tier_opened = None, False
+
+def stats() -> Optional[Dict[str, Any]]:
+    return _tier.stats() if _tier is not None else None
+
+async def build_seed(path: str, resources: Optional[Sequence[str]] = None) -> int:
+    """Percorre as páginas dos recursos pela SWAPI e grava páginas + entidades no arquivo."""
+    from app.services import swapi_client
+
+    tier = DiskCache(path, ttl_seconds=float("inf"), max_bytes=0)
+    set_tier(tier)
+    try:
+        for resource in sorted(resources or SUPPORTED_RESOURCES):
+            page = 1
+            while True:
+                data = await swapi_client.get_json(f"{resource}/", params={"page": page})
+                for item in data.get("results", []):
+                    if item.get("url"):
+                        tier.put(swapi_client.cache_key_for(item["url"]), item)
+                if not data.get("next"):
+                    break
+                page += 1
+        tier.flush()
+        return tier.stats()["entries"]
+    finally:
+        close_tier()
+        await swapi_client.close_client()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m app.services.disk_cache <path> [resource ...]")
+    # via o módulo importado (não `__main__`): é ele que o swapi_client enxerga
+    from app.services import disk_cache
+
+    total = asyncio.run(disk_cache.build_seed(sys.argv[1], sys.argv[2:] or None))
+    print(f"{total} entries written to {sys.argv[1]}")
@@ -1,6 +1,7 @@
-from typing import Any, Dict, List, Set
-from app.core.config import MAX_INCLUDE_DEPTH
-from app.services.swapi_client import get_json
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import MAX_INCLUDE_DEPTH, MAX_INCLUDE_FETCHES
+from app.core.errors import BadRequestError
+from app.services.loader import RelationLoader
 
 RELATION_FIELDS = {
     # people
@@ -13,23 +14,37 @@ RELATION_FIELDS = {
     "characters": "characters",
     "planets": "planets",
     "starships": "starships",
+    # starships
+    "pilots": "pilots",
 }
 
-async def enrich_item(item: Dict[str, Any], include: List[str], _depth: int = 0, _seen: Set[str] | None = None) -> Dict[str, Any]:
-    if not include:
-        return item
-    if _depth >= MAX_INCLUDE_DEPTH:
-        return item
+IncludeTree = Dict[str, "IncludeTree"]
 
-    seen = _seen or set()
-    out = dict(item)
+def parse_include(include: List[str]) -> IncludeTree:
+    """
+    `["films.characters.homeworld", "starships"]` ->
+    `{"films": {"characters": {"homeworld": {}}}, "starships": {}}`
+    """
+    tree: IncludeTree = {}
+    for path in include:
+        parts = [p.strip() for p in path.split(".") if p.strip()]
+        if len(parts) > MAX_INCLUDE_DEPTH:
+            raise BadRequestError(f"include path too deep: {path} (max depth {MAX_INCLUDE_DEPTH})")
+        node = tree
+        for part in parts:
+            node = node.setdefault(part, {})
+    return tree
 
-    for inc in include:
+def _relation_plan(item: Dict[str, Any], tree: IncludeTree) -> List[Tuple[str, bool, List[str], IncludeTree]]:
+    """(campo, é_url_única, urls, subárvore) de cada include presente no item."""
+    seen = set()
+    plan: List[Tuple[str, bool, List[str], IncludeTree]] = []
+    for inc, subtree in tree.items():
         field = RELATION_FIELDS.get(inc)
         if not field:
             continue
 
-        value = out.get(field)
+        value = item.get(field)
         if not value:
             continue
 
@@ -38,14 +53,75 @@ async def enrich_item(item: Dict[str, Any], include: List[str], _depth: int = 0,
             if value in seen:
                 continue
             seen.add(value)
-            out[field] = await get_json(value)
+            plan.append((field, True, [value], subtree))
         elif isinstance(value, list):
-            enriched = []
+            urls = []
             for url in value:
-                if url in seen:
+                if not isinstance(url, str) or url in seen:
                     continue
                 seen.add(url)
-                enriched.append(await get_json(url))
-            out[field] = enriched
+                urls.append(url)
+            plan.append((field, False, urls, subtree))
+    return plan
+
+async def enrich_items(
+    items: List[Dict[str, Any]],
+    include: List[str],
+    loader: Optional[RelationLoader] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Expande relações (inclusive caminhos aninhados) como uma busca em largura
+    no grafo da SWAPI: a cada nível, junta as URLs de todos os nós, busca cada
+    URL única uma só vez (em paralelo) e distribui o resultado.
+
+    - uma URL que já aparece entre os ancestrais do nó (ciclo) não é expandida;
+    - o loader tem um orçamento de relações por requisição; o que passar dele
+      continua como URL e `loader.truncated` fica verdadeiro.
+    """
+    tree = parse_include(include)
+    if not tree or not items:
+        return items
+
+    if loader is None:
+        loader = RelationLoader(budget=MAX_INCLUDE_FETCHES)
+    out = [dict(item) for item in items]
+    frontier: List[Tuple[Dict[str, Any], IncludeTree, Set[str]]] = [
+        (node, tree, {node["url"]} if isinstance(node.get("url"), str) else set()) for node in out
+    ]
+
+    while frontier:
+        level = []
+        wanted: List[str] = []
+        for node, subtree, ancestors in frontier:
+            for field, is_single, urls, child in _relation_plan(node, subtree):
+                level.append((node, field, is_single, urls, child, ancestors))
+                wanted.extend(u for u in urls if u not in ancestors)
+
+        allowed = set(loader.reserve(wanted))
+        to_load = [u for u in wanted if u in allowed]
+        resolved = dict(zip(to_load, await loader.load_many(to_load)))
+
+        next_frontier: List[Tuple[Dict[str, Any], IncludeTree, Set[str]]] = []
+        for node, field, is_single, urls, child, ancestors in level:
+            objs: List[Any] = []
+            for url in urls:
+                obj = resolved.get(url)
+                if obj is None:
+                    # ciclo ou orçamento esgotado: mantém a URL
+                    objs.append(url)
+                    continue
+                if child:
+                    obj = dict(obj)
+                    next_frontier.append((obj, child, ancestors | {url}))
+                objs.append(obj)
+            node[field] = objs[0] if is_single else objs
+        frontier = next_frontier
 
     return out
+
+async def enrich_item(
+    item: Dict[str, Any],
+    include: List[str],
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    return (await enrich_items([item], include, loader))[0]
@@ -0,0 +1,134 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.filters import FILTER_SPECS, Number, _to_int, parse_number
+from app.services.mirror import ResourceStore
+
+# campos indexados, derivados das specs declarativas
+EQ_FIELDS = sorted({s.field for s in FILTER_SPECS if s.op == "eq"})
+RANGE_FIELDS = sorted({s.field for s in FILTER_SPECS if s.op in ("min", "max")})
+
+def rows_of(mask: int, limit: Optional[int] = None) -> List[int]:
+    """Índices dos bits ligados, em ordem crescente (no máximo `limit`)."""
+    rows = []
+    while mask and (limit is None or len(rows) < limit):
+        low = mask & -mask
+        rows.append(low.bit_length() - 1)
+        mask ^= low
+    return rows
+
+def rows_after(mask: int, row: int, limit: int) -> List[int]:
+    """Até `limit` linhas de `mask` depois de `row` (paginação por chave sem ordenação)."""
+    return rows_of(mask >> (row + 1) << (row + 1), limit)
+
+class ColumnarIndex:
+    """
+    Índices colunares sobre a cópia local de um recurso:
+
+    - colunas numéricas já convertidas (`"unknown"` -> None, `"1,000"` -> 1000);
+    - índice hash (valor -> bitmap de linhas) para os filtros de igualdade;
+    - índice ordenado (valor, linha) para os filtros de intervalo.
+
+    Cada filtro vira um bitmap (int do Python) e o resultado é a interseção (&).
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], version: int = 0):
+        self.items = items
+        self.version = version
+        self.size = len(items)
+        self.all_mask = (1 << self.size) - 1
+
+        self.numeric: Dict[str, List[Optional[Number]]] = {}
+        self.arrays: Dict[str, Tuple["array[float]", int]] = {}
+        self.eq_index: Dict[str, Dict[str, int]] = {}
+        self.range_index: Dict[str, Tuple[List[Number], List[int]]] = {}
+
+        for field in EQ_FIELDS:
+            buckets: Dict[str, int] = {}
+            for row, item in enumerate(items):
+                if field in item:
+                    key = str(item[field]).lower()
+                    buckets[key] = buckets.get(key, 0) | (1 << row)
+            self.eq_index[field] = buckets
+
+        for field in RANGE_FIELDS:
+            column = [parse_number(item.get(field)) for item in items]
+            self.numeric[field] = column
+            pairs = sorted((v, row) for row, v in enumerate(column) if v is not None)
+            self.range_index[field] = ([v for v, _ in pairs], [row for _, row in pairs])
+
+    def column(self, field: str) -> List[Optional[Number]]:
+        """Coluna numérica (convertida uma única vez e reaproveitada)."""
+        col = self.numeric.get(field)
+        if col is None:
+            col = [parse_number(item.get(field)) for item in self.items]
+            self.numeric[field] = col
+        return col
+
+    def float_column(self, field: str) -> Tuple["array[float]", int]:
+        """Coluna numérica como `array("d")` + bitmap das linhas com valor (sem valor = NaN)."""
+        cached = self.arrays.get(field)
+        if cached is None:
+            col = self.column(field)
+            values = array("d", (float("nan") if v is None else v for v in col))
+            present = 0
+            for row, v in enumerate(col):
+                if v is not None:
+                    present |= 1 << row
+            cached = self.arrays[field] = (values, present)
+        return cached
+
+    def _eq_mask(self, field: str, value: Any) -> int:
+        index = self.eq_index.get(field)
+        if index is None:
+            val = str(value).lower()
+            return sum(1 << r for r, x in enumerate(self.items) if str(x.get(field, "")).lower() == val)
+        return index.get(str(value).lower(), 0)
+
+    def _range_mask(self, field: str, low: Optional[Number], high: Optional[Number]) -> int:
+        values, rows = self.range_index[field]
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        mask = 0
+        for row in rows[start:end]:
+            mask |= 1 << row
+        return mask
+
+    def match_mask(self, filters: Dict[str, Any]) -> int:
+        mask = self.all_mask
+        ranges: Dict[str, List[Optional[Number]]] = {}
+        for spec in FILTER_SPECS:
+            raw = filters.get(spec.param)
+            if raw is None:
+                continue
+            if spec.op == "eq":
+                mask &= self._eq_mask(spec.field, raw)
+            else:
+                bounds = ranges.setdefault(spec.field, [None, None])
+                bounds[0 if spec.op == "min" else 1] = _to_int(raw, spec.param)
+            if not mask:
+                return 0
+
+        for field, (low, high) in ranges.items():
+            mask &= self._range_mask(field, low, high)
+        return mask
+
+    def filter_rows(self, filters: Dict[str, Any]) -> List[int]:
+        if not filters:
+            return list(range(self.size))
+        return rows_of(self.match_mask(filters))
+
+    def filter(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not filters:
+            return self.items
+        return [self.items[r] for r in self.filter_rows(filters)]
+
+_indexes: Dict[str, ColumnarIndex] = {}
+
+def get_index(store: ResourceStore) -> ColumnarIndex:
+    """Índice do recurso, reconstruído só quando a versão do espelho muda."""
+    index = _indexes.get(store.resource)
+    if index is None or index.version != store.version:
+        index = ColumnarIndex(store.items, version=store.version)
+        _indexes[store.resource] = index
+    return index
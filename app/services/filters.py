@@ -1,45 +1,91 @@
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
 from app.core.errors import BadRequestError
 
+Number = Union[int, float]
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Filtro declarativo: parâmetro da query -> campo do item + operação ("eq", "min" ou "max")."""
+    param: str
+    field: str
+    op: str
+
+# para adicionar um filtro novo basta declarar aqui (e expor o parâmetro no router)
+FILTER_SPECS: List[FilterSpec] = [
+    FilterSpec("gender", "gender", "eq"),
+    FilterSpec("eye_color", "eye_color", "eq"),
+    FilterSpec("hair_color", "hair_color", "eq"),
+    FilterSpec("climate", "climate", "eq"),
+    FilterSpec("terrain", "terrain", "eq"),
+    FilterSpec("starship_class", "starship_class", "eq"),
+    FilterSpec("min_height", "height", "min"),
+    FilterSpec("max_height", "height", "max"),
+    FilterSpec("min_population", "population", "min"),
+    FilterSpec("max_population", "population", "max"),
+]
+FILTER_SPECS_BY_PARAM: Dict[str, FilterSpec] = {s.param: s for s in FILTER_SPECS}
+
+_NULL_STRINGS = {"", "unknown", "n/a", "none"}
+
+def parse_number(value: Any) -> Optional[Number]:
+    """
+    Converte os números em string da SWAPI: "172" -> 172, "1,000" -> 1000,
+    "2.5" -> 2.5; "unknown" / "n/a" / vazio -> None.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    s = str(value).strip().lower().replace(",", "")
+    if s in _NULL_STRINGS:
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
 def _to_int(value: Any, field_name: str) -> int:
     try:
         return int(str(value))
     except Exception:
         raise BadRequestError(f"Invalid integer for {field_name}: {value}")
 
+def compile_filters(filters: Dict[str, Any]) -> List[Callable[[Dict[str, Any]], bool]]:
+    """Transforma o dict de filtros em predicados (valores já convertidos uma única vez)."""
+    predicates: List[Callable[[Dict[str, Any]], bool]] = []
+    for spec in FILTER_SPECS:
+        raw = filters.get(spec.param)
+        if raw is None:
+            continue
+        field = spec.field
+        if spec.op == "eq":
+            val = str(raw).lower()
+            predicates.append(lambda x, f=field, v=val: str(x.get(f, "")).lower() == v)
+        else:
+            bound = _to_int(raw, spec.param)
+            if spec.op == "min":
+                predicates.append(lambda x, f=field, b=bound: (n := parse_number(x.get(f))) is not None and n >= b)
+            else:
+                predicates.append(lambda x, f=field, b=bound: (n := parse_number(x.get(f))) is not None and n <= b)
+    return predicates
+
 def apply_filters(items: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     filters: dict com chaves como:
       gender, eye_color, climate, starship_class, min_height, max_height, min_population, max_population, etc.
+
+    Todos os filtros são avaliados numa única passada sobre os itens. Para
+    recursos espelhados por inteiro, prefira `filter_engine` (índices prontos).
     """
     if not filters:
         return items
 
-    result = items
-
-    # filtros de igualdade (strings)
-    eq_fields = ["gender", "eye_color", "hair_color", "climate", "terrain", "starship_class"]
-    for f in eq_fields:
-        if f in filters and filters[f] is not None:
-            val = str(filters[f]).lower()
-            result = [x for x in result if str(x.get(f, "")).lower() == val]
-
-    # range: height
-    if "min_height" in filters and filters["min_height"] is not None:
-        mn = _to_int(filters["min_height"], "min_height")
-        result = [x for x in result if str(x.get("height", "0")).isdigit() and int(x["height"]) >= mn]
-
-    if "max_height" in filters and filters["max_height"] is not None:
-        mx = _to_int(filters["max_height"], "max_height")
-        result = [x for x in result if str(x.get("height", "0")).isdigit() and int(x["height"]) <= mx]
-
-    # range: population (planets)
-    if "min_population" in filters and filters["min_population"] is not None:
-        mn = _to_int(filters["min_population"], "min_population")
-        result = [x for x in result if str(x.get("population", "0")).isdigit() and int(x["population"]) >= mn]
-
-    if "max_population" in filters and filters["max_population"] is not None:
-        mx = _to_int(filters["max_population"], "max_population")
-        result = [x for x in result if str(x.get("population", "0")).isdigit() and int(x["population"]) <= mx]
-
-    return result
+    predicates = compile_filters(filters)
+    if not predicates:
+        return items
+    return [x for x in items if all(p(x) for p in predicates)]
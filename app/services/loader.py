@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.request_context import record_relations
+from app.services import mirror
+
+class RelationLoader:
+    """
+    Resolve URLs de relações no estilo DataLoader: dentro de uma requisição,
+    cada URL única é buscada uma única vez, mesmo que apareça em várias linhas
+    (ou em várias chamadas concorrentes usando o mesmo loader).
+
+    Com `shared_with`, reaproveita os resultados de outro loader (ex.: as
+    sub-consultas de um batch), mas com orçamento e contadores próprios.
+    """
+
+    def __init__(self, budget: Optional[int] = None, shared_with: Optional["RelationLoader"] = None) -> None:
+        self._results: Dict[str, Dict[str, Any]] = shared_with._results if shared_with else {}
+        self._pending: Dict[str, Tuple["asyncio.Future[List[Dict[str, Any]]]", int]] = (
+            shared_with._pending if shared_with else {}
+        )
+        self.budget = budget  # máximo de URLs únicas por requisição (None = sem limite)
+        self.requested = 0    # URLs pedidas (com repetição)
+        self.fetched = 0      # URLs únicas efetivamente resolvidas
+        self.truncated = False
+
+    def reserve(self, urls: Sequence[str]) -> List[str]:
+        """
+        Filtra `urls` (únicas, em ordem) pelo orçamento: as já resolvidas são
+        de graça; as novas entram enquanto houver orçamento.
+        """
+        allowed: List[str] = []
+        remaining = None if self.budget is None else self.budget - self.fetched
+        for url in dict.fromkeys(urls):
+            if url in self._results or url in self._pending:
+                allowed.append(url)
+            elif remaining is None or remaining > 0:
+                allowed.append(url)
+                if remaining is not None:
+                    remaining -= 1
+            else:
+                self.truncated = True
+        return allowed
+
+    async def load_many(self, urls: Sequence[str]) -> List[Dict[str, Any]]:
+        self.requested += len(urls)
+        new = list(dict.fromkeys(u for u in urls if u not in self._results and u not in self._pending))
+        if new:
+            task = asyncio.ensure_future(mirror.resolve_many(new))
+            for i, url in enumerate(new):
+                self._pending[url] = (task, i)
+            self.fetched += len(new)
+            record_relations(len(new))
+
+        for url in dict.fromkeys(urls):
+            if url in self._results:
+                continue
+            task, i = self._pending[url]
+            try:
+                batch = await task
+            finally:
+                self._pending.pop(url, None)
+            self._results[url] = batch[i]
+
+        return [self._results[u] for u in urls]
+
+    async def load(self, url: str) -> Dict[str, Any]:
+        return (await self.load_many([url]))[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "relations_requested": self.requested,
+            "relations_unique": self.fetched,
+            "include_truncated": int(self.truncated),
+        }
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from app.core import metrics
+from app.core.config import CACHE_TTL_LIST_SECONDS, MIRROR_REFRESH_SECONDS, SUPPORTED_RESOURCES
+from app.services.swapi_client import fetch_many, get_json
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ResourceStore:
+    """Cópia local de um recurso inteiro da SWAPI, indexada por ID."""
+    resource: str
+    items: List[Dict[str, Any]]
+    by_id: Dict[int, Dict[str, Any]]
+    version: int
+    digest: str
+    loaded_at: float = field(default_factory=time.time)
+    # carregado sob demanda (busca, cursor, export ordenado, agregação) e não pelo
+    # refresher: vale só por CACHE_TTL_LIST_SECONDS, depois é recarregado
+    lazy: bool = False
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(item_id)
+
+    def is_fresh(self) -> bool:
+        return not self.lazy or time.time() - self.loaded_at < CACHE_TTL_LIST_SECONDS
+
+_stores: Dict[str, ResourceStore] = {}
+_loading: Dict[str, "asyncio.Task[ResourceStore]"] = {}
+_version = 0
+
+def item_id(url: Optional[str]) -> Optional[int]:
+    """`.../people/1/` -> 1"""
+    if not url:
+        return None
+    last = url.rstrip("/").rsplit("/", 1)[-1]
+    return int(last) if last.isdigit() else None
+
+def resource_of(url: str) -> Optional[str]:
+    """`.../people/1/` -> "people" """
+    parts = url.rstrip("/").rsplit("/", 2)
+    return parts[-2] if len(parts) == 3 else None
+
+def get_store(resource: str) -> Optional[ResourceStore]:
+    """Cópia local do recurso, se existir e não estiver vencida (cópias sob demanda expiram)."""
+    store = _stores.get(resource)
+    return store if store is not None and store.is_fresh() else None
+
+def data_version() -> int:
+    """Muda sempre que algum recurso espelhado muda (útil como chave de caches derivados)."""
+    return _version
+
+def lookup_url(url: str) -> Optional[Dict[str, Any]]:
+    resource = resource_of(url)
+    store = get_store(resource) if resource else None
+    if store is None:
+        return None
+    return store.get(item_id(url))  # type: ignore[arg-type]
+
+async def resolve_many(urls: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Resolve URLs de entidades pelo espelho local; o que não estiver
+    espelhado vai para a SWAPI (em paralelo). Mantém a ordem de entrada.
+    """
+    out: List[Optional[Dict[str, Any]]] = [lookup_url(u) for u in urls]
+    missing = [i for i, obj in enumerate(out) if obj is None]
+    if missing:
+        fetched = await fetch_many([urls[i] for i in missing])
+        for i, obj in zip(missing, fetched):
+            out[i] = obj
+    return out  # type: ignore[return-value]
+
+def _digest(items: List[Dict[str, Any]]) -> str:
+    return hashlib.sha1(json.dumps(items, sort_keys=True).encode()).hexdigest()
+
+def load_items(resource: str, items: List[Dict[str, Any]], lazy: bool = False) -> ResourceStore:
+    """Instala (ou substitui) a cópia local de um recurso. A versão só muda se o conteúdo mudar."""
+    global _version
+    digest = _digest(items)
+    current = _stores.get(resource)
+    if current is not None and current.digest == digest:
+        current.loaded_at = time.time()
+        current.lazy = lazy
+        return current
+
+    by_id: Dict[int, Dict[str, Any]] = {}
+    for it in items:
+        iid = item_id(it.get("url"))
+        if iid is not None:
+            by_id[iid] = it
+    ordered = [by_id[k] for k in sorted(by_id)] if len(by_id) == len(items) else list(items)
+
+    _version += 1
+    store = ResourceStore(resource=resource, items=ordered, by_id=by_id, version=_version, digest=digest, lazy=lazy)
+    _stores[resource] = store
+    return store
+
+async def ingest(resource: str, lazy: bool = False) -> ResourceStore:
+    """Percorre todas as páginas do recurso na SWAPI e atualiza a cópia local."""
+    first = await get_json(f"{resource}/", params={"page": 1})
+    items: List[Dict[str, Any]] = list(first.get("results", []))
+
+    page_size = len(items) or 1
+    total = int(first.get("count") or len(items))
+    pages = (total + page_size - 1) // page_size
+    if first.get("next") and pages > 1:
+        rest = await fetch_many([f"{resource}/?page={n}" for n in range(2, pages + 1)])
+        for page in rest:
+            items.extend(page.get("results", []))
+
+    store = load_items(resource, items, lazy=lazy)
+    logger.info("Mirrored %s: %d items (version %d)", resource, len(store.items), store.version)
+    return store
+
+async def ensure_loaded(resource: str) -> ResourceStore:
+    """
+    Retorna a cópia local, ingerindo o recurso se não existir ou se a cópia sob
+    demanda venceu (cargas simultâneas são unificadas). Sem o refresher, é esta
+    recarga que mantém a cópia em dia com a SWAPI (páginas pelo cache normal).
+    """
+    store = get_store(resource)
+    if store is not None:
+        return store
+
+    loop = asyncio.get_running_loop()
+    task = _loading.get(resource)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(ingest(resource, lazy=True))
+        _loading[resource] = task
+        task.add_done_callback(lambda t: _loading.pop(resource, None) if _loading.get(resource) is t else None)
+    return await asyncio.shield(task)
+
+async def refresh_all(resources: Optional[Sequence[str]] = None) -> None:
+    for resource in sorted(resources or SUPPORTED_RESOURCES):
+        try:
+            await ingest(resource)
+        except Exception:
+            # mantém a cópia anterior; a rota ao vivo continua como fallback
+            logger.exception("Failed to refresh mirror for %s", resource)
+
+async def run_refresher(interval_seconds: float = MIRROR_REFRESH_SECONDS, initial_delay: float = 0) -> None:
+    """Loop de background (iniciado no lifespan): carrega tudo e atualiza periodicamente."""
+    # com snapshot já carregado, a primeira atualização pode esperar um ciclo
+    await asyncio.sleep(initial_delay)
+    while True:
+        await refresh_all()
+        await asyncio.sleep(interval_seconds)
+
+def stats() -> Dict[str, Any]:
+    return {
+        r: {"items": len(s.items), "version": s.version, "loaded_at": s.loaded_at, "lazy": s.lazy}
+        for r, s in sorted(_stores.items())
+    }
+
+def _metric_lines():
+    items = (({"resource": r}, len(s.items)) for r, s in sorted(_stores.items()))
+    return metrics.gauge_lines("mirror_items", "Itens na cópia local por recurso", items)
+
+metrics.register_collector(_metric_lines)
+
+def clear() -> None:
+    global _version
+    _stores.clear()
+    _loading.clear()
+    _version += 1
@@ -0,0 +1,452 @@
+"""
+Planejamento e execução das consultas de listagem.
+
+Os parâmetros da requisição viram um `QueryPlan` explícito antes de qualquer
+chamada à SWAPI, para que o trabalho caro (buscar relações) seja feito só
+para as linhas e campos que realmente vão na resposta:
+
+- includes cujo campo foi descartado por `fields` não são buscados;
+- a paginação acontece antes da expansão de relações;
+- em `/films/{id}/characters` sem ordenação, só as URLs da página são buscadas.
+
+Com `cursor`/`page_size` a listagem usa paginação por chave sobre o recurso
+inteiro (cópia local) em vez das páginas fixas de 10 da SWAPI.
+
+`search=` é respondido pelo índice local (`search_index`) sobre a cópia do
+recurso; sem `sort`, as linhas saem por relevância.
+
+`export_pages` é a variante em streaming: entrega o recurso inteiro página a
+página, sem montar a lista completa na memória.
+"""
+import asyncio
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from app.core.config import CACHE_TTL_LIST_SECONDS, MAX_INCLUDE_FETCHES, SEARCH_INDEX_ENABLED, SWAPI_PAGE_SIZE
+from app.core import metrics
+from app.core.errors import BadRequestError, NotFoundError
+from app.core.request_context import stage, upstream_fetches
+from app.services import filter_engine, mirror, search_index, swapi_client
+from app.services.cache import TTLCache
+from app.services.cursor import decode_cursor, encode_cursor, fingerprint
+from app.services.enrich import RELATION_FIELDS, enrich_items, parse_include
+from app.services.filters import apply_filters
+from app.services.loader import RelationLoader
+from app.services.sorting import (
+    SortSpec,
+    composite_key,
+    keyset_rows,
+    parse_sort,
+    select_sorted,
+    sort_items,
+    sort_values,
+    validate_sort_fields,
+)
+
+MAX_PAGE_SIZE = 100
+
+def parse_csv(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+def select_fields(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    if not fields:
+        return item
+    return {k: item.get(k) for k in fields if k in item}
+
+@dataclass
+class ResourceQuery:
+    resource: str
+    search: Optional[str] = None
+    page: int = 1
+    sort: Optional[str] = None
+    order: str = "asc"
+    fields: List[str] = field(default_factory=list)
+    include: List[str] = field(default_factory=list)
+    filters: Dict[str, Any] = field(default_factory=dict)
+    page_size: Optional[int] = None               # com page_size/cursor: paginação por chave
+    cursor: Optional[str] = None
+
+    def __post_init__(self):
+        if SEARCH_INDEX_ENABLED and not search_index.has_terms(self.search):
+            self.search = None
+
+    @property
+    def keyset(self) -> bool:
+        return self.page_size is not None or self.cursor is not None
+
+    @property
+    def needs_mirror(self) -> bool:
+        """Consultas que só fazem sentido sobre o recurso inteiro (cópia local)."""
+        return self.keyset or bool(self.search and SEARCH_INDEX_ENABLED)
+
+@dataclass
+class FilmCharactersQuery:
+    film_id: int
+    sort: Optional[str] = "name"
+    order: str = "asc"
+    fields: List[str] = field(default_factory=list)
+    page: int = 1
+    page_size: int = 10
+    cursor: Optional[str] = None
+
+@dataclass
+class QueryPlan:
+    source: str                                   # "mirror" | "upstream"
+    include: List[str]                            # includes que serão buscados
+    skipped_include: List[str]                    # descartados por `fields`
+    paginate_before_enrich: bool = True
+    paginate_before_fetch: bool = False           # characters: só busca as URLs da página
+    steps: List[str] = field(default_factory=list)
+    estimated_upstream_calls: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def pushdown_include(include: List[str], fields: List[str]) -> tuple:
+    """Remove includes cujo campo não vai para a resposta (projeção antes da busca)."""
+    if not fields:
+        return list(include), []
+    wanted = set(fields)
+    # em caminhos aninhados (films.characters) vale o campo da raiz
+    kept = [inc for inc in include if RELATION_FIELDS.get(inc.split(".")[0]) in wanted]
+    skipped = [inc for inc in include if inc not in kept]
+    return kept, skipped
+
+def _uncached(urls: List[str]) -> int:
+    """Quantas URLs (ou paths) únicas precisariam ir à SWAPI (fora do espelho e do cache)."""
+    return sum(
+        1 for u in dict.fromkeys(urls)
+        if mirror.lookup_url(u) is None and not swapi_client.is_cached(u)
+    )
+
+def _relation_urls(items: List[Dict[str, Any]], include: List[str]) -> List[str]:
+    urls: List[str] = []
+    for item in items:
+        for inc in include:
+            value = item.get(RELATION_FIELDS.get(inc.split(".")[0], ""))
+            if isinstance(value, str):
+                urls.append(value)
+            elif isinstance(value, list):
+                urls.extend(v for v in value if isinstance(v, str))
+    return urls
+
+def plan_resource_query(q: ResourceQuery) -> QueryPlan:
+    parse_include(q.include)  # valida a profundidade antes de qualquer chamada à SWAPI
+    include, skipped = pushdown_include(q.include, q.fields)
+    store = mirror.get_store(q.resource)
+    if store is not None and store.lazy and not q.needs_mirror:
+        # cópia carregada sob demanda (por uma busca, cursor...): a listagem comum
+        # continua com a semântica da SWAPI (count e next por página de lá)
+        store = None
+    plan = QueryPlan(source="mirror" if store is not None else "upstream", include=include, skipped_include=skipped)
+
+    if store is not None or q.needs_mirror:
+        # precisa do recurso inteiro: carrega o espelho uma vez se ainda não existir
+        plan.source = "mirror"
+        plan.steps = [
+            "load_mirror" if store is None else None,
+            "index_filter",
+            "search_index" if q.search else None,
+            "keyset_seek" if q.keyset else None,
+            "sorted_index" if q.sort and not q.keyset else None,
+            "paginate" if not q.keyset else None,
+        ]
+    else:
+        params = {"page": q.page, **({"search": q.search} if q.search else {})}
+        plan.steps = ["fetch_page", "filter", "sort" if q.sort else None, "paginate"]
+        plan.estimated_upstream_calls = 0 if swapi_client.is_cached(f"{q.resource}/", params) else 1
+    if include:
+        plan.steps.append("enrich_page")
+    if q.fields:
+        plan.steps.append("project")
+    plan.steps = [s for s in plan.steps if s]
+    return plan
+
+def _check_page_size(page_size: int) -> None:
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        raise BadRequestError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+def _matching_rows(store: mirror.ResourceStore, q: ResourceQuery) -> tuple:
+    """(bitmap das linhas que passam em filtros e busca, linhas da busca por relevância ou None)."""
+    mask = filter_engine.get_index(store).match_mask(q.filters)
+    if not q.search:
+        return mask, None
+    ranked = [r for r in search_index.search_rows(store, q.search) if mask >> r & 1]
+    return search_index.rows_mask(ranked), ranked
+
+def _keyset_page(q: ResourceQuery, store: mirror.ResourceStore) -> tuple:
+    """(itens da página, total filtrado, número da página, próximo cursor)."""
+    size = SWAPI_PAGE_SIZE if q.page_size is None else q.page_size
+    _check_page_size(size)
+    spec = parse_sort(q.sort, q.order)
+    fp = fingerprint(q.resource, q.search, q.filters, spec)
+    after = decode_cursor(q.cursor, fp, "r", len(store.items), len(spec)) if q.cursor else None
+
+    # o cursor segue a ordem do recurso (ou do `sort`), não a relevância
+    with stage("filter"):
+        mask, _ = _matching_rows(store, q)
+
+    # uma linha a mais só para saber se existe próxima página
+    with stage("sort"):
+        if spec:
+            rows = keyset_rows(store, spec, mask, (after["k"], after["r"]) if after else None, size + 1)
+        elif after:
+            rows = filter_engine.rows_after(mask, after["r"], size + 1)
+        else:
+            rows = filter_engine.rows_of(mask, size + 1)
+
+    page_no = after.get("n", 1) if after else 1
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(fp, n=page_no + 1, r=last, k=sort_values(store.items[last], spec))
+    return [store.items[r] for r in rows], mask.bit_count(), page_no, next_cursor
+
+async def run_resource_query(
+    q: ResourceQuery,
+    plan: QueryPlan,
+    link: Callable[..., str],
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    """
+    Executa o plano e devolve os campos de `PaginatedResponse`.
+    `link(**params)` monta a URL de outra página (`page=` ou `cursor=`).
+    """
+    if q.page < 1:
+        raise BadRequestError("page must be >= 1")
+
+    next_cursor = None
+    page_no = q.page
+    store = mirror.get_store(q.resource) if plan.source == "mirror" else None
+    if plan.source == "mirror" and store is None:
+        store = await mirror.ensure_loaded(q.resource)
+    if q.keyset:
+        page_items, count, page_no, next_cursor = _keyset_page(q, store)
+        next_url = link(cursor=next_cursor) if next_cursor else None
+        previous_url = None
+    elif store is not None:
+        # cópia local completa: busca/filtros/ordenação valem para o recurso inteiro
+        with stage("filter"):
+            mask, ranked = _matching_rows(store, q)
+
+        count = mask.bit_count()
+        start = (q.page - 1) * SWAPI_PAGE_SIZE
+        end = start + SWAPI_PAGE_SIZE
+        sort_spec = parse_sort(q.sort, q.order)
+        with stage("sort"):
+            if sort_spec:
+                # ordenação pré-computada; só percorre até o fim da página pedida
+                rows = select_sorted(store, sort_spec, mask, limit=end)
+            elif ranked is not None:
+                rows = ranked
+            else:
+                rows = filter_engine.rows_of(mask)
+        page_items = [store.items[r] for r in rows[start:end]]
+
+        next_url = link(page=q.page + 1) if end < count else None
+        previous_url = link(page=q.page - 1) if q.page > 1 else None
+    else:
+        params: Dict[str, Any] = {"page": q.page}
+        if q.search:
+            params["search"] = q.search
+
+        swapi_data = await swapi_client.get_json(f"{q.resource}/", params=params)
+        results: List[Dict[str, Any]] = swapi_data.get("results", [])
+
+        # filtros locais (porque SWAPI não suporta tudo)
+        with stage("filter"):
+            filtered = apply_filters(results, q.filters)
+
+        # ordenação local
+        with stage("sort"):
+            page_items = sort_items(filtered, sort=q.sort, order=q.order)
+
+        count = swapi_data.get("count", len(page_items))
+        next_url = swapi_data.get("next")
+        previous_url = swapi_data.get("previous")
+
+    # a página já está definida: só as relações dessas linhas são buscadas
+    # (estimativa do primeiro nível; níveis aninhados dependem do que vier dele)
+    plan.estimated_upstream_calls += _uncached(_relation_urls(page_items, plan.include))
+
+    loader = loader or RelationLoader(budget=MAX_INCLUDE_FETCHES)
+    with stage("enrich"):
+        enriched = await enrich_items(page_items, plan.include, loader)
+    with stage("project"):
+        results_out = [select_fields(x, q.fields) for x in enriched] if q.fields else enriched
+
+    return {
+        "resource": q.resource,
+        "count": count,
+        "page": page_no,
+        "page_size": len(results_out),
+        "next": next_url,
+        "previous": previous_url,
+        "next_cursor": next_cursor,
+        "results": results_out,
+        "stats": {"upstream_fetches": upstream_fetches(), **loader.stats()},
+    }
+
+async def _finish_chunk(q: ResourceQuery, include: List[str], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # orçamento de relações por bloco (não pela exportação inteira)
+    enriched = await enrich_items(items, include, RelationLoader(budget=MAX_INCLUDE_FETCHES))
+    return [select_fields(x, q.fields) for x in enriched] if q.fields else enriched
+
+async def export_pages(q: ResourceQuery) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Todas as linhas do recurso (filtradas, ordenadas, enriquecidas e projetadas),
+    em blocos do tamanho de uma página da SWAPI.
+
+    - sem ordenação: percorre as páginas da SWAPI, já buscando a próxima
+      enquanto a atual é enriquecida/enviada;
+    - com ordenação ou busca: depende do recurso inteiro, então usa a cópia
+      local (carregada uma única vez via `mirror.ensure_loaded`).
+    """
+    parse_include(q.include)
+    include, _ = pushdown_include(q.include, q.fields)
+    sort_spec = parse_sort(q.sort, q.order)
+
+    store = mirror.get_store(q.resource)
+    if store is None and (sort_spec or q.needs_mirror):
+        store = await mirror.ensure_loaded(q.resource)
+
+    if store is not None:
+        mask, ranked = _matching_rows(store, q)
+        if sort_spec:
+            rows = select_sorted(store, sort_spec, mask)
+        else:
+            rows = ranked if ranked is not None else filter_engine.rows_of(mask)
+        for start in range(0, len(rows), SWAPI_PAGE_SIZE):
+            chunk = [store.items[r] for r in rows[start:start + SWAPI_PAGE_SIZE]]
+            yield await _finish_chunk(q, include, chunk)
+        return
+
+    def fetch(page: int) -> "asyncio.Task[Dict[str, Any]]":
+        params: Dict[str, Any] = {"page": page, **({"search": q.search} if q.search else {})}
+        return asyncio.ensure_future(swapi_client.get_json(f"{q.resource}/", params=params))
+
+    page = 1
+    current = fetch(page)
+    try:
+        while current is not None:
+            data = await current
+            page += 1
+            # prefetch: a próxima página já está a caminho enquanto esta é processada
+            current = fetch(page) if data.get("next") else None
+            items = apply_filters(data.get("results", []), q.filters)
+            if items:
+                yield await _finish_chunk(q, include, items)
+    finally:
+        if current is not None and not current.done():
+            current.cancel()
+
+# ordem dos personagens de cada filme: (filme, versão, spec) -> [(chave composta, posição)]
+_film_orderings = TTLCache(ttl_seconds=CACHE_TTL_LIST_SECONDS, max_entries=256)
+metrics.register_cache("film_orderings", _film_orderings)
+
+def plan_film_characters(q: FilmCharactersQuery) -> QueryPlan:
+    people = mirror.get_store("people")
+    plan = QueryPlan(source="mirror" if people is not None else "upstream", include=[], skipped_include=[])
+    # sem ordenação a posição de cada personagem já é conhecida pela lista de URLs do filme;
+    # com ordenação, também depois que a ordem do filme estiver em cache
+    spec = parse_sort(q.sort, q.order)
+    plan.paginate_before_fetch = not spec or _film_orderings.peek(_film_ordering_key(q.film_id, spec)) is not None
+    plan.steps = ["fetch_film"]
+    if not spec:
+        plan.steps += ["paginate", "fetch_characters"]
+    elif plan.paginate_before_fetch:
+        plan.steps += ["cached_ordering", "paginate", "fetch_characters"]
+    else:
+        plan.steps += ["fetch_characters", "sort", "paginate"]
+    if q.fields:
+        plan.steps.append("project")
+    return plan
+
+def _film_ordering_key(film_id: int, spec: SortSpec) -> str:
+    return f"{film_id}|{mirror.data_version()}|{spec}"
+
+async def _film_ordering(
+    film_id: int,
+    urls: List[str],
+    spec: SortSpec,
+    loader: RelationLoader,
+    plan: QueryPlan,
+) -> List[tuple]:
+    """Chaves ordenadas dos personagens do filme; só a primeira chamada busca todos."""
+    key = _film_ordering_key(film_id, spec)
+    ordering = _film_orderings.get(key)
+    if ordering is None:
+        plan.estimated_upstream_calls += _uncached(urls)
+        characters = await loader.load_many(urls)
+        if characters:
+            validate_sort_fields(characters, spec)
+        # desempate pela posição no filme: a ordem é total e o cursor sabe onde parou
+        ordering = sorted((composite_key(sort_values(c, spec), spec), pos) for pos, c in enumerate(characters))
+        _film_orderings.set(key, ordering, size=64 * len(ordering))
+    return ordering
+
+async def run_film_characters(
+    q: FilmCharactersQuery,
+    plan: QueryPlan,
+    loader: Optional[RelationLoader] = None,
+) -> Dict[str, Any]:
+    if q.page < 1:
+        raise BadRequestError("page must be >= 1")
+    _check_page_size(q.page_size)
+
+    spec = parse_sort(q.sort, q.order)
+    fp = fingerprint("films", q.film_id, spec)
+
+    films = mirror.get_store("films")
+    if films is not None:
+        film = films.get(q.film_id)
+        if film is None:
+            raise NotFoundError(f"films {q.film_id} not found")
+    else:
+        plan.estimated_upstream_calls += _uncached([f"films/{q.film_id}/"])
+        film = await swapi_client.get_json(f"films/{q.film_id}/")
+
+    characters_urls: List[str] = film.get("characters", [])
+    total = len(characters_urls)
+    after = decode_cursor(q.cursor, fp, "i", total, len(spec)) if q.cursor else None
+    loader = loader or RelationLoader()
+
+    if spec:
+        with stage("sort"):
+            ordering = await _film_ordering(q.film_id, characters_urls, spec, loader, plan)
+        if after is not None:
+            start = bisect_right(ordering, (composite_key(after["k"], spec), after["i"]))
+        else:
+            start = (q.page - 1) * q.page_size
+        positions = [pos for _, pos in ordering[start:start + q.page_size]]
+    else:
+        start = after["i"] + 1 if after is not None else (q.page - 1) * q.page_size
+        positions = list(range(start, min(start + q.page_size, total)))
+
+    # só as URLs da página (no caminho ordenado já estão em cache depois da 1ª chamada)
+    wanted = [characters_urls[p] for p in positions]
+    plan.estimated_upstream_calls += _uncached(wanted)
+    with stage("enrich"):
+        paged = await loader.load_many(wanted)
+
+    page_no = after.get("n", 1) if after is not None else q.page
+    next_cursor = None
+    if paged and start + len(paged) < total:
+        next_cursor = encode_cursor(fp, n=page_no + 1, i=positions[-1], k=sort_values(paged[-1], spec))
+
+    if q.fields:
+        paged = [select_fields(c, q.fields) for c in paged]
+
+    return {
+        "film_id": q.film_id,
+        "film_title": film.get("title"),
+        "count": total,
+        "page": page_no,
+        "page_size": len(paged),
+        "next_cursor": next_cursor,
+        "results": paged,
+        "stats": {"upstream_fetches": upstream_fetches(), **loader.stats()},
+    }
@@ -0,0 +1,259 @@
+"""
+Busca local (`search=`) sobre a cópia do recurso, sem ida à SWAPI.
+
+Índice invertido por recurso, com os campos de texto de cada um (nome/título
+com peso maior que modelo, fabricante, clima etc.):
+
+- token -> {documento: peso}; documento = ID da entidade (estável entre
+  versões do espelho, ao contrário da posição na lista);
+- trigramas -> tokens, para achar tokens que *contêm* o termo (mesma
+  semântica de substring da SWAPI: "sky" acha "Skywalker") e candidatos a
+  erro de digitação;
+- cada termo da busca precisa casar (E); a relevância soma, por termo,
+  exato > prefixo > substring > aproximado, multiplicado pelo peso do campo;
+- erro de digitação (1 edição a partir de 4 letras, 2 a partir de 8) só é
+  tentado para termos que não casam literalmente com nada;
+- atualização incremental: a cada versão nova do espelho só os documentos
+  novos, removidos ou com texto alterado mexem no índice.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from app.services.mirror import ResourceStore, item_id
+
+# campos indexados por recurso e o peso de cada um na relevância
+SEARCH_INDEX_FIELDS: Dict[str, Dict[str, float]] = {
+    "people": {"name": 1.0},
+    "planets": {"name": 1.0, "climate": 0.5, "terrain": 0.5},
+    "starships": {"name": 1.0, "model": 0.8, "manufacturer": 0.5, "starship_class": 0.5},
+    "films": {"title": 1.0, "director": 0.5, "producer": 0.5},
+}
+
+EXACT, PREFIX, INFIX, FUZZY = 1.0, 0.7, 0.5, 0.3
+MAX_CACHED_QUERIES = 256
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos ("Padmé" -> "padme")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+def has_terms(query: Optional[str]) -> bool:
+    """Busca só com espaços/pontuação não tem termo: vale como listagem sem busca."""
+    return bool(query) and bool(tokenize(query))
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_typos(term: str) -> int:
+    if len(term) >= 8:
+        return 2
+    return 1 if len(term) >= 4 else 0
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    """Distância de edição (com transposição) <= `limit`, parando cedo."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+class SearchIndex:
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.fields = SEARCH_INDEX_FIELDS.get(resource, {"name": 1.0})
+        self.version = -1
+        self._texts: Dict[int, Tuple[str, ...]] = {}
+        self._doc_tokens: Dict[int, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None  # ordenado, para prefixos (refeito sob demanda)
+        self._rows: Dict[int, int] = {}  # documento -> posição na versão atual do espelho
+        self._queries: Dict[str, List[int]] = {}
+        self.stats = {"updates": 0, "documents_changed": 0, "queries": 0, "query_cache_hits": 0}
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    # manutenção
+
+    def update(self, items: Iterable[Dict[str, Any]], version: int) -> int:
+        """Sincroniza com os itens da versão nova; retorna quantos documentos mudaram."""
+        rows: Dict[int, int] = {}
+        changed = 0
+        for row, item in enumerate(items):
+            doc = item_id(item.get("url"))
+            if doc is None:
+                continue
+            rows[doc] = row
+            texts = tuple(str(item.get(f) or "") for f in self.fields)
+            if self._texts.get(doc) == texts:
+                continue
+            self._remove(doc)
+            self._add(doc, texts)
+            changed += 1
+        for doc in [d for d in self._texts if d not in rows]:
+            self._remove(doc)
+            changed += 1
+
+        if changed or rows != self._rows:
+            self._queries.clear()
+        self._rows = rows
+        self.version = version
+        self.stats["updates"] += 1
+        self.stats["documents_changed"] += changed
+        return changed
+
+    def _add(self, doc: int, texts: Tuple[str, ...]) -> None:
+        weights: Dict[str, float] = {}
+        for text, weight in zip(texts, self.fields.values()):
+            tokens = tokenize(text)
+            if len(tokens) > 1:
+                tokens.append("".join(tokens))  # "R2-D2" também vira "r2d2"
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0.0), weight)
+        self._texts[doc] = texts
+        self._doc_tokens[doc] = weights
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+                self._vocabulary = None
+            posting[doc] = weight
+
+    def _remove(self, doc: int) -> None:
+        self._texts.pop(doc, None)
+        for token in self._doc_tokens.pop(doc, {}):
+            posting = self._postings[token]
+            del posting[doc]
+            if not posting:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    tokens = self._trigrams[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[gram]
+                self._vocabulary = None
+
+    # consulta
+
+    def _literal_matches(self, term: str) -> Dict[str, float]:
+        """Tokens que contêm o termo, com a qualidade do casamento."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        matches: Dict[str, float] = {}
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            matches[vocabulary[i]] = EXACT if vocabulary[i] == term else PREFIX
+            i += 1
+
+        if len(term) >= 3:
+            inner = {term[i:i + 3] for i in range(len(term) - 2)}
+            candidates = set.intersection(*(self._trigrams.get(g, set()) for g in inner))
+        else:
+            candidates = set(vocabulary)  # termo curto: o vocabulário é pequeno
+        for token in candidates:
+            if token not in matches and term in token:
+                matches[token] = INFIX
+        return matches
+
+    def _fuzzy_matches(self, term: str) -> Dict[str, float]:
+        limit = max_typos(term)
+        if not limit:
+            return {}
+        grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        # cada edição destrói no máximo 3 trigramas (4 numa transposição)
+        needed = max(1, len(grams) - 4 * limit)
+        return {
+            token: FUZZY
+            for token, count in shared.items()
+            if count >= needed and within_distance(term, token, limit)
+        }
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """{documento: relevância} dos documentos que casam com todos os termos."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            matches = self._literal_matches(term) or self._fuzzy_matches(term)
+            term_scores: Dict[int, float] = {}
+            for token, quality in matches.items():
+                for doc, weight in self._postings[token].items():
+                    score = quality * weight
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: s + term_scores[doc] for doc, s in scores.items() if doc in term_scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def search_rows(self, query: str) -> List[int]:
+        """Linhas do espelho que casam, da mais relevante para a menos (empate: ordem original)."""
+        self.stats["queries"] += 1
+        key = normalize(query).strip()
+        cached = self._queries.get(key)
+        if cached is not None:
+            self.stats["query_cache_hits"] += 1
+            return cached
+
+        ranked = sorted((-score, self._rows[doc]) for doc, score in self.scores(query).items())
+        rows = [row for _, row in ranked]
+        if len(self._queries) >= MAX_CACHED_QUERIES:
+            self._queries.pop(next(iter(self._queries)))
+        self._queries[key] = rows
+        return rows
+
+_indexes: Dict[str, SearchIndex] = {}
+
+def get_index(store: ResourceStore) -> SearchIndex:
+    """Índice do recurso, atualizado (incrementalmente) quando a versão do espelho muda."""
+    index = _indexes.get(store.resource)
+    if index is None:
+        index = _indexes[store.resource] = SearchIndex(store.resource)
+    if index.version != store.version:
+        index.update(store.items, store.version)
+    return index
+
+def search_rows(store: ResourceStore, query: str) -> List[int]:
+    return get_index(store).search_rows(query)
+
+def rows_mask(rows: Iterable[int]) -> int:
+    mask = 0
+    for row in rows:
+        mask |= 1 << row
+    return mask
+
+def stats() -> Dict[str, Any]:
+    return {
+        r: {"documents": len(i), "tokens": len(i._postings), "version": i.version, **i.stats}
+        for r, i in sorted(_indexes.items())
+    }
+
+def clear() -> None:
+    _indexes.clear()
@@ -0,0 +1,228 @@
+"""
+Cache compartilhado entre os workers do mesmo host (uvicorn/gunicorn com
+`--workers N`), com a mesma interface e semântica do `TTLCache`.
+
+Um arquivo SQLite em memória compartilhada (`/dev/shm`, tmpfs): cada worker
+abre a mesma base, então uma resposta buscada por um worker serve todos.
+
+- leitura: um SELECT pela chave primária (µs); em WAL os leitores não
+  bloqueiam nem esperam o escritor;
+- escrita: uma transação curta (DELETE + INSERT + limites); sem fsync
+  (`synchronous=OFF`): é cache, perder o arquivo num crash não importa;
+- a interface é síncrona (roda no event loop): se outro worker está com o
+  lock de escrita, espera no máximo `busy_timeout_seconds` e desiste da
+  escrita (contada em `contended`) em vez de travar todas as requisições;
+- TTL por namespace e janela stale como no `TTLCache`; o relógio é o de
+  parede (`time.time`), comum a todos os processos;
+- LRU aproximado: a leitura só atualiza o "último uso" se ele tiver mais de
+  `touch_interval_seconds`, para não transformar cada hit numa escrita;
+- contagem de entradas/bytes mantida por triggers na própria base (vale para
+  todos os workers); hits/misses/evicções são do processo.
+"""
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from app.services.cache import estimate_size
+from app.services.disk_cache import decode_value, encode_value
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    codec INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, entries, bytes) VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+"""
+
+class SharedCache:
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        namespace_ttls: Optional[Dict[str, int]] = None,
+        sweep_interval_seconds: float = 30,
+        max_stale_seconds: float = 0,
+        touch_interval_seconds: float = 1.0,
+        busy_timeout_seconds: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries or 0
+        self.max_bytes = max_bytes or 0
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.sweep_interval = sweep_interval_seconds
+        self.max_stale = max_stale_seconds
+        self.touch_interval = touch_interval_seconds
+        self._clock = clock
+        self._last_sweep = clock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "contended": 0}
+
+        # uma conexão por processo; o lock cobre o caso de mais de uma thread (ex.: ponte ASGI)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        # vários workers sobem juntos: o schema é criado numa transação só
+        self._conn.executescript("BEGIN IMMEDIATE;" + _SCHEMA + "COMMIT;")
+        # daqui em diante (no event loop) a espera pelo lock é curta
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_seconds * 1000)}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT entries FROM totals WHERE id = 0").fetchone()[0]
+
+    def ttl_for(self, namespace: Optional[str]) -> int:
+        if namespace is None:
+            return self.ttl
+        return self.namespace_ttls.get(namespace, self.ttl)
+
+    def _row(self, key: str):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT expires_at, used_at, codec, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._row(key)
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        expires_at, used_at, codec, body = row
+        now = self._clock()
+        if now > expires_at:
+            if now > expires_at + self.max_stale:
+                self.delete(key)
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+        if now - used_at >= self.touch_interval:
+            self._write("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+        self._stats["hits"] += 1
+        return decode_value(codec, body)
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Como `get`, mas sem contar hit/miss nem mexer na ordem LRU."""
+        row = self._row(key)
+        if row is None or self._clock() > row[0]:
+            return None
+        return decode_value(row[2], row[3])
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Retorna o valor mesmo expirado, desde que dentro de `max_stale_seconds`."""
+        row = self._row(key)
+        if row is None or self._clock() > row[0] + self.max_stale:
+            return None
+        return decode_value(row[2], row[3])
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        now = self._clock()
+        if ttl is None:
+            ttl = self.ttl_for(namespace)
+        if size is None:
+            size = estimate_size(value)
+        codec, body = encode_value(value)
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                # outro worker está gravando: a resposta segue sem ir para o cache
+                self._stats["contended"] += 1
+                return
+            try:
+                # DELETE + INSERT (não REPLACE) para os triggers manterem os totais
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.execute(
+                    "INSERT INTO entries (key, expires_at, used_at, size, codec, body) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, now + ttl, now, size, codec, body),
+                )
+                self._enforce_limits(key)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def delete(self, key: str) -> None:
+        self._write("DELETE FROM entries WHERE key = ?", (key,))
+
+    def sweep(self) -> int:
+        """Remove todas as entradas expiradas (além da janela stale); retorna quantas saíram."""
+        now = self._clock()
+        self._last_sweep = now
+        removed = self._write("DELETE FROM entries WHERE expires_at + ? < ?", (self.max_stale, now))
+        self._stats["expirations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        # vale para todos os workers do host
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        with self._lock:
+            entries, total_bytes = self._conn.execute("SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+        return {
+            **self._stats,
+            "hit_ratio": (self._stats["hits"] / lookups) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "backend": "shared",
+            "path": self.path,
+        }
+
+    def _write(self, sql: str, params: tuple) -> int:
+        """Escrita avulsa (touch, delete, sweep); sob contenção fica para a próxima. Retorna as linhas afetadas."""
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).rowcount
+            except sqlite3.OperationalError:
+                self._stats["contended"] += 1
+                return 0
+
+    def _enforce_limits(self, keep: str) -> None:
+        # dentro da transação do `set`: remove as menos usadas (nunca a recém-gravada)
+        while True:
+            entries, total_bytes = self._conn.execute("SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+            over_entries = self.max_entries and entries > self.max_entries
+            over_bytes = self.max_bytes and total_bytes > self.max_bytes
+            if not (over_entries or over_bytes) or entries <= 1:
+                return
+            victim = self._conn.execute(
+                "SELECT key FROM entries WHERE key != ? ORDER BY used_at, rowid LIMIT 1", (keep,)
+            ).fetchone()
+            if victim is None:
+                return
+            self._conn.execute("DELETE FROM entries WHERE key = ?", victim)
+            self._stats["evictions"] += 1
@@ -0,0 +1,60 @@
+"""
+Snapshot do espelho local em disco, para pré-aquecer instâncias novas.
+
+Uma instância que sobe com `MIRROR_SNAPSHOT_PATH` carrega o espelho direto do
+arquivo (sem nenhuma chamada à SWAPI) e já responde a primeira requisição a
+partir da cópia local.
+
+Gerar o arquivo (empacotado junto com o deploy):
+
+    python -m app.services.snapshot data/swapi_snapshot.json.gz
+"""
+import asyncio
+import gzip
+import logging
+import sys
+from typing import Dict, Optional, Sequence
+from app.core.config import SUPPORTED_RESOURCES
+from app.core.responses import dumps, loads
+from app.services import mirror
+
+logger = logging.getLogger(__name__)
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode) if path.endswith(".gz") else open(path, mode)
+
+def save_snapshot(path: str, resources: Optional[Sequence[str]] = None) -> int:
+    """Grava os recursos já espelhados; devolve quantos itens foram escritos."""
+    data = {}
+    for resource in sorted(resources or SUPPORTED_RESOURCES):
+        store = mirror.get_store(resource)
+        if store is not None:
+            data[resource] = store.items
+    with _open(path, "wb") as f:
+        f.write(dumps(data))
+    return sum(len(items) for items in data.values())
+
+def load_snapshot(path: str) -> Dict[str, int]:
+    """Carrega o arquivo no espelho; devolve itens carregados por recurso."""
+    with _open(path, "rb") as f:
+        raw = f.read()
+    data = loads(raw)
+
+    loaded = {}
+    for resource, items in data.items():
+        if resource in SUPPORTED_RESOURCES and isinstance(items, list):
+            loaded[resource] = len(mirror.load_items(resource, items).items)
+    logger.info("Mirror snapshot loaded from %s: %s", path, loaded)
+    return loaded
+
+async def build_snapshot(path: str, resources: Optional[Sequence[str]] = None) -> int:
+    """Ingere os recursos da SWAPI e grava o snapshot."""
+    for resource in sorted(resources or SUPPORTED_RESOURCES):
+        await mirror.ingest(resource)
+    return save_snapshot(path, resources)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m app.services.snapshot <path> [resource ...]")
+    total = asyncio.run(build_snapshot(sys.argv[1], sys.argv[2:] or None))
+    print(f"{total} items written to {sys.argv[1]}")
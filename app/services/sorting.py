@@ -1,24 +1,192 @@
-from typing import Any, Dict, List, Optional
+import heapq
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from app.core.errors import BadRequestError
+from app.services.filters import parse_number
+from app.services.mirror import ResourceStore
 
-def sort_items(items: List[Dict[str, Any]], sort: Optional[str], order: str = "asc") -> List[Dict[str, Any]]:
+SortSpec = List[Tuple[str, bool]]  # [(campo, desc?)]
+
+def parse_sort(sort: Optional[str], order: str = "asc") -> SortSpec:
+    """
+    `sort=height:desc,name` -> [("height", True), ("name", False)].
+    Campos sem direção usam `order` (compatível com `sort=name&order=desc`).
+    """
     if not sort:
+        return []
+    default_desc = (order or "asc").lower() == "desc"
+    spec: SortSpec = []
+    for part in sort.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        field, _, direction = part.partition(":")
+        direction = direction.strip().lower()
+        if direction and direction not in ("asc", "desc"):
+            raise BadRequestError(f"Invalid sort direction for {field}: {direction}")
+        spec.append((field.strip(), direction == "desc" if direction else default_desc))
+    return spec
+
+class _Desc:
+    """Inverte a comparação de um valor (ordem decrescente dentro de uma chave composta)."""
+    __slots__ = ("v",)
+
+    def __init__(self, v: Any):
+        self.v = v
+
+    def __lt__(self, other: "_Desc") -> bool:
+        return other.v < self.v
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Desc) and self.v == other.v
+
+_NULL_KEY = (1,)
+
+def typed_key(value: Any) -> Tuple:
+    """
+    Chave tipada e segura para nulos: números antes de textos, e valores
+    ausentes/"unknown"/"n/a" sempre por último (em qualquer direção).
+    """
+    if value is None:
+        return _NULL_KEY
+    if isinstance(value, str):
+        n = parse_number(value)
+        if n is not None:
+            return (0, (0, n))
+        if value.strip().lower() in ("", "unknown", "n/a", "none"):
+            return _NULL_KEY
+        return (0, (1, value))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, (0, value))
+    return (0, (1, str(value)))
+
+def _directed(key: Tuple, desc: bool) -> Tuple:
+    if not desc or key is _NULL_KEY:
+        return key
+    return (0, _Desc(key[1]))
+
+def validate_sort_fields(items: List[Dict[str, Any]], spec: SortSpec) -> None:
+    for field, _ in spec:
+        if field not in items[0]:
+            # pode ser que nem todos tenham, mas pelo menos valida no primeiro
+            raise BadRequestError(f"Invalid sort field: {field}")
+
+def sort_items(
+    items: List[Dict[str, Any]],
+    sort: Optional[str],
+    order: str = "asc",
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Ordena por um ou mais campos (`sort=height:desc,name`). Com `limit`,
+    devolve só os `limit` primeiros (seleção top-k, sem ordenar tudo).
+    """
+    spec = parse_sort(sort, order)
+    if not spec:
         return items
 
     if not items:
         return items
 
-    if sort not in items[0]:
-        # pode ser que nem todos tenham, mas pelo menos valida no primeiro
-        raise BadRequestError(f"Invalid sort field: {sort}")
+    validate_sort_fields(items, spec)
+
+    if len(spec) == 1:
+        field, desc = spec[0]
+        key_fn = lambda x: _directed(typed_key(x.get(field)), desc)  # noqa: E731
+    else:
+        key_fn = lambda x: tuple(_directed(typed_key(x.get(f)), d) for f, d in spec)  # noqa: E731
+
+    if limit is not None and limit < len(items):
+        return heapq.nsmallest(limit, items, key=key_fn)
+    return sorted(items, key=key_fn)
+
+# ordenações prontas por recurso espelhado: (recurso, versão, spec) -> linhas ordenadas
+_MAX_CACHED_ORDERINGS = 128
+_orderings: "OrderedDict[Tuple[str, int, Tuple[Tuple[str, bool], ...]], List[int]]" = OrderedDict()
+_key_columns: Dict[Tuple[str, int, str], List[Tuple]] = {}
+
+def _key_column(store: ResourceStore, field: str) -> List[Tuple]:
+    ck = (store.resource, store.version, field)
+    col = _key_columns.get(ck)
+    if col is None:
+        # descarta colunas de versões antigas deste recurso
+        for stale in [k for k in _key_columns if k[0] == store.resource and k[1] != store.version]:
+            del _key_columns[stale]
+        col = [typed_key(item.get(field)) for item in store.items]
+        _key_columns[ck] = col
+    return col
+
+def sorted_rows(store: ResourceStore, spec: SortSpec) -> List[int]:
+    """Índices das linhas do espelho na ordem pedida; reaproveitado até o dado mudar."""
+    ck = (store.resource, store.version, tuple(spec))
+    rows = _orderings.get(ck)
+    if rows is not None:
+        _orderings.move_to_end(ck)
+        return rows
+
+    if store.items:
+        validate_sort_fields(store.items, spec)
+    columns = [(_key_column(store, f), d) for f, d in spec]
+    rows = list(range(len(store.items)))
+    # ordenações estáveis sucessivas, da chave menos para a mais significativa
+    for col, desc in reversed(columns):
+        rows.sort(key=lambda r, c=col, d=desc: _directed(c[r], d))
+
+    _orderings[ck] = rows
+    if len(_orderings) > _MAX_CACHED_ORDERINGS:
+        _orderings.popitem(last=False)
+    return rows
+
+def select_sorted(store: ResourceStore, spec: SortSpec, mask: int, limit: Optional[int] = None) -> List[int]:
+    """Linhas de `mask` (bitmap) na ordem de `spec`; para ao atingir `limit` (top-k de uma página)."""
+    out: List[int] = []
+    for r in sorted_rows(store, spec):
+        if (mask >> r) & 1:
+            out.append(r)
+            if limit is not None and len(out) >= limit:
+                break
+    return out
+
+def composite_key(values: List[Any], spec: SortSpec) -> Tuple:
+    """Chave composta (já com direção) a partir dos valores brutos dos campos de `spec`."""
+    return tuple(_directed(typed_key(v), d) for v, (_, d) in zip(values, spec))
+
+def sort_values(item: Dict[str, Any], spec: SortSpec) -> List[Any]:
+    return [item.get(f) for f, _ in spec]
 
-    reverse = (order or "asc").lower() == "desc"
+def keyset_rows(
+    store: ResourceStore,
+    spec: SortSpec,
+    mask: int,
+    after: Optional[Tuple[List[Any], int]],
+    limit: int,
+) -> List[int]:
+    """
+    Até `limit` linhas de `mask` na ordem de `spec`, começando logo depois de
+    `after` = (valores da ordenação, linha). A ordenação em cache é estritamente
+    crescente em (chave composta, linha), então a posição sai por busca binária.
+    """
+    ordering = sorted_rows(store, spec)
+    start = 0
+    if after is not None:
+        columns = [(_key_column(store, f), d) for f, d in spec]
+        values, row = after
+        start = bisect_right(
+            ordering,
+            (composite_key(values, spec), row),
+            key=lambda r: (tuple(_directed(c[r], d) for c, d in columns), r),
+        )
 
-    def key_fn(x: Dict[str, Any]) -> Any:
-        v = x.get(sort)
-        # tenta converter números quando fizer sentido
-        if isinstance(v, str) and v.isdigit():
-            return int(v)
-        return v
+    out: List[int] = []
+    for i in range(start, len(ordering)):
+        r = ordering[i]
+        if (mask >> r) & 1:
+            out.append(r)
+            if len(out) >= limit:
+                break
+    return out
 
-    return sorted(items, key=key_fn, reverse=reverse)
+def clear_cache() -> None:
+    _orderings.clear()
+    _key_columns.clear()
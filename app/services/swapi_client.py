@@ -1,48 +1,325 @@
+import asyncio
+import logging
+import time
 import httpx
-from typing import Any, Dict, Optional
-from app.core.config import SWAPI_BASE_URL, HTTP_TIMEOUT_SECONDS, CACHE_TTL_SECONDS
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+from app.core.config import (
+    SWAPI_BASE_URL,
+    SUPPORTED_RESOURCES,
+    HTTP_TIMEOUT_SECONDS,
+    CACHE_BACKEND,
+    CACHE_SHARED_PATH,
+    CACHE_TTL_SECONDS,
+    CACHE_TTL_ENTITY_SECONDS,
+    CACHE_TTL_LIST_SECONDS,
+    CACHE_TTL_SEARCH_SECONDS,
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_BYTES,
+    CACHE_SWEEP_INTERVAL_SECONDS,
+    CACHE_MAX_STALE_SECONDS,
+    CACHE_STALE_WHILE_REVALIDATE,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP2_ENABLED,
+    FANOUT_MAX_CONCURRENCY,
+)
+from app.core import metrics
 from app.core.errors import UpstreamError, NotFoundError
-from app.services.cache import TTLCache
+from app.core.request_context import mark_served_stale, record_stage, record_upstream_fetch
+from app.services import disk_cache, upstream_policy
+from app.services.cache import create_cache
 
-_cache = TTLCache(ttl_seconds=CACHE_TTL_SECONDS)
+logger = logging.getLogger(__name__)
+
+_cache = create_cache(
+    backend=CACHE_BACKEND,
+    shared_path=CACHE_SHARED_PATH,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    namespace_ttls={
+        "entity": CACHE_TTL_ENTITY_SECONDS,
+        "list": CACHE_TTL_LIST_SECONDS,
+        "search": CACHE_TTL_SEARCH_SECONDS,
+    },
+    sweep_interval_seconds=CACHE_SWEEP_INTERVAL_SECONDS,
+    max_stale_seconds=CACHE_MAX_STALE_SECONDS,
+)
+
+metrics.register_cache("upstream", _cache)
+
+# client HTTP compartilhado: evita um handshake TCP+TLS por cache miss
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_counters = {"requests": 0, "in_flight": 0, "peak_in_flight": 0}
+
+# single-flight: misses simultâneos da mesma chave compartilham uma única chamada
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+_singleflight_counters = {"leaders": 0, "coalesced": 0}
+_stale_counters = {"served_stale_revalidate": 0, "served_stale_on_error": 0}
+
+# status da SWAPI que valem retry (o resto dos 4xx/5xx é definitivo)
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = HTTP2_ENABLED
+    if http2 and not _http2_available():
+        logger.warning("HTTP2_ENABLED=true but package 'h2' is not installed; falling back to HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+async def open_client() -> httpx.AsyncClient:
+    """Cria o client compartilhado (chamado no lifespan da aplicação)."""
+    return get_client()
+
+async def close_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+def _cache_namespace(url: str, params: Optional[Dict[str, Any]]) -> str:
+    if params and params.get("search"):
+        return "search"
+    # .../people/1/ é entidade; .../people/?page=2 é página de listagem
+    if url.rstrip("/").rsplit("/", 1)[-1].isdigit():
+        return "entity"
+    return "list"
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Retorna o client do processo. Se o lifespan não rodou (ex.: TestClient sem
+    context manager) ou o event loop mudou, cria um novo client para o loop atual.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+def pool_stats() -> Dict[str, Any]:
+    """Uso do pool de conexões, para dimensionar HTTP_MAX_CONNECTIONS / keep-alive."""
+    stats: Dict[str, Any] = {
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry_seconds": HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        "http2": False,
+        "connections": 0,
+        "idle_connections": 0,
+        "active_connections": 0,
+        **_pool_counters,
+    }
+    if _client is None or _client.is_closed:
+        return stats
+
+    # httpx não expõe o pool publicamente; o httpcore sim (best effort)
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    stats["http2"] = bool(getattr(pool, "_http2", False))
+    stats["connections"] = len(connections)
+    stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    stats["active_connections"] = stats["connections"] - stats["idle_connections"]
+    return stats
 
 def _full_url(path: str) -> str:
     if path.startswith("http://") or path.startswith("https://"):
         return path
     return f"{SWAPI_BASE_URL.rstrip('/')}/{path.lstrip('/')}"
 
-async def get_json(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    url = _full_url(path)
-
+def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
     # chave simples (boa o suficiente pro case)
-    cache_key = url + (
+    return url + (
         "?" + "&".join([f"{k}={v}" for k, v in (params or {}).items()])
         if params else ""
     )
 
+def cache_key_for(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return _cache_key(_full_url(path), params)
+
+def is_cached(path: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """Se a chamada seria respondida pelo cache (sem ir à SWAPI); não altera as estatísticas."""
+    return _cache.peek(_cache_key(_full_url(path), params)) is not None
+
+def _resource_label(url: str) -> str:
+    # label de baixa cardinalidade: só o recurso (people/planets/...), nunca o ID
+    for part in urlsplit(url).path.split("/"):
+        if part in SUPPORTED_RESOURCES:
+            return part
+    return "other"
+
+async def get_json(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    url = _full_url(path)
+    cache_key = _cache_key(url, params)
+
     cached = _cache.get(cache_key)
     if cached is not None:
+        metrics.GET_JSON_RESULTS.inc(_resource_label(url), "hit")
         return cached
 
+    stale = _cache.get_stale(cache_key)
+
+    # segundo nível (disco): só consultado quando a memória não tem a chave;
+    # vale o TTL do namespace (o do disco é só retenção): mais velha que ele é stale
+    disk = disk_cache.get_tier()
+    if disk is not None:
+        stored = disk.get_entry(cache_key)
+        if stored is not None:
+            value, age = stored
+            ttl = _cache.ttl_for(_cache_namespace(url, params))
+            if age < ttl:
+                _cache.set(cache_key, value, ttl=ttl - age)
+                metrics.GET_JSON_RESULTS.inc(_resource_label(url), "disk")
+                return value
+            if stale is None and age < ttl + CACHE_MAX_STALE_SECONDS:
+                stale = value
+
+    if stale is not None and CACHE_STALE_WHILE_REVALIDATE:
+        # devolve o valor expirado na hora e atualiza em background
+        _start_load(url, params, cache_key)
+        _stale_counters["served_stale_revalidate"] += 1
+        metrics.GET_JSON_RESULTS.inc(_resource_label(url), "stale")
+        mark_served_stale()
+        return stale
+
+    metrics.GET_JSON_RESULTS.inc(_resource_label(url), "load")
+    try:
+        # shield: se quem disparou a chamada for cancelado, os demais continuam esperando
+        return await asyncio.shield(_start_load(url, params, cache_key))
+    except UpstreamError as e:
+        if stale is None:
+            raise
+        logger.warning("Serving stale data for %s: %s", cache_key, e.message)
+        _stale_counters["served_stale_on_error"] += 1
+        mark_served_stale()
+        return stale
+
+def _start_load(url: str, params: Optional[Dict[str, Any]], cache_key: str) -> "asyncio.Task[Dict[str, Any]]":
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(cache_key)
+    if task is not None and task.get_loop() is loop:
+        _singleflight_counters["coalesced"] += 1
+        return task
+
+    _singleflight_counters["leaders"] += 1
+    task = loop.create_task(_load(url, params, cache_key))
+    _inflight[cache_key] = task
+    task.add_done_callback(lambda t: _forget_inflight(cache_key, t))
+    return task
+
+def _forget_inflight(cache_key: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    # falhas são repassadas a quem espera e não vão para o cache;
+    # marca a exceção como lida para não gerar warning quando ninguém aguarda
+    if not task.cancelled():
+        task.exception()
+
+def singleflight_stats() -> Dict[str, int]:
+    return {**_singleflight_counters, "in_flight_keys": len(_inflight)}
+
+def stale_stats() -> Dict[str, Any]:
+    return {
+        **_stale_counters,
+        "stale_while_revalidate": CACHE_STALE_WHILE_REVALIDATE,
+        "max_stale_seconds": CACHE_MAX_STALE_SECONDS,
+    }
+
+async def _load(url: str, params: Optional[Dict[str, Any]], cache_key: str) -> Dict[str, Any]:
+    client = get_client()
+    # retries, hedge, limite adaptativo e circuit breaker por host
+    return await upstream_policy.for_url(url).call(lambda: _fetch(client, url, params, cache_key))
+
+async def _fetch(client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]], cache_key: str) -> Dict[str, Any]:
+    _pool_counters["requests"] += 1
+    record_upstream_fetch()
+    _pool_counters["in_flight"] += 1
+    _pool_counters["peak_in_flight"] = max(_pool_counters["peak_in_flight"], _pool_counters["in_flight"])
+    resource = _resource_label(url)
+    status = "error"
+    start = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
-            resp = await client.get(url, params=params)
+        resp = await client.get(url, params=params)
+        status = str(resp.status_code)
 
-            # ✅ Mapeamento correto de 404
-            if resp.status_code == 404:
-                raise NotFoundError(f"SWAPI resource not found: {url}")
+        # ✅ Mapeamento correto de 404
+        if resp.status_code == 404:
+            raise NotFoundError(f"SWAPI resource not found: {url}")
 
-            # ✅ Outros erros upstream viram 502
-            if resp.status_code >= 400:
-                raise UpstreamError(f"SWAPI error {resp.status_code} for {url}", status_code=502)
+        # ✅ Outros erros upstream viram 502
+        if resp.status_code >= 400:
+            raise UpstreamError(
+                f"SWAPI error {resp.status_code} for {url}",
+                status_code=502,
+                retryable=resp.status_code in RETRYABLE_STATUS,
+                upstream_status=resp.status_code,
+            )
 
-            data = resp.json()
-            _cache.set(cache_key, data)
-            return data
+        data = resp.json()
+        _cache.set(cache_key, data, namespace=_cache_namespace(url, params), size=len(resp.content))
+        disk = disk_cache.get_tier()
+        if disk is not None:
+            disk.put(cache_key, data)  # só enfileira; a gravação roda na thread do disco
+        return data
 
     except httpx.RequestError as e:
-        raise UpstreamError(f"SWAPI request failed: {str(e)}", status_code=502)
+        # falhas de transporte (timeout, conexão) são transitórias
+        raise UpstreamError(
+            f"SWAPI request failed: {str(e)}",
+            status_code=502,
+            retryable=isinstance(e, httpx.TransportError),
+        )
+    finally:
+        _pool_counters["in_flight"] -= 1
+        elapsed = time.perf_counter() - start
+        record_stage("upstream", elapsed)
+        metrics.UPSTREAM_LATENCY.observe(elapsed, resource)
+        metrics.UPSTREAM_REQUESTS.inc(resource, status)
+
+async def fetch_many(paths: Sequence[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Busca várias URLs em paralelo (no máximo `limit` por vez nesta chamada),
+    preservando a ordem de entrada. Se alguma falhar, propaga o erro da
+    primeira URL que falhou na ordem original, como no loop sequencial.
+    """
+    if not paths:
+        return []
+    if len(paths) == 1:
+        return [await get_json(paths[0])]
+
+    semaphore = asyncio.Semaphore(max(1, limit or FANOUT_MAX_CONCURRENCY))
+
+    async def _one(path: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_json(path)
+
+    results = await asyncio.gather(*[_one(p) for p in paths], return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+    return results  # type: ignore[return-value]
 
 def clear_cache() -> None:
     # limpa cache entre testes para evitar falsos positivos/negativos
-    _cache._store.clear()
+    _cache.clear()
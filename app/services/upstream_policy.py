@@ -0,0 +1,382 @@
+"""
+Política das chamadas à SWAPI, por host:
+
+- timeout por tentativa (`UPSTREAM_ATTEMPT_TIMEOUT_SECONDS`) e um prazo total
+  (`HTTP_TIMEOUT_SECONDS`) que as tentativas nunca ultrapassam;
+- retries com backoff exponencial + jitter, só para erros transitórios
+  (timeout/conexão, 429/502/503/504); todas as chamadas são GET (idempotentes);
+- hedge: se a tentativa passa do percentil `UPSTREAM_HEDGE_PERCENTILE` das
+  latências recentes, dispara uma segunda e fica com a que responder primeiro
+  (no máximo `UPSTREAM_HEDGE_MAX_RATIO` das chamadas, para não dobrar a carga);
+- limite de concorrência adaptativo (AIMD): cresce devagar a cada sucesso e cai
+  pela metade a cada falha/timeout;
+- circuit breaker: depois de `UPSTREAM_BREAKER_FAILURES` falhas seguidas falha
+  na hora (503) por `UPSTREAM_BREAKER_RESET_SECONDS`; depois deixa passar uma
+  chamada de teste. O `get_json` já cai para a cópia em cache (stale) nesse caso.
+
+O estado de cada host fica em `GET /health/upstream` e em `/metrics`.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from urllib.parse import urlsplit
+from app.core import metrics
+from app.core.config import (
+    HTTP_TIMEOUT_SECONDS,
+    UPSTREAM_ATTEMPT_TIMEOUT_SECONDS,
+    UPSTREAM_BREAKER_FAILURES,
+    UPSTREAM_BREAKER_RESET_SECONDS,
+    UPSTREAM_HEDGE_ENABLED,
+    UPSTREAM_HEDGE_MAX_RATIO,
+    UPSTREAM_HEDGE_MIN_DELAY_SECONDS,
+    UPSTREAM_HEDGE_MIN_SAMPLES,
+    UPSTREAM_HEDGE_PERCENTILE,
+    UPSTREAM_LIMIT_INITIAL,
+    UPSTREAM_LIMIT_MIN,
+    UPSTREAM_MAX_CONCURRENCY,
+    UPSTREAM_RETRIES,
+    UPSTREAM_RETRY_BASE_SECONDS,
+    UPSTREAM_RETRY_MAX_SECONDS,
+)
+from app.core.errors import NotFoundError, UpstreamError
+
+T = TypeVar("T")
+
+class LatencyTracker:
+    """Janela das últimas latências de sucesso (segundos)."""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+class AdaptiveLimiter:
+    """
+    Limite de chamadas simultâneas (AIMD): +1/limite por sucesso, ×0,5 por falha.
+    As filas são futures do event loop atual; se o loop mudar, o estado é refeito.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttled = 0  # chamadas que esperaram por vaga
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _check_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self.in_flight = 0
+            self._waiters.clear()
+        return loop
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def try_acquire(self) -> bool:
+        self._check_loop()
+        if self.in_flight < int(self.limit):
+            self._take()
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        loop = self._check_loop()
+        if not self._waiters and self.try_acquire():
+            return
+        self.throttled += 1
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter  # a vaga já vem contada por quem liberou
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_failure(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.decrease)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "min": self.minimum,
+            "max": self.maximum,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waiting": len(self._waiters),
+            "throttled": self.throttled,
+        }
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0  # falhas seguidas
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self._clock() - self.opened_at < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # uma chamada de teste por vez; as demais continuam falhando rápido
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        # chamada de teste cancelada sem resultado: libera para a próxima
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_seconds - (self._clock() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 3),
+        }
+
+class UpstreamPolicy:
+    def __init__(
+        self,
+        host: str,
+        attempt_timeout: float = UPSTREAM_ATTEMPT_TIMEOUT_SECONDS,
+        deadline: float = HTTP_TIMEOUT_SECONDS,
+        retries: int = UPSTREAM_RETRIES,
+        retry_base: float = UPSTREAM_RETRY_BASE_SECONDS,
+        retry_max: float = UPSTREAM_RETRY_MAX_SECONDS,
+        hedge_enabled: bool = UPSTREAM_HEDGE_ENABLED,
+        hedge_percentile: float = UPSTREAM_HEDGE_PERCENTILE,
+        hedge_min_samples: int = UPSTREAM_HEDGE_MIN_SAMPLES,
+        hedge_min_delay: float = UPSTREAM_HEDGE_MIN_DELAY_SECONDS,
+        hedge_max_ratio: float = UPSTREAM_HEDGE_MAX_RATIO,
+    ):
+        self.host = host
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        self.latency = LatencyTracker()
+        self.limiter = AdaptiveLimiter(UPSTREAM_LIMIT_INITIAL, UPSTREAM_LIMIT_MIN, UPSTREAM_MAX_CONCURRENCY)
+        self.breaker = CircuitBreaker(UPSTREAM_BREAKER_FAILURES, UPSTREAM_BREAKER_RESET_SECONDS)
+        self.counters = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        if self.counters["hedges"] >= self.hedge_max_ratio * self.counters["calls"]:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile) or 0.0)
+
+    def backoff(self, retry: int) -> float:
+        # "full jitter": espalha os retries de várias requisições no tempo
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** retry))
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Executa `attempt` (uma chamada GET) aplicando a política; erros saem como `UpstreamError`."""
+        self.counters["calls"] += 1
+        give_up_at = time.monotonic() + self.deadline
+        retry = 0
+        while True:
+            if not self.breaker.allow():
+                raise UpstreamError(f"SWAPI circuit open for {self.host}", status_code=503)
+            try:
+                result = await self._hedged(attempt, give_up_at)
+            except NotFoundError:
+                self.breaker.record_success()  # 404 é resposta válida: o host está saudável
+                raise
+            except UpstreamError as e:
+                if e.host_failure:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()  # como o 404: o host respondeu
+                if not e.retryable or retry >= self.retries:
+                    raise
+                pause = self.backoff(retry)
+                if time.monotonic() + pause >= give_up_at:
+                    raise
+                retry += 1
+                self.counters["retries"] += 1
+                await asyncio.sleep(pause)
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _attempt(self, attempt: Callable[[], Awaitable[T]], give_up_at: float, acquired: bool = False) -> T:
+        if not acquired:
+            await self.limiter.acquire()
+        self.counters["attempts"] += 1
+        start = time.monotonic()
+        timeout = max(0.0, min(self.attempt_timeout, give_up_at - start))
+        try:
+            result = await asyncio.wait_for(attempt(), timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.limiter.on_failure()
+            raise UpstreamError(f"SWAPI request to {self.host} timed out", status_code=504, retryable=True)
+        except UpstreamError as e:
+            if e.host_failure:
+                self.limiter.on_failure()
+            raise
+        finally:
+            self.limiter.release()
+        self.latency.add(time.monotonic() - start)
+        self.limiter.on_success()
+        return result
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[T]], give_up_at: float) -> T:
+        delay = self.hedge_delay()
+        first = asyncio.ensure_future(self._attempt(attempt, give_up_at))
+        pending = {first}
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            # sem vaga no limitador não há hedge: ele só pioraria a sobrecarga
+            if done or not self.limiter.try_acquire():
+                return await first
+
+            self.counters["hedges"] += 1
+            second = asyncio.ensure_future(self._attempt(attempt, give_up_at, acquired=True))
+            pending.add(second)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            **self.counters,
+            "breaker": self.breaker.stats(),
+            "limiter": self.limiter.stats(),
+            "latency": {
+                "samples": len(self.latency.samples),
+                "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            },
+            "hedge_delay_ms": round(d * 1000, 2) if (d := self.hedge_delay()) is not None else None,
+        }
+
+_policies: Dict[str, UpstreamPolicy] = {}
+
+def for_url(url: str) -> UpstreamPolicy:
+    host = urlsplit(url).netloc
+    policy = _policies.get(host)
+    if policy is None:
+        policy = _policies[host] = UpstreamPolicy(host)
+    return policy
+
+def stats() -> Dict[str, Any]:
+    return {host: policy.stats() for host, policy in sorted(_policies.items())}
+
+def reset() -> None:
+    _policies.clear()
+
+def _metric_lines() -> List[str]:
+    policies = sorted(_policies.items())
+    lines = metrics.gauge_lines(
+        "swapi_circuit_open", "Circuit breaker aberto (1) ou não (0) por host",
+        (({"host": h}, int(p.breaker.state != CircuitBreaker.CLOSED)) for h, p in policies),
+    )
+    lines += metrics.gauge_lines(
+        "swapi_concurrency_limit", "Limite adaptativo de chamadas simultâneas por host",
+        (({"host": h}, int(p.limiter.limit)) for h, p in policies),
+    )
+    for key, help in (
+        ("retries", "Retries de erros transitórios"),
+        ("hedges", "Chamadas duplicadas por latência (hedge)"),
+        ("hedge_wins", "Hedges que responderam antes da chamada original"),
+        ("timeouts", "Tentativas que estouraram o timeout"),
+    ):
+        lines += metrics.gauge_lines(
+            f"swapi_{key}_total", help, (({"host": h}, p.counters[key]) for h, p in policies), "counter"
+        )
+    lines += metrics.gauge_lines(
+        "swapi_circuit_rejections_total", "Chamadas recusadas com o circuito aberto",
+        (({"host": h}, p.breaker.rejected) for h, p in policies), "counter",
+    )
+    return lines
+
+metrics.register_collector(_metric_lines)
@@ -0,0 +1,173 @@
+"""
+Teste de carga do app real contra a SWAPI falsa local (`benchmarks.fake_server`).
+
+Sobe dois processos (SWAPI falsa com latência/jitter/erros e o app via uvicorn
+apontando `SWAPI_BASE_URL` para ela) e dispara clientes concorrentes em cada
+cenário: listagem, filtros, ordenação, `include=` e personagens de filme.
+
+Por cenário: uma passada fria (sequencial, caches vazios: latência e chamadas
+à SWAPI) e depois a carga concorrente: vazão (req/s), latência
+média/p50/p95/p99/máx, erros e chamadas que chegaram à SWAPI falsa.
+
+O cache de respostas fica desligado por padrão (mede o pipeline, não o HIT);
+qualquer variável do app pode ser passada com `--app-env NOME=valor`
+(ex.: `MIRROR_ENABLED=true`).
+
+    python -m benchmarks.bench_load [--concurrency 20] [--requests 300] [--latency-ms 40]
+        [--output atual.json] [--compare anterior.json]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import httpx
+
+from benchmarks.common import finish, latency_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS: Dict[str, List[str]] = {
+    "list": [f"/v1/resources/people?page={p}" for p in range(1, 10)],
+    "filters": [
+        "/v1/resources/people?gender=male&min_height=150",
+        "/v1/resources/people?eye_color=blue",
+        "/v1/resources/planets?climate=arid&page=2",
+        "/v1/resources/starships?starship_class=Starfighter",
+    ],
+    "sort": [f"/v1/resources/people?sort=height&order=desc&page={p}" for p in range(1, 5)]
+    + ["/v1/resources/planets?sort=population,name"],
+    "include": [f"/v1/resources/people?include=homeworld,films&page={p}" for p in range(1, 5)]
+    + ["/v1/resources/starships?include=pilots.homeworld"],
+    "film_characters": [f"/v1/films/{f}/characters" for f in range(1, 7)]
+    + ["/v1/films/1/characters?sort=name&page_size=20"],
+}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready")
+
+@contextmanager
+def _process(args: List[str], env: Dict[str, str], ready_url: str) -> Iterator[subprocess.Popen]:
+    proc = subprocess.Popen([sys.executable, *args], cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT, **env})
+    try:
+        _wait_ready(ready_url)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+async def _run_scenario(client: httpx.AsyncClient, fake_url: str, queries: List[str], total: int, concurrency: int) -> dict:
+    await client.post(f"{fake_url}/__reset")
+    cycle = itertools.cycle(queries)
+    remaining = total
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            query = next(cycle)
+            start = time.perf_counter()
+            try:
+                status = str((await client.get(query)).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    upstream = (await client.get(f"{fake_url}/__stats")).json()
+    return {
+        "requests": total,
+        "errors": total - statuses.get("200", 0),
+        "statuses": statuses,
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_ms": latency_summary(latencies),
+        "upstream_calls": upstream["calls"],
+        "upstream_errors": upstream["errors"],
+        "upstream_calls_per_request": round(upstream["calls"] / total, 3),
+    }
+
+async def _cold_pass(client: httpx.AsyncClient, fake_url: str, queries: List[str]) -> dict:
+    # primeira passada, sequencial: caches vazios, mostra quanto cada consulta custa na SWAPI
+    await client.post(f"{fake_url}/__reset")
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await client.get(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    upstream = (await client.get(f"{fake_url}/__stats")).json()
+    return {"latency_ms": latency_summary(latencies), "upstream_calls": upstream["calls"]}
+
+async def _drive(app_url: str, fake_url: str, scenarios: List[str], total: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=60, limits=limits) as client:
+        results = {}
+        for name in scenarios:
+            results[name] = {
+                "cold": await _cold_pass(client, fake_url, SCENARIOS[name]),
+                **await _run_scenario(client, fake_url, SCENARIOS[name], total, concurrency),
+            }
+        return results
+
+def run(args: argparse.Namespace) -> dict:
+    fake_port, app_port = _free_port(), _free_port()
+    fake_url, app_url = f"http://127.0.0.1:{fake_port}", f"http://127.0.0.1:{app_port}"
+    fake_args = [
+        "-m", "benchmarks.fake_server", "--port", str(fake_port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+    ]
+    app_env = {
+        "SWAPI_BASE_URL": f"{fake_url}/api",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "REQUEST_LOG_ENABLED": "false",
+        **dict(item.split("=", 1) for item in args.app_env),
+    }
+    app_args = ["-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning", "--no-access-log"]
+
+    with _process(fake_args, {}, f"{fake_url}/__stats"), _process(app_args, app_env, f"{app_url}/health"):
+        return asyncio.run(_drive(app_url, fake_url, args.scenario or list(SCENARIOS), args.requests, args.concurrency))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300, help="requisições por cenário")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repetível; padrão: todos")
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--app-env", action="append", default=[], metavar="NOME=valor")
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--compare", help="resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    results = run(args)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    finish(results, config, args.output, args.compare)
+
+if __name__ == "__main__":
+    main()
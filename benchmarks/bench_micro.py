@@ -0,0 +1,113 @@
+"""
+Micro-benchmarks das peças quentes do pipeline, sem rede nem HTTP:
+
+- `apply_filters`: filtros comuns sobre o dataset da SWAPI falsa (replicado);
+- `sort_items`: ordenação simples/composta, completa e top-k (`limit`);
+- `TTLCache`: get com hit/miss e set com despejo LRU;
+- `SearchIndex`: busca exata, por substring e com erro de digitação (sem o cache de consultas).
+
+Resultado em µs por chamada (melhor de `--repeat` rodadas), em JSON.
+
+    python -m benchmarks.bench_micro [--scale 10] [--output atual.json] [--compare anterior.json]
+"""
+import argparse
+import copy
+import timeit
+from typing import Callable, Dict
+
+from app.services.cache import TTLCache
+from app.services.filters import apply_filters
+from app.services.search_index import SearchIndex
+from app.services.sorting import sort_items
+from benchmarks.common import finish
+from tests.fake_swapi import build_dataset
+
+def _best_us(fn: Callable[[], object], repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # chamadas suficientes para ~0,2 s por rodada
+    return round(min(timer.repeat(repeat=repeat, number=number)) / number * 1e6, 3)
+
+def bench_filters(people, planets, repeat: int) -> Dict[str, float]:
+    cases = {
+        "people_gender": (people, {"gender": "male"}),
+        "people_height_range": (people, {"min_height": 120, "max_height": 200}),
+        "people_combined": (people, {"gender": "female", "eye_color": "blue", "min_height": 100}),
+        "planets_climate_population": (planets, {"climate": "temperate", "min_population": 1000000}),
+    }
+    return {name: _best_us(lambda rows=rows, f=f: apply_filters(rows, f), repeat) for name, (rows, f) in cases.items()}
+
+def bench_sort(people, repeat: int) -> Dict[str, float]:
+    cases = {
+        "name": dict(sort="name"),
+        "height_desc": dict(sort="height", order="desc"),
+        "composite": dict(sort="gender,height:desc,name"),
+        "height_top10": dict(sort="height", order="desc", limit=10),
+    }
+    return {name: _best_us(lambda kw=kw: sort_items(people, **kw), repeat) for name, kw in cases.items()}
+
+def bench_cache(repeat: int, entries: int = 1000) -> Dict[str, float]:
+    cache = TTLCache(ttl_seconds=600, max_entries=entries)
+    keys = [f"people/{i}/" for i in range(entries)]
+    for k in keys:
+        cache.set(k, {"url": k}, size=200)
+
+    missing = [f"planets/{i}/" for i in range(entries)]
+    evicting = TTLCache(ttl_seconds=600, max_entries=entries // 2)
+
+    def get_hits():
+        for k in keys:
+            cache.get(k)
+
+    def get_misses():
+        for k in missing:
+            cache.get(k)
+
+    def set_with_eviction():
+        for k in keys:
+            evicting.set(k, k, size=200)
+
+    # por operação (cada chamada percorre `entries` chaves)
+    return {
+        "get_hit": round(_best_us(get_hits, repeat) / entries, 4),
+        "get_miss": round(_best_us(get_misses, repeat) / entries, 4),
+        "set_evicting": round(_best_us(set_with_eviction, repeat) / entries, 4),
+    }
+
+def bench_search(people, repeat: int) -> Dict[str, float]:
+    # IDs únicos para as cópias do dataset
+    rows = [{**p, "url": f"https://swapi.dev/api/people/{i}/"} for i, p in enumerate(people, 1)]
+    index = SearchIndex("people")
+    index.update(rows, version=1)
+    cases = {"exact": "luke", "substring": "kywalk", "typo": "skywaker", "two_terms": "leia organa"}
+
+    def search(term):
+        index._queries.clear()
+        return index.search_rows(term)
+
+    return {name: _best_us(lambda t=term: search(t), repeat) for name, term in cases.items()}
+
+def run(scale: int, repeat: int) -> dict:
+    data = build_dataset()
+    people = [copy.deepcopy(p) for _ in range(scale) for p in data["people"]]
+    planets = [copy.deepcopy(p) for _ in range(scale) for p in data["planets"]]
+    return {
+        "rows": {"people": len(people), "planets": len(planets)},
+        "apply_filters_us": bench_filters(people, planets, repeat),
+        "sort_items_us": bench_sort(people, repeat),
+        "ttl_cache_us_per_op": bench_cache(repeat),
+        "search_index_us": bench_search(people, repeat),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10, help="quantas cópias do dataset (82 pessoas cada)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--compare", help="resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.repeat)
+    finish(results, {"scale": args.scale, "repeat": args.repeat}, args.output, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara a serialização de respostas grandes (com `include=` aninhado):
+
+- caminho padrão: `PaginatedResponse` + validação/serialização do `response_model`
+- caminho rápido: `FastJSONResponse` (orjson, sem revalidar as linhas)
+
+Roda a aplicação real em processo contra a SWAPI falsa (espelho carregado),
+com o cache de respostas desligado para medir o pipeline inteiro.
+
+    python -m benchmarks.bench_serialization [--iterations 200] [--output resultado.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+import httpx
+import respx
+
+from app.core import response_cache, responses
+from app.main import app
+from app.services import mirror
+from tests.fake_swapi import FakeSwapi
+
+QUERY = "/v1/resources/people?include=films.characters,starships,homeworld&sort=name"
+
+async def _measure(client: httpx.AsyncClient, iterations: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        r = await client.get(QUERY)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(r.content)
+        assert r.status_code == 200, r.text
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "payload_bytes": size,
+    }
+
+async def run(iterations: int) -> dict:
+    response_cache.RESPONSE_CACHE_ENABLED = False
+    results = {}
+    with respx.mock(assert_all_called=False) as router:
+        router.route(host="swapi.dev").mock(side_effect=FakeSwapi())
+        for resource in ("people", "films", "starships", "planets"):
+            await mirror.ingest(resource)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label, enabled in (("pydantic_response_model", False), ("fast_orjson", True)):
+                responses.FAST_RESPONSE_ENABLED = enabled
+                await _measure(client, 5)  # aquecimento
+                results[label] = await _measure(client, iterations)
+
+    results["speedup"] = results["pydantic_response_model"]["mean_ms"] / results["fast_orjson"]["mean_ms"]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args.iterations))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
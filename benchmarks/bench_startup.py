@@ -0,0 +1,123 @@
+"""
+Cold start da entrada do Cloud Functions (`main.py`), medido em processos novos:
+
+- `import_ms`: import do módulo (FastAPI + routers + lifespan já rodando na ponte);
+- `first_response_ms`: primeira requisição de listagem depois do import;
+- `bridge_request_us`: custo médio por requisição da ponte ASGI (rota `/health`),
+  comparado com `a2wsgi` + `WzResponse.from_app` quando o pacote estiver instalado.
+
+Cenários: com snapshot do espelho (`MIRROR_SNAPSHOT_PATH`) e sem snapshot,
+com a SWAPI falsa respondendo com `--upstream-latency-ms`.
+
+    python -m benchmarks.bench_startup [--runs 5] [--output resultado.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERY = "/v1/resources/people?sort=name&fields=name,height"
+
+CHILD = r"""
+import json, os, sys, time
+# a SWAPI falsa (e o que ela importa) fica fora da medição nos dois cenários
+import respx
+from tests.fake_swapi import FakeSwapi
+
+latency = float(os.environ["BENCH_UPSTREAM_LATENCY_MS"]) / 1000
+fake = FakeSwapi()
+def slow(request):
+    time.sleep(latency)
+    return fake(request)
+router = respx.mock(assert_all_called=False)
+router.route(host="swapi.dev").mock(side_effect=slow)
+router.start()
+
+t0 = time.perf_counter()
+import logging
+logging.disable(logging.INFO)
+import main
+t1 = time.perf_counter()
+
+from werkzeug.test import EnvironBuilder
+path, _, qs = os.environ["BENCH_QUERY"].partition("?")
+r = main.handler(EnvironBuilder(path=path, query_string=qs).get_request())
+assert r.status_code == 200, r.get_data()
+t2 = time.perf_counter()
+
+def per_request_us(call, n=300):
+    req = EnvironBuilder(path="/health").get_request()
+    call(req)
+    start = time.perf_counter()
+    for _ in range(n):
+        call(req)
+    return (time.perf_counter() - start) / n * 1e6
+
+out = {
+    "import_ms": (t1 - t0) * 1000,
+    "first_response_ms": (t2 - t1) * 1000,
+    "bridge_request_us": per_request_us(main.handler),
+}
+try:
+    from a2wsgi import ASGIMiddleware
+    from werkzeug.wrappers import Response as WzResponse
+    legacy = ASGIMiddleware(main.fastapi_app)
+    out["a2wsgi_request_us"] = per_request_us(lambda req: WzResponse.from_app(legacy, req.environ))
+except ImportError:
+    pass
+out["upstream_calls"] = len(fake.calls)
+print(json.dumps(out))
+"""
+
+def _build_snapshot(path: str) -> None:
+    sys.path.insert(0, ROOT)
+    from app.services import mirror, snapshot
+    from tests.fake_swapi import build_dataset
+
+    for resource, items in build_dataset().items():
+        mirror.load_items(resource, items)
+    snapshot.save_snapshot(path)
+    mirror.clear()
+
+def _run_child(env_extra: dict) -> dict:
+    env = {**os.environ, **env_extra, "BENCH_QUERY": QUERY, "PYTHONPATH": ROOT}
+    proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _summary(samples: list) -> dict:
+    return {k: statistics.median(s[k] for s in samples) for k in samples[0]}
+
+def run(runs: int, latency_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json.gz")
+        _build_snapshot(path)
+        base = {"BENCH_UPSTREAM_LATENCY_MS": str(latency_ms)}
+        return {
+            "runs": runs,
+            "upstream_latency_ms": latency_ms,
+            "with_snapshot": _summary([_run_child({**base, "MIRROR_SNAPSHOT_PATH": path}) for _ in range(runs)]),
+            "without_snapshot": _summary([_run_child({**base, "MIRROR_SNAPSHOT_PATH": ""}) for _ in range(runs)]),
+        }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--upstream-latency-ms", type=float, default=150)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.upstream_latency_ms)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
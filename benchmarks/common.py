@@ -0,0 +1,62 @@
+"""Utilidades compartilhadas pelos benchmarks (percentis, gravação e comparação de resultados em JSON)."""
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+    # 99 pontos de corte: índice 49 = p50, 94 = p95, 98 = p99
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+
+def _leaves(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _leaves(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Linhas `métrica: antes -> depois (+x%)` para os números presentes nos dois resultados."""
+    before = dict(_leaves(baseline.get("results", baseline)))
+    lines = []
+    for key, value in _leaves(current.get("results", current)):
+        old = before.get(key)
+        if old is None or (old == 0 and value == 0):
+            continue
+        change = f"{(value - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"{key}: {old:g} -> {value:g} ({change})")
+    return lines
+
+def finish(results: Dict[str, Any], config: Dict[str, Any], output: Optional[str], baseline: Optional[str]) -> None:
+    """Imprime/grava `{"environment", "config", "results"}` e, com `baseline`, a diferença para ele."""
+    report = {"environment": environment(), "config": config, "results": results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f)
+        print(f"\n# comparado com {baseline}")
+        for line in compare(report, previous):
+            print(line)
@@ -0,0 +1,108 @@
+"""
+SWAPI falsa servida por HTTP de verdade (uvicorn), para os benchmarks de carga.
+
+Usa o mesmo dataset determinístico de `tests/fake_swapi.py`, com as URLs
+absolutas reescritas para o endereço local, e simula a rede:
+
+- `--latency-ms` / `--jitter-ms`: atraso uniforme em [latência - jitter, latência + jitter];
+- `--error-rate`: fração das respostas que vira 503.
+
+`GET /__stats` devolve as chamadas recebidas (total, por recurso, erros) e
+`POST /__reset` zera os contadores.
+
+    python -m benchmarks.fake_server --port 8765 --latency-ms 40 --jitter-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl
+from tests.fake_swapi import BASE_URL, FakeSwapi
+
+class FakeSwapiServer:
+    """App ASGI mínima em cima do `FakeSwapi` (sem framework: o overhead fica todo no app medido)."""
+
+    def __init__(
+        self,
+        base_url: str,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        seed: Optional[int] = 0,
+    ):
+        self.fake = FakeSwapi()
+        self.base_url = base_url.rstrip("/")
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": sum(self.calls.values()), "by_resource": dict(self.calls), "errors": self.errors}
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        path = scope["path"]
+        if path == "/__stats":
+            await self._send(send, 200, self.stats())
+            return
+        if path == "/__reset":
+            self.calls.clear()
+            self.errors = 0
+            await self._send(send, 200, {"ok": True})
+            return
+
+        parts = [p for p in path.split("/") if p]
+        self.calls[parts[1] if len(parts) > 1 else "other"] += 1
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            await self._send(send, 503, {"detail": "Service Unavailable"})
+            return
+
+        params = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+        status, body = self.fake.handle(path, params)
+        await self._send(send, status, body)
+
+    async def _send(self, send, status: int, body: Any) -> None:
+        raw = json.dumps(body).replace(BASE_URL, self.base_url).encode()
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(raw)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": raw})
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    server = FakeSwapiServer(
+        f"http://{args.host}:{args.port}/api", args.latency_ms, args.jitter_ms, args.error_rate, args.seed
+    )
+    uvicorn.run(server, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+if __name__ == "__main__":
+    main()
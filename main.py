@@ -1,11 +1,13 @@
 import functions_framework
-from a2wsgi import ASGIMiddleware
-from werkzeug.wrappers import Response as WzResponse
 
+from app.core.wsgi_bridge import AsgiBridge
 from app.main import app as fastapi_app
 
-wsgi_app = ASGIMiddleware(fastapi_app)
+# o loop, o lifespan (snapshot do espelho + client HTTP) e os caches sobem
+# na carga da instância, não na primeira requisição
+bridge = AsgiBridge(fastapi_app)
+bridge.start()
 
 @functions_framework.http
 def handler(request):
-    return WzResponse.from_app(wsgi_app, request.environ)
+    return bridge.handle(request)
@@ -1,13 +1,32 @@
 import pytest
+import respx
 from fastapi.testclient import TestClient
 from app.main import app
-from app.services import swapi_client
+from tests.fake_swapi import FakeSwapi
+from app.core import metrics, response_cache
+from app.services import aggregate, mirror, search_index, sorting, swapi_client, upstream_policy
 
 @pytest.fixture(autouse=True)
 def _clear_swapi_cache():
     swapi_client.clear_cache()
+    mirror.clear()
+    sorting.clear_cache()
+    aggregate.clear()
+    search_index.clear()
+    response_cache.clear()
+    metrics.reset()
+    upstream_policy.reset()
     yield
 
 @pytest.fixture()
 def client():
     return TestClient(app)
+
+
+@pytest.fixture()
+def fake_swapi():
+    # SWAPI falsa completa (todas as páginas/entidades) servida via respx
+    with respx.mock(assert_all_called=False) as router:
+        fake = FakeSwapi()
+        router.route(host="swapi.dev").mock(side_effect=fake)
+        yield fake
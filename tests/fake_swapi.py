@@ -0,0 +1,187 @@
+"""
+SWAPI falsa para testes: gera um dataset determinístico com o mesmo formato
+da swapi.dev (paginação de 10 itens, `search=`, URLs absolutas nas relações)
+e responde requisições httpx. Uso com respx:
+
+    fake = FakeSwapi()
+    respx.route(host="swapi.dev").mock(side_effect=fake)
+"""
+import random
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import httpx
+
+BASE_URL = "https://swapi.dev/api"
+PAGE_SIZE = 10
+
+SEARCH_FIELDS = {
+    "people": ["name"],
+    "planets": ["name"],
+    "starships": ["name", "model"],
+    "films": ["title"],
+}
+
+_FIRST_NAMES = ["Luke", "Leia", "Han", "Anakin", "Padmé", "Obi-Wan", "Lando", "Mace", "Qui-Gon", "Jyn",
+                "Cassian", "Poe", "Rey", "Finn", "Kylo", "Wedge", "Biggs", "Jango", "Boba", "Din"]
+_LAST_NAMES = ["Skywalker", "Organa", "Solo", "Amidala", "Kenobi", "Calrissian", "Windu", "Jinn", "Erso",
+               "Andor", "Dameron", "Antilles", "Darklighter", "Fett", "Djarin", "Tano", "Ren", "Lars"]
+_COLORS = ["blue", "brown", "yellow", "red", "black", "green", "hazel", "unknown"]
+_HAIR = ["blond", "brown", "black", "none", "white", "auburn", "n/a"]
+_GENDERS = ["male", "female", "n/a", "hermaphrodite"]
+_CLIMATES = ["arid", "temperate", "tropical", "frozen", "murky", "temperate, tropical", "unknown"]
+_TERRAINS = ["desert", "grasslands, mountains", "jungle, rainforests", "tundra, ice caves", "swamp, jungles",
+             "ocean", "cityscape, mountains", "unknown"]
+_CLASSES = ["Starfighter", "Light freighter", "Star Destroyer", "Corvette", "Transport", "Deep Space Mobile Battlestation"]
+
+
+def _url(resource: str, item_id: int) -> str:
+    return f"{BASE_URL}/{resource}/{item_id}/"
+
+
+def build_dataset(people: int = 82, planets: int = 60, starships: int = 36, films: int = 6, seed: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    rnd = random.Random(seed)
+
+    film_ids = list(range(1, films + 1))
+    planet_ids = list(range(1, planets + 1))
+    starship_ids = list(range(1, starships + 1))
+    person_ids = list(range(1, people + 1))
+
+    people_rows = []
+    for i in person_ids:
+        first = _FIRST_NAMES[(i - 1) % len(_FIRST_NAMES)]
+        last = _LAST_NAMES[(i * 7) % len(_LAST_NAMES)]
+        people_rows.append({
+            "name": f"{first} {last}" if i <= len(_FIRST_NAMES) else f"{first} {last} {i}",
+            "height": "unknown" if i % 17 == 0 else str(rnd.randint(66, 264)),
+            "mass": "unknown" if i % 11 == 0 else f"{rnd.randint(15, 1500):,}",
+            "hair_color": rnd.choice(_HAIR),
+            "skin_color": rnd.choice(["fair", "gold", "white, blue", "green", "light"]),
+            "eye_color": rnd.choice(_COLORS),
+            "birth_year": "unknown" if i % 13 == 0 else f"{rnd.randint(8, 900)}BBY",
+            "gender": rnd.choice(_GENDERS),
+            "homeworld": _url("planets", rnd.choice(planet_ids)),
+            "films": [_url("films", f) for f in sorted(rnd.sample(film_ids, rnd.randint(1, min(3, films))))],
+            "species": [],
+            "vehicles": [],
+            "starships": [_url("starships", s) for s in sorted(rnd.sample(starship_ids, rnd.randint(0, min(2, starships))))],
+            "created": "2014-12-09T13:50:51.644000Z",
+            "edited": "2014-12-20T21:17:56.891000Z",
+            "url": _url("people", i),
+        })
+
+    planet_rows = []
+    for i in planet_ids:
+        residents = [p["url"] for p in people_rows if p["homeworld"] == _url("planets", i)]
+        planet_rows.append({
+            "name": f"Planet {i}" if i > 3 else ["Tatooine", "Alderaan", "Yavin IV"][i - 1],
+            "rotation_period": str(rnd.randint(10, 60)),
+            "orbital_period": str(rnd.randint(200, 5000)),
+            "diameter": str(rnd.randint(0, 120000)),
+            "climate": rnd.choice(_CLIMATES),
+            "gravity": "1 standard",
+            "terrain": rnd.choice(_TERRAINS),
+            "surface_water": str(rnd.randint(0, 100)),
+            "population": "unknown" if i % 7 == 0 else str(rnd.choice([0, 1000, 200000, 30000000, 2000000000, 1000000000000])),
+            "residents": residents,
+            "films": [_url("films", f) for f in sorted(rnd.sample(film_ids, rnd.randint(0, min(2, films))))],
+            "created": "2014-12-09T13:50:49.641000Z",
+            "edited": "2014-12-20T20:58:18.411000Z",
+            "url": _url("planets", i),
+        })
+
+    starship_rows = []
+    for i in starship_ids:
+        starship_rows.append({
+            "name": f"Starship {i}" if i > 3 else ["X-wing", "Millennium Falcon", "Death Star"][i - 1],
+            "model": f"Model {rnd.choice('ABCDEFTXY')}-{rnd.randint(1, 99)}",
+            "manufacturer": rnd.choice(["Incom Corporation", "Corellian Engineering Corporation", "Kuat Drive Yards"]),
+            "cost_in_credits": "unknown" if i % 5 == 0 else str(rnd.randint(10000, 1000000000)),
+            "length": f"{rnd.randint(5, 19000):,}",
+            "max_atmosphering_speed": "n/a" if i % 9 == 0 else str(rnd.randint(100, 1500)),
+            "crew": str(rnd.randint(1, 300000)),
+            "passengers": str(rnd.randint(0, 800000)),
+            "cargo_capacity": str(rnd.randint(0, 1000000000)),
+            "consumables": rnd.choice(["1 week", "2 months", "3 years"]),
+            "hyperdrive_rating": str(rnd.choice([0.5, 1.0, 2.0, 4.0])),
+            "MGLT": str(rnd.randint(10, 120)),
+            "starship_class": rnd.choice(_CLASSES),
+            "pilots": [p["url"] for p in people_rows if _url("starships", i) in p["starships"]],
+            "films": [_url("films", f) for f in sorted(rnd.sample(film_ids, rnd.randint(1, min(2, films))))],
+            "created": "2014-12-10T14:20:33.369000Z",
+            "edited": "2014-12-20T21:23:49.867000Z",
+            "url": _url("starships", i),
+        })
+
+    film_rows = []
+    for i in film_ids:
+        film_url = _url("films", i)
+        film_rows.append({
+            "title": f"Episode {i}" if i > 3 else ["A New Hope", "The Empire Strikes Back", "Return of the Jedi"][i - 1],
+            "episode_id": i,
+            "opening_crawl": "It is a period of civil war...",
+            "director": rnd.choice(["George Lucas", "Irvin Kershner", "Richard Marquand"]),
+            "producer": "Gary Kurtz, Rick McCallum",
+            "release_date": f"{1976 + i}-05-25",
+            "characters": [p["url"] for p in people_rows if film_url in p["films"]],
+            "planets": [p["url"] for p in planet_rows if film_url in p["films"]],
+            "starships": [s["url"] for s in starship_rows if film_url in s["films"]],
+            "vehicles": [],
+            "species": [],
+            "created": "2014-12-10T14:23:31.880000Z",
+            "edited": "2014-12-20T19:49:45.256000Z",
+            "url": film_url,
+        })
+
+    return {"people": people_rows, "planets": planet_rows, "starships": starship_rows, "films": film_rows}
+
+
+class FakeSwapi:
+    """Handler síncrono compatível com `side_effect` do respx (e com o transporte mock do httpx)."""
+
+    def __init__(self, dataset: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.dataset = dataset if dataset is not None else build_dataset()
+        self.calls: List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(str(request.url))
+        status, body = self.handle(request.url.path, dict(request.url.params))
+        return httpx.Response(status, json=body)
+
+    def handle(self, path: str, params: Dict[str, str]):
+        parts = [p for p in path.split("/") if p]
+        if parts and parts[0] == "api":
+            parts = parts[1:]
+        if not parts or parts[0] not in self.dataset:
+            return 404, {"detail": "Not found"}
+
+        rows = self.dataset[parts[0]]
+        if len(parts) == 2:
+            if not parts[1].isdigit() or not (1 <= int(parts[1]) <= len(rows)):
+                return 404, {"detail": "Not found"}
+            return 200, rows[int(parts[1]) - 1]
+        return self._list(parts[0], rows, params)
+
+    def _list(self, resource: str, rows: List[Dict[str, Any]], params: Dict[str, str]):
+        search = (params.get("search") or "").lower()
+        if search:
+            fields = SEARCH_FIELDS[resource]
+            rows = [r for r in rows if any(search in str(r.get(f, "")).lower() for f in fields)]
+
+        try:
+            page = int(params.get("page", "1"))
+        except ValueError:
+            return 404, {"detail": "Not found"}
+        start = (page - 1) * PAGE_SIZE
+        if page < 1 or (start >= len(rows) and page != 1):
+            return 404, {"detail": "Not found"}
+
+        def link(n: int) -> str:
+            query = {"page": n, **({"search": search} if search else {})}
+            return f"{BASE_URL}/{resource}/?{urlencode(query)}"
+
+        return 200, {
+            "count": len(rows),
+            "next": link(page + 1) if start + PAGE_SIZE < len(rows) else None,
+            "previous": link(page - 1) if page > 1 else None,
+            "results": rows[start:start + PAGE_SIZE],
+        }
@@ -0,0 +1,65 @@
+from statistics import mean
+from app.core import response_cache
+from app.services import aggregate, mirror
+from app.services.filters import parse_number
+
+
+def test_average_height_by_gender(client, fake_swapi):
+    r = client.get("/v1/resources/people/aggregate?group_by=gender&metrics=count,avg:height,max:height")
+    assert r.status_code == 200
+    data = r.json()
+
+    people = fake_swapi.dataset["people"]
+    assert data["count"] == len(people)
+    assert data["metrics"] == ["count", "avg_height", "max_height"]
+    for group in data["groups"]:
+        rows = [p for p in people if p["gender"] == group["key"]["gender"]]
+        heights = [h for h in (parse_number(p["height"]) for p in rows) if h is not None]
+        assert group["count"] == len(rows)
+        assert group["avg_height"] == round(mean(heights), 4)
+        assert group["max_height"] == max(heights)
+    assert sum(g["count"] for g in data["groups"]) == len(people)
+
+
+def test_filters_apply_and_result_is_memoized(client, fake_swapi):
+    url = "/v1/resources/planets/aggregate?group_by=climate&metrics=sum:population&min_population=1000"
+    first = client.get(url).json()
+    planets = [p for p in fake_swapi.dataset["planets"] if (parse_number(p["population"]) or 0) >= 1000]
+    assert first["count"] == len(planets)
+    assert sum(g["sum_population"] or 0 for g in first["groups"]) == sum(parse_number(p["population"]) for p in planets)
+
+    calls = len(fake_swapi.calls)
+    hits = aggregate._results.stats()["hits"]
+    response_cache.clear()  # a resposta serializada também fica em cache; aqui interessa a memoização
+    assert client.get(url).json() == first
+    assert aggregate._results.stats()["hits"] == hits + 1
+    assert len(fake_swapi.calls) == calls
+
+
+def test_recomputed_when_mirror_changes(client, fake_swapi):
+    url = "/v1/resources/people/aggregate?metrics=min:height"
+    before = client.get(url).json()
+    people = [dict(p) for p in fake_swapi.dataset["people"]]
+    people[0]["height"] = "1"
+    mirror.load_items("people", people)
+
+    after = client.get(url).json()
+    assert after["version"] != before["version"]
+    assert after["groups"] == [{"key": {}, "min_height": 1}]
+
+
+def test_invalid_metrics_and_fields(client, fake_swapi):
+    assert client.get("/v1/resources/people/aggregate?metrics=median:height").status_code == 400
+    assert client.get("/v1/resources/people/aggregate?metrics=avg").status_code == 400
+    assert client.get("/v1/resources/people/aggregate?group_by=nope").status_code == 400
+    assert client.get("/v1/resources/people/aggregate?group_by=films").status_code == 400
+
+
+def test_high_cardinality_groups_keep_original_values(client, fake_swapi):
+    people = fake_swapi.dataset["people"]
+    r = client.get("/v1/resources/people/aggregate?group_by=name,height,mass&metrics=count")
+    groups = r.json()["groups"]
+
+    expected = {(p["name"], p["height"], p["mass"]) for p in people}
+    assert {(g["key"]["name"], g["key"]["height"], g["key"]["mass"]) for g in groups} == expected
+    assert people[0]["name"] in {g["key"]["name"] for g in groups}  # sem minúsculas
@@ -0,0 +1,72 @@
+from app.routers import batch as batch_router
+
+
+def test_batch_runs_queries_and_shares_relation_fetches(client, fake_swapi):
+    r = client.post("/v1/batch", json={"queries": [
+        {"id": "luke", "path": "/v1/resources/people/1?include=homeworld"},
+        {"id": "people", "path": "/v1/resources/people?include=homeworld&fields=name,homeworld"},
+        {"path": "/v1/films/1/characters?page_size=3"},
+    ]})
+    assert r.status_code == 200
+    data = r.json()
+
+    assert [x["id"] for x in data["results"]] == ["luke", "people", "2"]
+    assert all(x["status"] == 200 for x in data["results"])
+    assert data["results"][0]["body"]["homeworld"]["url"] == fake_swapi.dataset["people"][0]["homeworld"]
+    assert len(data["results"][1]["body"]["results"]) == 10
+    assert data["results"][2]["body"]["page_size"] == 3
+
+    # cada URL de relação foi buscada uma única vez no batch inteiro
+    relation_calls = [c for c in fake_swapi.calls if "/planets/" in c]
+    assert len(relation_calls) == len(set(relation_calls))
+    assert data["stats"]["relations_requested"] > data["stats"]["relations_unique"]
+
+
+def test_batch_reports_errors_per_query(client, fake_swapi):
+    r = client.post("/v1/batch", json={"queries": [
+        {"path": "/v1/resources/people/9999"},
+        {"path": "/v1/resources/aliens"},
+        {"path": "/v1/unknown"},
+        {"path": "/v1/resources/planets?page_size=5"},
+    ]})
+    assert r.status_code == 200
+    assert [x["status"] for x in r.json()["results"]] == [404, 400, 404, 200]
+
+
+def test_batch_size_limit(client, fake_swapi, monkeypatch):
+    monkeypatch.setattr(batch_router, "BATCH_MAX_QUERIES", 2)
+    r = client.post("/v1/batch", json={"queries": [{"path": "/v1/resources/people"}] * 3})
+    assert r.status_code == 400
+
+    r = client.post("/v1/batch", json={"queries": []})
+    assert r.status_code == 400
+
+
+def test_cursor_from_get_listing_works_inside_batch(client, fake_swapi):
+    url = "/v1/resources/people?min_height=100&page_size=5"
+    first = client.get(url).json()
+    second = client.get(f"{url}&cursor={first['next_cursor']}").json()
+
+    r = client.post("/v1/batch", json={"queries": [{"path": f"{url}&cursor={first['next_cursor']}"}]})
+    result = r.json()["results"][0]
+    assert result["status"] == 200, result
+    assert result["body"]["results"] == second["results"]
+
+
+def test_sub_query_stats_and_include_budget_are_per_query(client, fake_swapi, monkeypatch):
+    monkeypatch.setattr(batch_router, "MAX_INCLUDE_FETCHES", 3)
+    r = client.post("/v1/batch", json={"queries": [
+        {"path": "/v1/resources/people?include=homeworld,films"},
+        {"path": "/v1/resources/people?page=2&include=homeworld&fields=name"},  # include descartado
+        {"path": "/v1/resources/planets?page_size=2&include=residents"},
+    ]})
+    heavy, pushed_down, planets = (x["body"]["meta"] for x in r.json()["results"])
+
+    assert heavy["include_truncated"] and heavy["stats"]["relations_unique"] == 3
+    assert pushed_down["stats"]["relations_requested"] == 0
+    assert pushed_down["stats"]["upstream_fetches"] == 1  # só a página da SWAPI
+    assert planets["stats"]["relations_unique"] <= 3
+
+    stats = r.json()["stats"]
+    assert stats["relations_unique"] == sum(m["stats"]["relations_unique"] for m in (heavy, pushed_down, planets))
+    assert stats["upstream_fetches"] >= sum(m["stats"]["upstream_fetches"] for m in (heavy, pushed_down, planets))
@@ -0,0 +1,66 @@
+from app.services.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_value_until_ttl_expires():
+    clock = FakeClock()
+    cache = TTLCache(ttl_seconds=10, clock=clock)
+    cache.set("a", {"name": "Luke"})
+
+    assert cache.get("a") == {"name": "Luke"}
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction_by_entry_count():
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_byte_budget():
+    cache = TTLCache(ttl_seconds=60, max_bytes=100)
+    cache.set("a", "x", size=60)
+    cache.set("b", "y", size=60)
+
+    assert len(cache) == 1
+    assert cache.get("b") == "y"
+    assert cache.stats()["bytes"] == 60
+
+
+def test_namespace_ttls_and_periodic_sweep():
+    clock = FakeClock()
+    cache = TTLCache(ttl_seconds=60, namespace_ttls={"search": 5}, sweep_interval_seconds=10, clock=clock)
+    cache.set("people/?search=luke", {"count": 1}, namespace="search")
+    cache.set("people/1/", {"name": "Luke"}, namespace="entity")
+
+    # a busca expira sem ninguém ler; a varredura na próxima escrita a remove
+    clock.now = 11
+    cache.set("people/2/", {"name": "Leia"})
+
+    assert len(cache) == 2
+    assert cache.get("people/1/") == {"name": "Luke"}
+
+
+def test_clear_resets_entries_and_bytes():
+    cache = TTLCache(ttl_seconds=60)
+    cache.set("a", {"name": "Luke"})
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
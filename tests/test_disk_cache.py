@@ -0,0 +1,96 @@
+import asyncio
+import time
+import respx
+from httpx import Response
+from app.services import disk_cache, swapi_client
+from app.services.disk_cache import DiskCache
+
+SWAPI = "https://swapi.dev/api"
+
+
+def test_entries_survive_reopen_and_respect_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    now = [1000.0]
+    cache = DiskCache(path, ttl_seconds=60, clock=lambda: now[0])
+    cache.put("a", {"name": "Luke", "films": ["x"] * 200})  # grande o bastante para ir comprimido
+    cache.put("b", {"name": "Leia"})
+    cache.close()
+
+    reopened = DiskCache(path, ttl_seconds=60, clock=lambda: now[0])
+    assert reopened.get("a")["films"] == ["x"] * 200
+    assert reopened.get("b") == {"name": "Leia"}
+    assert reopened.get("missing") is None
+
+    now[0] += 61
+    assert reopened.get("a") is None
+    reopened.close()
+
+
+def test_size_limit_evicts_oldest_entries(tmp_path):
+    now = [0.0]
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_bytes=2000, clock=lambda: now[0])
+    for i in range(10):
+        now[0] += 1
+        cache.put(f"k{i}", {"payload": str(i) * 300})
+        cache.flush()
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 2000 and stats["evictions"] > 0
+    assert cache.get("k0") is None
+    assert cache.get("k9") is not None
+    cache.close()
+
+
+def test_seed_file_is_copied_with_fresh_clock(tmp_path):
+    seed = str(tmp_path / "seed.sqlite3")
+    built = DiskCache(seed, clock=lambda: 0.0)
+    built.put("people", {"count": 82})
+    built.close()
+
+    cache = DiskCache(str(tmp_path / "run" / "cache.sqlite3"), ttl_seconds=60, seed_path=seed)
+    assert cache.get("people") == {"count": 82}
+    cache.close()
+
+
+@respx.mock
+def test_get_json_reads_through_disk_tier(tmp_path):
+    route = respx.get(f"{SWAPI}/films/1/").mock(return_value=Response(200, json={"title": "A New Hope"}))
+    disk_cache.set_tier(DiskCache(str(tmp_path / "cache.sqlite3")))
+    try:
+        assert asyncio.run(swapi_client.get_json("films/1/"))["title"] == "A New Hope"
+        disk_cache.get_tier().flush()
+
+        # processo "novo": memória vazia, disco quente
+        swapi_client.clear_cache()
+        route.mock(return_value=Response(503))
+        assert asyncio.run(swapi_client.get_json("films/1/"))["title"] == "A New Hope"
+        assert route.call_count == 1
+        assert disk_cache.stats()["hits"] == 1
+    finally:
+        disk_cache.close_tier()
+
+
+@respx.mock
+def test_disk_entry_older_than_namespace_ttl_is_stale(tmp_path):
+    route = respx.get(f"{SWAPI}/people/").mock(return_value=Response(200, json={"count": 82, "results": []}))
+    now = [time.time()]
+    disk_cache.set_tier(DiskCache(str(tmp_path / "cache.sqlite3"), clock=lambda: now[0]))
+    try:
+        asyncio.run(swapi_client.get_json("people/"))
+        disk_cache.get_tier().flush()
+        swapi_client.clear_cache()
+
+        # no disco (TTL de um dia) mas mais velha que o TTL de listagem: vai à SWAPI
+        now[0] += swapi_client._cache.ttl_for("list") + 1
+        route.mock(return_value=Response(200, json={"count": 83, "results": []}))
+        assert asyncio.run(swapi_client.get_json("people/"))["count"] == 83
+        assert route.call_count == 2
+
+        # e, com a SWAPI fora, serve a cópia velha como stale
+        disk_cache.get_tier().flush()
+        swapi_client.clear_cache()
+        now[0] += swapi_client._cache.ttl_for("list") + 1
+        route.mock(return_value=Response(503))
+        assert asyncio.run(swapi_client.get_json("people/"))["count"] == 83
+    finally:
+        disk_cache.close_tier()
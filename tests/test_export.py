@@ -0,0 +1,45 @@
+import json
+from app.services import mirror
+
+
+def _lines(r):
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_export_streams_every_page_as_ndjson(client, fake_swapi):
+    r = client.get("/v1/resources/people/export?fields=name,gender")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = _lines(r)
+    assert [x["name"] for x in rows] == [p["name"] for p in fake_swapi.dataset["people"]]
+    assert set(rows[0].keys()) == {"name", "gender"}
+    # não depende do espelho: sem ordenação, só página a página
+    assert mirror.get_store("people") is None
+
+
+def test_export_applies_filters_and_include(client, fake_swapi):
+    r = client.get("/v1/resources/people/export?gender=female&include=homeworld&fields=name,homeworld")
+    assert r.status_code == 200
+
+    rows = _lines(r)
+    expected = [p["name"] for p in fake_swapi.dataset["people"] if p["gender"] == "female"]
+    assert [x["name"] for x in rows] == expected
+    assert all(isinstance(x["homeworld"], dict) for x in rows)
+
+
+def test_sorted_export_uses_whole_resource(client, fake_swapi):
+    r = client.get("/v1/resources/planets/export?sort=name:desc")
+    assert r.status_code == 200
+
+    names = [x["name"] for x in _lines(r)]
+    assert names == sorted((p["name"] for p in fake_swapi.dataset["planets"]), reverse=True)
+    assert mirror.get_store("planets") is not None
+
+
+def test_export_errors_before_streaming(client, fake_swapi):
+    r = client.get("/v1/resources/people/export?sort=nope")
+    assert r.status_code == 400
+
+    r = client.get("/v1/resources/people/export?include=films.characters.films.characters")
+    assert r.status_code == 400
@@ -1,5 +1,7 @@
 from app.services.filters import apply_filters
 from app.services.sorting import sort_items
+from app.services.filter_engine import ColumnarIndex
+from tests.fake_swapi import build_dataset
 
 def test_apply_filters_gender():
     items = [{"name": "A", "gender": "male"}, {"name": "B", "gender": "female"}]
@@ -16,3 +18,53 @@ def test_sort_items_desc():
     items = [{"name": "Leia"}, {"name": "Anakin"}]
     out = sort_items(items, "name", "desc")
     assert [x["name"] for x in out] == ["Leia", "Anakin"]
+
+def test_apply_filters_parses_swapi_numbers():
+    items = [
+        {"name": "A", "population": "1,000"},
+        {"name": "B", "population": "unknown"},
+        {"name": "C", "population": "200000"},
+    ]
+    out = apply_filters(items, {"min_population": 500, "max_population": 5000})
+    assert [x["name"] for x in out] == ["A"]
+
+def test_columnar_index_matches_apply_filters():
+    items = build_dataset()["people"]
+    index = ColumnarIndex(items)
+    cases = [
+        {"gender": "female"},
+        {"min_height": 150},
+        {"gender": "male", "eye_color": "blue", "max_height": 200},
+        {"min_height": 300},
+        {"hair_color": "does-not-exist"},
+    ]
+    for filters in cases:
+        assert index.filter(filters) == apply_filters(items, filters)
+
+def test_sort_items_multi_key_and_mixed_types():
+    items = [
+        {"name": "Leia", "height": "150"},
+        {"name": "R2-D2", "height": "unknown"},
+        {"name": "Luke", "height": "172"},
+        {"name": "Anakin", "height": "172"},
+    ]
+    out = sort_items(items, "height:desc,name")
+    # "unknown" fica por último em qualquer direção
+    assert [x["name"] for x in out] == ["Anakin", "Luke", "Leia", "R2-D2"]
+
+    out = sort_items(items, "height", "asc")
+    assert [x["name"] for x in out] == ["Leia", "Luke", "Anakin", "R2-D2"]
+
+def test_sort_items_top_k_matches_full_sort():
+    items = build_dataset()["people"]
+    full = sort_items(items, "height:desc,name")
+    assert sort_items(items, "height:desc,name", limit=5) == full[:5]
+
+def test_sorted_rows_are_cached_per_store_version():
+    from app.services import mirror, sorting
+    store = mirror.load_items("people", build_dataset()["people"])
+    spec = sorting.parse_sort("mass:desc")
+
+    rows = sorting.sorted_rows(store, spec)
+    assert sorting.sorted_rows(store, spec) is rows
+    assert [store.items[r] for r in rows] == sort_items(store.items, "mass:desc")
@@ -0,0 +1,46 @@
+import re
+from app.core import metrics
+
+
+def _value(text, name, **labels):
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    series = f"{name}{{{wanted}}}" if wanted else name
+    m = re.search(rf"^{re.escape(series)} (\S+)$", text, re.M)
+    return float(m.group(1)) if m else None
+
+
+def test_metrics_endpoint_reports_routes_upstream_and_caches(client, fake_swapi):
+    assert client.get("/v1/resources/people?include=homeworld").status_code == 200
+    assert client.get("/v1/resources/people?include=homeworld").headers["x-cache"] == "HIT"
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    # por endpoint, inclusive o HIT que não passa pelo roteador
+    route = "list_resource"
+    assert _value(text, "http_requests_total", method="GET", handler=route, status="200") == 2
+    assert _value(text, "http_request_duration_seconds_count", method="GET", handler=route) == 2
+    assert _value(text, "http_request_duration_seconds_bucket", method="GET", handler=route, le="+Inf") == 2
+
+    assert _value(text, "swapi_upstream_requests_total", resource="people", status="200") == 1
+    assert _value(text, "swapi_upstream_requests_total", resource="planets", status="200") >= 1
+    assert _value(text, "swapi_get_json_total", resource="people", result="load") == 1
+    assert _value(text, "cache_hits_total", cache="responses") == 1
+    assert _value(text, "cache_entries", cache="upstream") >= 2
+
+    # uma requisição com include: relações únicas resolvidas entram no histograma
+    assert _value(text, "request_relation_fetches_count") == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("x_seconds", "teste", ("handler",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3):
+        h.observe(v, "/a")
+    lines = list(h.render())
+
+    assert 'x_seconds_bucket{handler="/a",le="0.1"} 1' in lines
+    assert 'x_seconds_bucket{handler="/a",le="1"} 3' in lines
+    assert 'x_seconds_bucket{handler="/a",le="+Inf"} 4' in lines
+    assert 'x_seconds_count{handler="/a"} 4' in lines
@@ -0,0 +1,142 @@
+import asyncio
+from app.services import mirror
+from tests.fake_swapi import BASE_URL
+
+
+def test_ingest_walks_every_page(fake_swapi):
+    store = asyncio.run(mirror.ingest("people"))
+
+    assert len(store.items) == len(fake_swapi.dataset["people"])
+    assert store.get(1)["name"] == fake_swapi.dataset["people"][0]["name"]
+    assert mirror.lookup_url(f"{BASE_URL}/people/2/")["url"] == f"{BASE_URL}/people/2/"
+
+
+def test_version_only_changes_when_data_changes(fake_swapi):
+    v1 = asyncio.run(mirror.ingest("films")).version
+    assert asyncio.run(mirror.ingest("films")).version == v1
+
+    fake_swapi.dataset["films"][0]["title"] = "Changed"
+    from app.services import swapi_client
+    swapi_client.clear_cache()
+    assert asyncio.run(mirror.ingest("films")).version != v1
+
+
+def test_list_answers_from_mirror_across_pages(client, fake_swapi):
+    asyncio.run(mirror.ingest("people"))
+    calls_before = len(fake_swapi.calls)
+
+    r = client.get("/v1/resources/people?sort=name&page=2")
+    assert r.status_code == 200
+    data = r.json()
+
+    everyone = sorted(p["name"] for p in fake_swapi.dataset["people"])
+    assert [x["name"] for x in data["results"]] == everyone[10:20]
+    assert data["count"] == len(everyone)
+    assert data["meta"]["source"] == "mirror"
+    assert "page=3" in data["next"]
+    assert len(fake_swapi.calls) == calls_before
+
+
+def test_list_filters_over_whole_mirrored_resource(client, fake_swapi):
+    asyncio.run(mirror.ingest("people"))
+
+    r = client.get("/v1/resources/people?gender=female&page=1")
+    expected = [p for p in fake_swapi.dataset["people"] if p["gender"] == "female"]
+    assert r.json()["count"] == len(expected)
+
+
+def test_detail_and_relations_use_mirror(client, fake_swapi):
+    for resource in ("films", "people", "planets"):
+        asyncio.run(mirror.ingest(resource))
+    calls_before = len(fake_swapi.calls)
+
+    r = client.get("/v1/resources/people/1?include=homeworld")
+    assert r.status_code == 200
+    assert isinstance(r.json()["homeworld"], dict)
+
+    r = client.get("/v1/films/1/characters?page_size=100")
+    assert r.status_code == 200
+    assert r.json()["count"] == len(fake_swapi.dataset["films"][0]["characters"])
+    assert len(fake_swapi.calls) == calls_before
+
+    assert client.get("/v1/resources/people/999").status_code == 404
+
+
+def test_detail_falls_back_to_upstream(client, fake_swapi):
+    r = client.get("/v1/resources/planets/1")
+    assert r.status_code == 200
+    assert r.json()["name"] == "Tatooine"
+
+
+def test_nested_include_walks_graph_level_by_level(client, fake_swapi):
+    r = client.get("/v1/resources/films/1?include=characters.homeworld")
+    assert r.status_code == 200
+
+    film = r.json()
+    expected = fake_swapi.dataset["films"][0]["characters"]
+    assert [c["url"] for c in film["characters"]] == expected
+    assert all(isinstance(c["homeworld"], dict) for c in film["characters"])
+
+    # cada planeta é buscado uma única vez, mesmo compartilhado por vários personagens
+    planet_calls = [c for c in fake_swapi.calls if "/planets/" in c]
+    assert len(planet_calls) == len(set(planet_calls))
+
+
+def test_nested_include_detects_cycles(client, fake_swapi):
+    r = client.get("/v1/resources/people/1?include=films.characters")
+    person = r.json()
+
+    # Luke aparece entre os personagens do próprio filme: fica como URL
+    me = fake_swapi.dataset["people"][0]["url"]
+    characters = person["films"][0]["characters"]
+    assert me in characters
+    assert all(isinstance(c, dict) for c in characters if c != me)
+
+
+def test_include_budget_truncates_instead_of_fetching_everything(client, fake_swapi, monkeypatch):
+    from app.services import query
+    monkeypatch.setattr(query, "MAX_INCLUDE_FETCHES", 5)
+
+    r = client.get("/v1/resources/people?include=films.characters")
+    assert r.status_code == 200
+
+    meta = r.json()["meta"]
+    assert meta["include_truncated"] is True
+    assert meta["stats"]["relations_unique"] == 5
+
+
+def test_include_path_deeper_than_limit_is_rejected(client):
+    r = client.get("/v1/resources/people?include=films.characters.homeworld.residents")
+    assert r.status_code == 400
+
+
+def test_lazily_loaded_copy_expires_and_is_reloaded(client, fake_swapi):
+    from app.core import response_cache
+    from app.core.config import CACHE_TTL_LIST_SECONDS
+    from app.services import swapi_client
+
+    assert client.get("/v1/resources/people?search=a").json()["meta"]["source"] == "mirror"
+    store = mirror.get_store("people")
+    assert store.lazy
+
+    fake_swapi.dataset["people"][0]["name"] = "Renamed"
+    store.loaded_at -= CACHE_TTL_LIST_SECONDS + 1
+    swapi_client.clear_cache()
+    response_cache.clear()
+
+    # vencida: detalhe e listagem voltam para a SWAPI; a próxima busca recarrega a cópia
+    assert mirror.get_store("people") is None
+    assert client.get("/v1/resources/people/1").json()["name"] == "Renamed"
+    assert client.get("/v1/resources/people").json()["meta"]["source"] == "upstream"
+    r = client.get("/v1/resources/people?search=renamed")
+    assert [x["name"] for x in r.json()["results"]] == ["Renamed"]
+
+
+def test_detail_missing_from_mirror_falls_back_to_swapi(client, fake_swapi):
+    asyncio.run(mirror.ingest("people"))
+    new_id = len(fake_swapi.dataset["people"]) + 1
+    newcomer = {**fake_swapi.dataset["people"][0], "name": "Newcomer", "url": f"{BASE_URL}/people/{new_id}/"}
+    fake_swapi.dataset["people"].append(newcomer)
+
+    assert client.get(f"/v1/resources/people/{new_id}").json()["name"] == "Newcomer"
+    assert client.get("/v1/resources/people/9999").status_code == 404
@@ -0,0 +1,105 @@
+import base64
+import json
+import pytest
+from app.services.sorting import sort_items
+
+
+def _walk(client, url):
+    pages = []
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        pages.append(data)
+        url = data["next"]
+    return pages
+
+
+def test_cursor_walks_sorted_resource_with_custom_page_size(client, fake_swapi):
+    pages = _walk(client, "/v1/resources/people?sort=height:desc,name&page_size=25")
+
+    assert [p["page"] for p in pages] == [1, 2, 3, 4]
+    assert [p["page_size"] for p in pages] == [25, 25, 25, 7]
+    assert all(p["count"] == 82 for p in pages)
+    assert pages[-1]["next_cursor"] is None
+
+    names = [x["name"] for p in pages for x in p["results"]]
+    expected = [x["name"] for x in sort_items(fake_swapi.dataset["people"], "height:desc,name")]
+    assert names == expected
+
+
+def test_cursor_count_matches_local_filters(client, fake_swapi):
+    pages = _walk(client, "/v1/resources/people?gender=female&page_size=7&fields=name")
+
+    expected = [p["name"] for p in fake_swapi.dataset["people"] if p["gender"] == "female"]
+    assert pages[0]["count"] == len(expected)
+    assert [x["name"] for p in pages for x in p["results"]] == expected
+
+
+def test_cursor_is_bound_to_its_query(client, fake_swapi):
+    first = client.get("/v1/resources/people?sort=name&page_size=5").json()
+
+    r = client.get(f"/v1/resources/people?sort=height&cursor={first['next_cursor']}")
+    assert r.status_code == 400
+
+    r = client.get("/v1/resources/people?cursor=not-a-cursor")
+    assert r.status_code == 400
+
+
+def test_film_characters_cursor_pages_match_offset_pages(client, fake_swapi):
+    for sort in ("name", ""):
+        offset = [client.get(f"/v1/films/1/characters?sort={sort}&page={n}&page_size=4").json() for n in (1, 2, 3)]
+
+        cursor_pages = [offset[0]]
+        for _ in range(2):
+            token = cursor_pages[-1]["next_cursor"]
+            cursor_pages.append(client.get(f"/v1/films/1/characters?sort={sort}&page_size=4&cursor={token}").json())
+
+        assert [p["results"] for p in cursor_pages] == [p["results"] for p in offset]
+        assert [p["page"] for p in cursor_pages] == [1, 2, 3]
+
+
+def test_film_characters_deep_page_reuses_cached_ordering(client, fake_swapi):
+    first = client.get("/v1/films/1/characters?sort=name:desc&page_size=3").json()
+    calls = len(fake_swapi.calls)
+
+    r = client.get(f"/v1/films/1/characters?sort=name:desc&page_size=3&cursor={first['next_cursor']}&debug=true")
+    data = r.json()
+
+    assert len(fake_swapi.calls) == calls
+    assert data["plan"]["paginate_before_fetch"] is True
+    assert data["stats"]["relations_requested"] == 3
+
+
+def _tampered(token, **changes):
+    payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    payload.update(changes)
+    for key in [k for k, v in changes.items() if v is None]:
+        del payload[key]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize("changes", [
+    {"k": None}, {"r": None}, {"r": -5}, {"r": "3"}, {"r": 10**9}, {"n": 0}, {"k": [{"x": 1}]}, {"k": []},
+])
+def test_tampered_resource_cursor_is_rejected(client, fake_swapi, changes):
+    for url in ("/v1/resources/people?sort=name&page_size=5", "/v1/resources/people?page_size=5"):
+        token = client.get(url).json()["next_cursor"]
+        if "k" in changes and changes["k"] == [] and "sort" not in url:
+            continue  # sem ordenação `k` é mesmo vazio
+        r = client.get(f"{url}&cursor={_tampered(token, **changes)}")
+        assert r.status_code == 400, (url, changes)
+        assert r.json()["error"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("changes", [{"i": None}, {"i": -1}, {"i": 1.5}, {"i": 500}, {"k": "name"}])
+def test_tampered_film_cursor_is_rejected(client, fake_swapi, changes):
+    token = client.get("/v1/films/1/characters?sort=name&page_size=3").json()["next_cursor"]
+    r = client.get(f"/v1/films/1/characters?sort=name&page_size=3&cursor={_tampered(token, **changes)}")
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("url", ["/v1/resources/people?page_size=0", "/v1/films/1/characters?page_size=0"])
+def test_zero_page_size_is_rejected(client, fake_swapi, url):
+    r = client.get(url)
+    assert r.status_code == 400
@@ -57,3 +57,29 @@ def test_film_characters_bad_page_returns_400(client):
     r = client.get("/v1/films/1/characters?page=0")
     assert r.status_code == 400
     assert "page must be" in r.json()["error"]
+
+
+@respx.mock
+def test_film_characters_without_sort_fetches_only_the_page(client):
+    respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(
+            200,
+            json={
+                "title": "A New Hope",
+                "characters": [f"{SWAPI}/people/{i}/" for i in range(1, 6)],
+            },
+        )
+    )
+    people = respx.get(url__regex=rf"{SWAPI}/people/\d+/").mock(
+        return_value=Response(200, json={"name": "Someone"})
+    )
+
+    r = client.get("/v1/films/1/characters?sort=&page=2&page_size=2&debug=true")
+    assert r.status_code == 200
+
+    data = r.json()
+    assert data["count"] == 5
+    assert data["page_size"] == 2
+    assert people.call_count == 2
+    assert data["plan"]["paginate_before_fetch"] is True
+    assert data["plan"]["estimated_upstream_calls"] == 3  # filme + 2 personagens
@@ -137,3 +137,84 @@ def test_swapi_upstream_error_returns_502(client):
     r = client.get("/v1/resources/people")
     assert r.status_code == 502
     assert "SWAPI error" in r.json()["error"]
+
+
+@respx.mock
+def test_include_fetches_each_shared_relation_once(client):
+    respx.get(f"{SWAPI}/people/").mock(
+        return_value=Response(200, json=_people_page_1())
+    )
+    film = respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(200, json={"title": "A New Hope"})
+    )
+
+    # Luke e Leia compartilham o mesmo filme: uma única busca para a página toda
+    r = client.get("/v1/resources/people?include=films")
+    assert r.status_code == 200
+
+    data = r.json()
+    assert film.call_count == 1
+    assert all(x["films"][0]["title"] == "A New Hope" for x in data["results"])
+    assert data["meta"]["stats"]["upstream_fetches"] == 2  # página de people + films/1
+    assert data["meta"]["stats"]["relations_requested"] == 2
+    assert data["meta"]["stats"]["relations_unique"] == 1
+
+
+@respx.mock
+def test_include_projected_away_is_not_fetched(client):
+    respx.get(f"{SWAPI}/people/").mock(
+        return_value=Response(200, json=_people_page_1())
+    )
+    film = respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(200, json={"title": "A New Hope"})
+    )
+
+    r = client.get("/v1/resources/people?include=films&fields=name&debug=true")
+    assert r.status_code == 200
+
+    data = r.json()
+    assert film.call_count == 0
+    assert set(data["results"][0].keys()) == {"name"}
+    assert data["meta"]["plan"]["skipped_include"] == ["films"]
+    assert data["meta"]["plan"]["estimated_upstream_calls"] == 1
+
+
+@respx.mock
+def test_fast_response_matches_validated_response(client, monkeypatch):
+    from app.core import response_cache, responses
+
+    respx.get(f"{SWAPI}/people/").mock(
+        return_value=Response(200, json=_people_page_1())
+    )
+    respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(200, json={"title": "A New Hope"})
+    )
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+
+    monkeypatch.setattr(responses, "FAST_RESPONSE_ENABLED", False)
+    validated = client.get("/v1/resources/people?include=films&sort=name").json()
+    monkeypatch.setattr(responses, "FAST_RESPONSE_ENABLED", True)
+    fast = client.get("/v1/resources/people?include=films&sort=name").json()
+
+    # mesmo corpo; só as estatísticas de busca mudam (a 2ª vem do cache)
+    validated["meta"].pop("stats")
+    fast["meta"].pop("stats")
+    assert fast == validated
+
+
+@respx.mock
+def test_item_route_follows_fast_response_flag(client, monkeypatch):
+    from app.core import response_cache, responses
+
+    respx.get(f"{SWAPI}/people/1/").mock(return_value=Response(200, json={"name": "Luke Skywalker"}))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+
+    monkeypatch.setattr(responses, "FAST_RESPONSE_ENABLED", False)
+    plain = client.get("/v1/resources/people/1")
+    monkeypatch.setattr(responses, "FAST_RESPONSE_ENABLED", True)
+    fast = client.get("/v1/resources/people/1")
+
+    assert plain.json() == fast.json() == {"name": "Luke Skywalker"}
+    # só o caminho rápido serializa com orjson (etapa `serialize`)
+    assert "serialize" not in plain.headers["server-timing"]
+    assert "serialize" in fast.headers["server-timing"]
@@ -0,0 +1,64 @@
+import pytest
+import respx
+from httpx import Response
+
+SWAPI = "https://swapi.dev/api"
+
+
+def _mock_film():
+    return respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(200, json={"title": "A New Hope", "characters": []})
+    )
+
+
+@respx.mock
+def test_repeat_request_is_served_from_response_cache(client):
+    film = _mock_film()
+
+    first = client.get("/v1/films/1/characters?page=1&sort=name")
+    # mesma consulta com parâmetros em outra ordem
+    second = client.get("/v1/films/1/characters?sort=name&page=1")
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert second.headers["cache-control"].startswith("public, max-age=")
+    assert "Accept-Encoding" in second.headers["vary"]
+    assert film.call_count == 1
+
+
+@respx.mock
+def test_if_none_match_returns_304(client):
+    _mock_film()
+    etag = client.get("/v1/films/1/characters").headers["etag"]
+
+    r = client.get("/v1/films/1/characters", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+
+@respx.mock
+def test_errors_are_not_cached(client):
+    route = respx.get(f"{SWAPI}/films/1/").mock(return_value=Response(500, json={"detail": "boom"}))
+    assert client.get("/v1/films/1/characters").status_code == 502
+    assert "etag" not in client.get("/v1/films/1/characters").headers
+    assert route.call_count == 2
+
+
+@pytest.mark.parametrize("debug", ["true", "1", "yes", "on", "True"])
+def test_debug_responses_are_never_cached(client, fake_swapi, debug):
+    client.get(f"/v1/resources/people?debug={debug}")
+    r = client.get(f"/v1/resources/people?debug={debug}")
+    assert "x-cache" not in r.headers
+    assert r.json()["meta"]["plan"] is not None
+
+    client.get("/v1/resources/people?debug=false")
+    assert client.get("/v1/resources/people?debug=false").headers["x-cache"] == "HIT"
+
+
+def test_head_is_not_served_from_cache(client, fake_swapi):
+    assert client.get("/v1/resources/people").status_code == 200
+    assert client.head("/v1/resources/people").status_code == 405
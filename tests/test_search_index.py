@@ -0,0 +1,83 @@
+import pytest
+from app.services import mirror
+from app.services.search_index import SearchIndex
+
+
+def _person(i, name):
+    return {"name": name, "url": f"https://swapi.dev/api/people/{i}/"}
+
+
+def test_search_matches_swapi_substrings_and_then_stays_local(client, fake_swapi):
+    people = fake_swapi.dataset["people"]
+
+    r = client.get("/v1/resources/people?search=sky&debug=true")
+    assert r.status_code == 200
+    data = r.json()
+    expected = {p["name"] for p in people if "sky" in p["name"].lower()}
+    assert data["count"] == len(expected)
+    assert data["meta"]["source"] == "mirror"
+
+    calls_before = len(fake_swapi.calls)
+    for term in ("an", "Leia", "kywalk"):
+        r = client.get(f"/v1/resources/people?search={term}&page_size=100")
+        names = {x["name"] for x in r.json()["results"]}
+        assert names == {p["name"] for p in people if term.lower() in p["name"].lower()}
+    assert len(fake_swapi.calls) == calls_before
+
+
+def test_typos_accents_and_relevance_ranking():
+    index = SearchIndex("people")
+    index.update([
+        _person(1, "Luke Skywalker"),
+        _person(2, "Lukeson Organa"),
+        _person(3, "Padmé Amidala"),
+        _person(4, "R2-D2"),
+    ], version=1)
+
+    assert index.search_rows("luke") == [0, 1]  # exato antes de prefixo
+    assert index.search_rows("skywaker") == [0]
+    assert index.search_rows("amidlaa padme") == [2]
+    assert index.search_rows("r2d2") == [3]
+    assert index.search_rows("luke organa") == [1]
+    assert index.search_rows("xyzzy") == []
+
+
+def test_incremental_update_only_touches_changed_documents():
+    index = SearchIndex("people")
+    index.update([_person(1, "Luke Skywalker"), _person(2, "Leia Organa")], version=1)
+    assert index.search_rows("leia") == [1]
+
+    changed = index.update([_person(2, "Leia Solo"), _person(3, "Han Solo")], version=2)
+    assert changed == 3  # 2 alterado, 3 novo, 1 removido
+    assert index.search_rows("organa") == []
+    assert index.search_rows("solo") == [0, 1]
+    assert index.search_rows("luke") == []
+    assert len(index) == 2
+
+
+def test_search_index_follows_mirror_versions(fake_swapi, client):
+    client.get("/v1/resources/planets?search=tatooine")
+    fake_swapi.dataset["planets"][0]["name"] = "Tatooine Prime"
+    mirror.load_items("planets", fake_swapi.dataset["planets"])
+
+    r = client.get("/v1/resources/planets?search=prime")
+    assert [x["name"] for x in r.json()["results"]] == ["Tatooine Prime"]
+    assert client.get("/health/upstream").json()["search"]["planets"]["documents_changed"] >= 1
+
+
+def test_search_does_not_switch_plain_listings_to_the_mirror(client, fake_swapi):
+    plain = client.get("/v1/resources/people?debug=true").json()
+    assert plain["meta"]["source"] == "upstream"
+
+    client.get("/v1/resources/people?search=sky")
+    after = client.get("/v1/resources/people?debug=true").json()
+    assert after["meta"]["source"] == "upstream"
+    assert (after["count"], after["next"]) == (plain["count"], plain["next"])
+
+
+@pytest.mark.parametrize("term", ["%20", "---", "%21%3F"])
+def test_search_without_terms_is_a_plain_listing(client, fake_swapi, term):
+    plain = client.get("/v1/resources/people").json()
+    r = client.get(f"/v1/resources/people?search={term}")
+    assert r.status_code == 200
+    assert r.json()["count"] == plain["count"] == len(fake_swapi.dataset["people"])
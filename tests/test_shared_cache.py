@@ -0,0 +1,110 @@
+import sqlite3
+import subprocess
+import sys
+import time
+from app.services.cache import TTLCache, create_cache
+from app.services.shared_cache import SharedCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("ttl_seconds", 60)
+    return SharedCache(str(tmp_path / "shared.sqlite3"), touch_interval_seconds=0, **kwargs)
+
+
+def test_ttl_namespaces_and_stale_window_match_ttlcache(tmp_path):
+    clock = FakeClock()
+    cache = _cache(tmp_path, namespace_ttls={"search": 5}, max_stale_seconds=30, clock=clock)
+    cache.set("people/?search=luke", {"count": 1}, namespace="search")
+    cache.set("people/1/", {"name": "Luke"}, namespace="entity")
+
+    clock.now += 6
+    assert cache.get("people/?search=luke") is None
+    assert cache.get_stale("people/?search=luke") == {"count": 1}
+    assert cache.get("people/1/") == {"name": "Luke"}
+
+    clock.now += 60
+    assert cache.get_stale("people/?search=luke") is None
+    assert cache.sweep() == 1
+    assert len(cache) == 1
+
+
+def test_lru_and_byte_budget_eviction(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    clock = FakeClock()
+    cache._clock = clock
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    cache.get("a")  # "b" passa a ser o menos usado
+    clock.now += 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    cache.clear()
+    cache.max_entries = 0
+    cache.max_bytes = 100
+    cache.set("x", "x", size=60)
+    cache.set("y", "y", size=60)
+    assert len(cache) == 1 and cache.get("y") == "y"
+    assert cache.stats()["bytes"] == 60
+
+
+def test_workers_on_the_same_host_share_entries(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first = SharedCache(path, ttl_seconds=60)
+    second = SharedCache(path, ttl_seconds=60)
+    first.set("people/1/", {"name": "Luke"})
+    assert second.get("people/1/") == {"name": "Luke"}
+
+    # outro processo (como um segundo worker do uvicorn) grava; este lê
+    script = (
+        "import sys; from app.services.shared_cache import SharedCache; "
+        "SharedCache(sys.argv[1], ttl_seconds=60).set('planets/1/', {'name': 'Tatooine'})"
+    )
+    subprocess.run([sys.executable, "-c", script, path], check=True)
+    assert first.get("planets/1/") == {"name": "Tatooine"}
+    assert second.stats()["entries"] == 2
+
+
+def test_create_cache_selects_backend(tmp_path):
+    assert isinstance(create_cache(ttl_seconds=60), TTLCache)
+    assert isinstance(create_cache(backend="unknown", ttl_seconds=60), TTLCache)
+    shared = create_cache(backend="shared", shared_path=str(tmp_path / "c.sqlite3"), ttl_seconds=60)
+    assert isinstance(shared, SharedCache)
+
+
+def test_write_contention_skips_instead_of_blocking(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    cache = SharedCache(path, ttl_seconds=60, touch_interval_seconds=0)
+    cache.set("people/1/", {"name": "Luke"})
+
+    # outro worker segura o lock de escrita
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        cache.set("people/2/", {"name": "C-3PO"})
+        assert cache.get("people/1/") == {"name": "Luke"}  # leitura segue; o touch é pulado
+        cache.delete("people/1/")
+        assert time.perf_counter() - started < 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert cache.stats()["contended"] == 3
+    assert cache.get("people/2/") is None
+    assert cache.get("people/1/") == {"name": "Luke"}
+    cache.set("people/2/", {"name": "C-3PO"})
+    assert cache.get("people/2/") == {"name": "C-3PO"}
@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+import respx
+from httpx import Response
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import response_cache
+from app.core.errors import NotFoundError, UpstreamError
+from app.services import swapi_client
+
+SWAPI = "https://swapi.dev/api"
+
+
+@respx.mock
+def test_client_is_reused_across_requests_within_lifespan():
+    respx.get(f"{SWAPI}/films/1/").mock(
+        return_value=Response(200, json={"title": "A New Hope", "characters": []})
+    )
+
+    # com context manager o lifespan roda e o client é criado uma única vez
+    with TestClient(app) as c:
+        first = swapi_client._client
+        assert first is not None
+        assert c.get("/v1/films/1/characters").status_code == 200
+        swapi_client.clear_cache()
+        response_cache.clear()
+        assert c.get("/v1/films/1/characters").status_code == 200
+        assert swapi_client._client is first
+
+        stats = c.get("/health/upstream").json()["pool"]
+        assert stats["requests"] >= 2
+        assert stats["in_flight"] == 0
+
+    assert swapi_client._client is None
+
+
+@respx.mock
+def test_fetch_many_runs_concurrently_and_preserves_order():
+    state = {"in_flight": 0, "peak": 0}
+
+    async def slow(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return Response(200, json={"url": str(request.url)})
+
+    respx.get(url__regex=rf"{SWAPI}/people/\d+/").mock(side_effect=slow)
+    urls = [f"{SWAPI}/people/{i}/" for i in range(1, 7)]
+
+    out = asyncio.run(swapi_client.fetch_many(urls, limit=3))
+
+    assert [x["url"] for x in out] == urls
+    assert state["peak"] == 3
+
+
+@respx.mock
+def test_fetch_many_propagates_first_error_in_input_order():
+    respx.get(f"{SWAPI}/people/1/").mock(return_value=Response(200, json={"name": "Luke"}))
+    respx.get(f"{SWAPI}/people/2/").mock(return_value=Response(404, json={"detail": "Not found"}))
+    respx.get(f"{SWAPI}/people/3/").mock(return_value=Response(500, json={"detail": "boom"}))
+
+    urls = [f"{SWAPI}/people/{i}/" for i in range(1, 4)]
+    with pytest.raises(NotFoundError):
+        asyncio.run(swapi_client.fetch_many(urls))
+
+
+@respx.mock
+def test_concurrent_misses_for_same_key_are_coalesced():
+    route = respx.get(f"{SWAPI}/films/1/")
+
+    async def slow(_):
+        await asyncio.sleep(0.01)
+        return Response(200, json={"title": "A New Hope"})
+
+    route.mock(side_effect=slow)
+    before = swapi_client.singleflight_stats()["coalesced"]
+
+    async def run():
+        return await asyncio.gather(*[swapi_client.get_json("films/1/") for _ in range(5)])
+
+    out = asyncio.run(run())
+
+    assert route.call_count == 1
+    assert all(x["title"] == "A New Hope" for x in out)
+    assert swapi_client.singleflight_stats()["coalesced"] - before == 4
+
+
+@respx.mock
+def test_coalesced_failure_is_shared_and_not_cached():
+    route = respx.get(f"{SWAPI}/films/1/")
+
+    async def boom(_):
+        await asyncio.sleep(0.01)
+        return Response(500, json={"detail": "boom"})
+
+    route.mock(side_effect=boom)
+
+    async def run():
+        return await asyncio.gather(
+            *[swapi_client.get_json("films/1/") for _ in range(3)], return_exceptions=True
+        )
+
+    out = asyncio.run(run())
+    assert route.call_count == 1
+    assert all(isinstance(x, UpstreamError) for x in out)
+
+    # a falha não fica em cache: a próxima chamada vai de novo à SWAPI
+    route.mock(return_value=Response(200, json={"title": "A New Hope"}))
+    assert asyncio.run(swapi_client.get_json("films/1/"))["title"] == "A New Hope"
+    assert route.call_count == 2
+
+
+def _expire_cache(monkeypatch, seconds=10_000):
+    # avança o relógio do cache para depois do TTL (mas dentro da janela stale)
+    base = swapi_client._cache._clock
+    monkeypatch.setattr(swapi_client._cache, "_clock", lambda: base() + seconds)
+    monkeypatch.setattr(swapi_client._cache, "max_stale", seconds * 2)
+
+
+@respx.mock
+def test_serves_stale_data_when_upstream_fails(client, monkeypatch):
+    route = respx.get(f"{SWAPI}/films/1/")
+    route.mock(return_value=Response(200, json={"title": "A New Hope", "characters": []}))
+    assert client.get("/v1/films/1/characters").status_code == 200
+
+    _expire_cache(monkeypatch)
+    response_cache.clear()
+    route.mock(return_value=Response(503, json={"detail": "down"}))
+
+    r = client.get("/v1/films/1/characters")
+    assert r.status_code == 200
+    assert r.json()["film_title"] == "A New Hope"
+    assert r.headers["x-served-stale"] == "true"
+
+
+@respx.mock
+def test_stale_while_revalidate_returns_stale_and_refreshes(monkeypatch):
+    monkeypatch.setattr(swapi_client, "CACHE_STALE_WHILE_REVALIDATE", True)
+    route = respx.get(f"{SWAPI}/films/1/")
+    route.mock(return_value=Response(200, json={"title": "old"}))
+
+    async def run():
+        await swapi_client.get_json("films/1/")
+        _expire_cache(monkeypatch)
+        route.mock(return_value=Response(200, json={"title": "new"}))
+
+        stale = await swapi_client.get_json("films/1/")
+        await asyncio.sleep(0.01)  # deixa o refresh em background terminar
+        monkeypatch.undo()
+        fresh = await swapi_client.get_json("films/1/")
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+    assert stale["title"] == "old"
+    assert fresh["title"] == "new"
+    assert route.call_count == 2
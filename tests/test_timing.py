@@ -0,0 +1,52 @@
+import json
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.profiling import ProfilingMiddleware
+
+
+def _timings(header):
+    out = {}
+    for part in header.split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        out[name] = float(dur)
+    return out
+
+
+def test_server_timing_and_structured_log(client, fake_swapi, caplog):
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        r = client.get("/v1/resources/people?include=homeworld&sort=name&fields=name,homeworld")
+    assert r.status_code == 200
+
+    timings = _timings(r.headers["server-timing"])
+    for name in ("upstream", "filter", "sort", "enrich", "project", "serialize", "total"):
+        assert name in timings
+    assert timings["total"] >= timings["serialize"]
+
+    access = [rec for rec in caplog.records if rec.name == "app.access"]
+    record = json.loads(access[-1].getMessage())
+    assert record["path"] == "/v1/resources/people"
+    assert record["status"] == 200
+    assert record["upstream_fetches"] >= 2
+    assert set(record["stages_ms"]) >= {"upstream", "filter", "sort", "enrich", "serialize"}
+
+
+def test_profile_forced_by_header_is_written(fake_swapi, tmp_path):
+    profiled = TestClient(ProfilingMiddleware(app, header_enabled=True, directory=str(tmp_path)))
+
+    assert profiled.get("/v1/resources/people").status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+    assert profiled.get("/v1/resources/planets", headers={"X-Profile": "1"}).status_code == 200
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1 and "v1_resources_planets" in files[0].name
+
+
+def test_sampled_profile_only_kept_for_slow_requests(fake_swapi, tmp_path):
+    fast = TestClient(ProfilingMiddleware(app, enabled=True, sample_rate=1.0, slow_ms=60_000, directory=str(tmp_path)))
+    assert fast.get("/v1/resources/people").status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+    slow = TestClient(ProfilingMiddleware(app, enabled=True, sample_rate=1.0, slow_ms=0, directory=str(tmp_path)))
+    assert slow.get("/v1/resources/starships").status_code == 200
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,151 @@
+import asyncio
+import httpx
+import pytest
+import respx
+from httpx import Response
+from app.core import response_cache
+from app.core.errors import NotFoundError, UpstreamError
+from app.services import swapi_client, upstream_policy
+from app.services.upstream_policy import AdaptiveLimiter, CircuitBreaker
+
+SWAPI = "https://swapi.dev/api"
+
+
+def _policy():
+    policy = upstream_policy.for_url(SWAPI)
+    policy.retry_base = 0.001
+    return policy
+
+
+@respx.mock
+def test_transient_errors_are_retried_but_definitive_ones_are_not():
+    policy = _policy()
+    flaky = respx.get(f"{SWAPI}/films/1/").mock(side_effect=[
+        Response(503, json={"detail": "down"}),
+        httpx.ConnectError("reset"),
+        Response(200, json={"title": "A New Hope"}),
+    ])
+    assert asyncio.run(swapi_client.get_json("films/1/"))["title"] == "A New Hope"
+    assert flaky.call_count == 3
+
+    broken = respx.get(f"{SWAPI}/films/2/").mock(return_value=Response(500, json={"detail": "boom"}))
+    missing = respx.get(f"{SWAPI}/films/3/").mock(return_value=Response(404, json={"detail": "Not found"}))
+    with pytest.raises(UpstreamError):
+        asyncio.run(swapi_client.get_json("films/2/"))
+    with pytest.raises(NotFoundError):
+        asyncio.run(swapi_client.get_json("films/3/"))
+    assert broken.call_count == 1 and missing.call_count == 1
+    assert policy.counters["retries"] == 2
+
+
+@respx.mock
+def test_circuit_opens_fails_fast_and_serves_cached_copy(client, monkeypatch):
+    policy = _policy()
+    policy.retries = 0
+    policy.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+    film = respx.get(f"{SWAPI}/films/1/").mock(return_value=Response(200, json={"title": "A New Hope", "characters": []}))
+    down = respx.get(f"{SWAPI}/films/2/").mock(return_value=Response(503, json={"detail": "down"}))
+    assert client.get("/v1/films/1/characters").status_code == 200
+
+    for _ in range(2):
+        assert client.get("/v1/films/2/characters").status_code == 502
+    r = client.get("/v1/films/2/characters")
+    assert r.status_code == 503
+    assert down.call_count == 2  # aberto: nem chega à SWAPI
+
+    # com o circuito aberto, o que está em cache (mesmo expirado) continua sendo servido
+    base = swapi_client._cache._clock
+    monkeypatch.setattr(swapi_client._cache, "_clock", lambda: base() + 10_000)
+    monkeypatch.setattr(swapi_client._cache, "max_stale", 20_000)
+    response_cache.clear()
+    r = client.get("/v1/films/1/characters")
+    assert r.status_code == 200 and r.headers["x-served-stale"] == "true"
+    assert film.call_count == 1
+
+    state = client.get("/health/upstream").json()["policy"]["swapi.dev"]
+    assert state["breaker"]["state"] == "open"
+    assert state["breaker"]["rejected"] >= 2
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=5, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 6
+    assert breaker.allow()       # chamada de teste
+    assert not breaker.allow()   # as outras continuam falhando rápido
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+@respx.mock
+def test_slow_attempt_is_hedged():
+    policy = _policy()
+    policy.hedge_min_samples = 0
+    policy.hedge_min_delay = 0.02
+    policy.hedge_max_ratio = 1.0
+    policy.latency.add(0.001)
+    calls = []
+
+    async def first_slow(_):
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return Response(200, json={"title": "A New Hope"})
+
+    respx.get(f"{SWAPI}/films/1/").mock(side_effect=first_slow)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        data = await swapi_client.get_json("films/1/")
+        return data, loop.time() - start
+
+    data, elapsed = asyncio.run(run())
+    assert data["title"] == "A New Hope"
+    assert elapsed < 0.5
+    assert policy.counters["hedges"] == 1 and policy.counters["hedge_wins"] == 1
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveLimiter(initial=8, minimum=2, maximum=10)
+
+    async def run():
+        assert all(limiter.try_acquire() for _ in range(8))
+        assert not limiter.try_acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        await waiter  # a vaga liberada vai direto para quem esperava
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 8
+    limiter.on_failure()
+    limiter.on_failure()
+    assert limiter.limit == 2
+    for _ in range(10):
+        limiter.on_success()
+    assert 2 < limiter.limit < 8
+
+
+@respx.mock
+def test_client_errors_do_not_open_the_circuit():
+    policy = _policy()
+    policy.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    limit = policy.limiter.limit
+    forbidden = respx.get(f"{SWAPI}/films/4/").mock(return_value=Response(403, json={"detail": "nope"}))
+    for _ in range(5):
+        with pytest.raises(UpstreamError):
+            asyncio.run(swapi_client.get_json("films/4/"))
+    assert forbidden.call_count == 5
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    assert policy.limiter.limit == limit
+
+    respx.get(f"{SWAPI}/films/5/").mock(return_value=Response(500, json={"detail": "boom"}))
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(swapi_client.get_json("films/5/"))
+    assert policy.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,81 @@
+import json
+import pytest
+from werkzeug.test import EnvironBuilder
+from app.core.wsgi_bridge import AsgiBridge
+from app.main import app
+from app.services import mirror, snapshot
+from tests.fake_swapi import build_dataset
+
+
+@pytest.fixture()
+def bridge():
+    b = AsgiBridge(app)
+    b.start()
+    yield b
+    b.close()
+
+
+def _request(path, **kwargs):
+    return EnvironBuilder(path=path, **kwargs).get_request()
+
+
+def test_bridge_serves_get_with_query_and_headers(bridge, fake_swapi):
+    r = bridge.handle(_request("/v1/resources/people", query_string="fields=name"))
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.headers["x-cache"] == "MISS"
+    assert [x["name"] for x in json.loads(r.get_data())["results"]] == [
+        p["name"] for p in fake_swapi.dataset["people"][:10]
+    ]
+
+    again = bridge.handle(_request("/v1/resources/people", query_string="fields=name"))
+    assert again.headers["x-cache"] == "HIT"
+
+
+def test_bridge_passes_request_body_and_error_status(bridge, fake_swapi):
+    r = bridge.handle(_request("/v1/batch", method="POST", json={"queries": [{"path": "/v1/resources/people/1"}]}))
+    assert r.status_code == 200
+    assert json.loads(r.get_data())["results"][0]["status"] == 200
+
+    r = bridge.handle(_request("/v1/resources/aliens"))
+    assert r.status_code == 400
+
+
+def test_bridge_streams_export_to_the_end(bridge, fake_swapi):
+    r = bridge.handle(_request("/v1/resources/planets/export", query_string="fields=name"))
+    assert r.status_code == 200
+    assert len(r.get_data().splitlines()) == len(fake_swapi.dataset["planets"])
+
+
+def test_snapshot_round_trip_prewarms_mirror(tmp_path):
+    dataset = build_dataset()
+    for resource, items in dataset.items():
+        mirror.load_items(resource, items)
+    path = str(tmp_path / "snapshot.json.gz")
+    assert snapshot.save_snapshot(path) == sum(len(v) for v in dataset.values())
+
+    mirror.clear()
+    loaded = snapshot.load_snapshot(path)
+    assert loaded["people"] == len(dataset["people"])
+    assert mirror.get_store("planets").get(1)["name"] == dataset["planets"][0]["name"]
+
+
+def test_lifespan_loads_snapshot_without_upstream(tmp_path, monkeypatch):
+    import app.main as app_main
+
+    mirror.load_items("people", build_dataset()["people"])
+    path = str(tmp_path / "snapshot.json")
+    snapshot.save_snapshot(path)
+    mirror.clear()
+    monkeypatch.setattr(app_main, "MIRROR_SNAPSHOT_PATH", path)
+
+    b = AsgiBridge(app)
+    b.start()
+    try:
+        # nenhuma rota mockada: qualquer chamada à SWAPI falharia
+        r = b.handle(_request("/v1/resources/people", query_string="page_size=2&sort=name"))
+        assert r.status_code == 200
+        assert json.loads(r.get_data())["meta"]["source"] == "mirror"
+    finally:
+        b.close()